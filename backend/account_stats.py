@@ -0,0 +1,120 @@
+"""
+Materialized realized-P&L aggregates.
+
+account_stats holds one row with the totals over every closed trade and
+ticker_stats one row per ticker. Closing a trade adds to both in the same
+transaction (record_close), as SQL increments, so /account/summary reads a
+single row however long the trade history gets.
+
+rebuild() recomputes both tables from the trades table. On startup
+ensure_account_stats() builds them if they have never been built; with
+several workers starting at once only the one that inserts the singleton
+account_stats row does so. On demand:
+
+    python -m backend.account_stats rebuild
+"""
+import datetime
+import sys
+
+from sqlalchemy import case, func
+
+from .database import SessionLocal, AccountStats, TickerStats, Trade, dialect_insert, upsert_increment
+
+STATS_ROW_ID = 1
+
+STAT_COLUMNS = ("realized_pnl", "trades_count", "wins", "losses")
+
+
+def record_close(db, ticker: str, pnl: float):
+    """Add one closed trade to the aggregates. Runs in the caller's transaction; the caller commits."""
+    deltas = {"realized_pnl": pnl, "trades_count": 1, "wins": int(pnl > 0), "losses": int(pnl < 0)}
+    upsert_increment(db, AccountStats, {"id": STATS_ROW_ID}, deltas)
+    upsert_increment(db, TickerStats, {"ticker": ticker}, deltas)
+
+
+def _recompute(db, now: datetime.datetime) -> tuple:
+    """Replace ticker_stats from the closed trades; returns (account totals, ticker count). Does not commit."""
+    pnl = func.coalesce(Trade.pnl, 0.0)
+    rows = db.query(
+        Trade.ticker,
+        func.sum(pnl),
+        func.count(Trade.id),
+        func.sum(case((pnl > 0, 1), else_=0)),
+        func.sum(case((pnl < 0, 1), else_=0)),
+    ).filter(Trade.status == "Closed").group_by(Trade.ticker).all()
+
+    totals = {**dict.fromkeys(STAT_COLUMNS, 0), "realized_pnl": 0.0}
+    db.query(TickerStats).delete()
+    for ticker, *values in rows:
+        stats = dict(zip(STAT_COLUMNS, values))
+        db.add(TickerStats(ticker=ticker, updated_at=now, **stats))
+        for col in STAT_COLUMNS:
+            totals[col] += stats[col]
+    return totals, len(rows)
+
+
+def rebuild(db) -> dict:
+    """Recompute account_stats and ticker_stats from the closed trades and commit."""
+    now = datetime.datetime.utcnow()
+    totals, tickers = _recompute(db, now)
+    db.query(AccountStats).delete()
+    db.add(AccountStats(id=STATS_ROW_ID, updated_at=now, **totals))
+    db.commit()
+    return {**totals, "tickers": tickers}
+
+
+def ensure_account_stats():
+    """Build the aggregates from the trade history if they have never been built."""
+    db = SessionLocal()
+    try:
+        # Claim the build by inserting the singleton row. A concurrent claim
+        # conflicts and does nothing (on Postgres after waiting for the
+        # winner's commit, on SQLite for the write lock), so only one worker
+        # rebuilds, in the same transaction as its claim.
+        now = datetime.datetime.utcnow()
+        claim = dialect_insert(db.get_bind(), AccountStats).values(
+            id=STATS_ROW_ID, updated_at=now, **{**dict.fromkeys(STAT_COLUMNS, 0), "realized_pnl": 0.0}
+        ).on_conflict_do_nothing(index_elements=["id"])
+        if not db.execute(claim).rowcount:
+            db.rollback()
+            return
+        totals, _ = _recompute(db, now)
+        db.query(AccountStats).filter(AccountStats.id == STATS_ROW_ID).update({**totals, "updated_at": now})
+        db.commit()
+        print(f"Built account stats from {totals['trades_count']} closed trades")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _as_dict(stats) -> dict:
+    values = {col: getattr(stats, col) if stats is not None else 0 for col in STAT_COLUMNS}
+    decided = values["wins"] + values["losses"]
+    values["win_rate"] = values["wins"] / decided if decided else 0.0
+    return values
+
+
+def account_totals(db) -> dict:
+    """Totals over all closed trades (one primary-key lookup)."""
+    return _as_dict(db.get(AccountStats, STATS_ROW_ID))
+
+
+def ticker_breakdown(db) -> list:
+    """Per-ticker totals, largest realized P&L first."""
+    rows = db.query(TickerStats).order_by(TickerStats.realized_pnl.desc()).all()
+    return [{"ticker": row.ticker, **_as_dict(row)} for row in rows]
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m backend.account_stats rebuild")
+        sys.exit(2)
+    from .database import init_db
+    init_db()
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt account stats: {rebuild(db)}")
+    finally:
+        db.close()
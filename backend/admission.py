@@ -0,0 +1,228 @@
+"""
+Admission control and load shedding for expensive routes.
+
+Requests are sorted into lanes by method and path. Each lane has its own
+concurrency budget, and all lanes share ADMISSION_MAX_CONCURRENCY slots, of
+which ADMISSION_TRADING_RESERVED can only be used by the trading lane, so a
+burst of backtests can never starve /trades/* and /execution/*.
+
+A request that cannot start immediately waits in its lane's bounded queue.
+Freed slots go to the highest-priority lane first (trading, then analysis,
+scans, backtests). A full queue is rejected at once with 429; a request
+still waiting at its lane's deadline gets 503. Both carry a Retry-After
+estimated from the lane's recent service times. Routes outside every lane
+(cheap reads, metrics) are not admission controlled.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+from starlette.responses import JSONResponse
+
+from . import metrics
+
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "24"))
+ADMISSION_TRADING_RESERVED = int(os.getenv("ADMISSION_TRADING_RESERVED", "4"))
+
+
+def _lane_setting(lane: str, key: str, default):
+    return type(default)(os.getenv(f"ADMISSION_{lane.upper()}_{key}", str(default)))
+
+
+# name -> (priority, concurrency, max queued, max wait seconds); lower priority value is served first
+LANE_DEFAULTS = {
+    "trading": (0, 16, 64, 15.0),
+    "analysis": (1, 4, 16, 10.0),
+    "scan": (2, 4, 16, 10.0),
+    "backtest": (3, 4, 16, 10.0),
+}
+
+# (method or "*", path prefix, lane); the first match wins
+ROUTE_LANES = [
+    ("*", "/trades/", "trading"),
+    ("*", "/execution/", "trading"),
+    ("GET", "/account/summary", "trading"),
+    ("POST", "/analysis/alpha/", "analysis"),
+    ("GET", "/analysis/suggestion/", "analysis"),
+    ("POST", "/scan", "scan"),
+    ("POST", "/process-data", "scan"),
+    ("POST", "/algo-dash/run-backtest", "backtest"),
+    ("POST", "/algo-dash/monte-carlo", "backtest"),
+    ("POST", "/backtests/run", "backtest"),
+]
+
+admission_wait = metrics.histogram("smark_admission_wait_seconds", "Time admitted requests spent queued.", ("lane",))
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Lane:
+    def __init__(self, name: str, priority: int, limit: int, max_queue: int, max_wait: float, reserved: bool = False):
+        self.name = name
+        self.priority = priority
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.reserved = reserved  # may use the reserved slots
+        self.in_flight = 0
+        self.waiters = deque()
+        self.service_time = 1.0  # EWMA of seconds per request
+        self.counts = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def retry_after(self) -> int:
+        # Time for the work ahead of a new arrival to drain through this lane's slots
+        backlog = len(self.waiters) + self.in_flight + 1
+        return min(60, max(1, math.ceil(self.service_time * backlog / max(self.limit, 1))))
+
+
+class AdmissionController:
+    def __init__(self, total: int = ADMISSION_MAX_CONCURRENCY, reserved: int = ADMISSION_TRADING_RESERVED):
+        self.total = total
+        self.reserved = min(reserved, total)
+        self.in_flight = 0
+        self.lanes = {}
+        for name, (priority, limit, max_queue, max_wait) in LANE_DEFAULTS.items():
+            self.lanes[name] = Lane(
+                name, priority,
+                _lane_setting(name, "LIMIT", limit),
+                _lane_setting(name, "QUEUE", max_queue),
+                _lane_setting(name, "MAX_WAIT", max_wait),
+                reserved=(name == "trading"),
+            )
+        self._by_priority = sorted(self.lanes.values(), key=lambda lane: lane.priority)
+
+    def lane_for(self, method: str, path: str):
+        for route_method, prefix, lane in ROUTE_LANES:
+            if (route_method == "*" or route_method == method) and path.startswith(prefix):
+                return self.lanes[lane]
+        return None
+
+    def _can_start(self, lane: Lane) -> bool:
+        capacity = self.total if lane.reserved else self.total - self.reserved
+        return lane.in_flight < lane.limit and self.in_flight < capacity
+
+    def _start(self, lane: Lane):
+        lane.in_flight += 1
+        self.in_flight += 1
+        lane.counts["admitted"] += 1
+
+    def _blocks_lower(self, lane: Lane) -> bool:
+        # Waiting for shared capacity rather than for its own budget
+        return bool(lane.waiters) and lane.in_flight < lane.limit
+
+    def _higher_priority_waiting(self, lane: Lane) -> bool:
+        return any(self._blocks_lower(other) for other in self._by_priority if other.priority < lane.priority)
+
+    async def acquire(self, lane: Lane):
+        """Wait for a slot in lane; raises Rejected when shedding."""
+        if not lane.waiters and not self._higher_priority_waiting(lane) and self._can_start(lane):
+            self._start(lane)
+            return
+        if len(lane.waiters) >= lane.max_queue:
+            lane.counts["rejected_queue_full"] += 1
+            raise Rejected(429, f"Too many {lane.name} requests in progress. Try again later.", lane.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        lane.counts["queued"] += 1
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, lane.max_wait)
+        except asyncio.TimeoutError:
+            lane.counts["rejected_timeout"] += 1
+            raise Rejected(503, f"Server is busy with {lane.name} requests. Try again later.", lane.retry_after())
+        except asyncio.CancelledError:
+            # Client went away; hand back a slot that was granted in the meantime
+            if waiter.done() and not waiter.cancelled():
+                self.release(lane)
+            raise
+        finally:
+            if waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+        admission_wait.observe(time.perf_counter() - queued_at, lane.name)
+
+    def release(self, lane: Lane, elapsed: float = None):
+        lane.in_flight -= 1
+        self.in_flight -= 1
+        if elapsed is not None:
+            lane.service_time = 0.8 * lane.service_time + 0.2 * elapsed
+        self._dispatch()
+
+    def _dispatch(self):
+        for lane in self._by_priority:
+            while lane.waiters and self._can_start(lane):
+                waiter = lane.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._start(lane)
+                waiter.set_result(None)
+            if self._blocks_lower(lane):
+                # Shared slots go to this lane before any lower-priority one
+                return
+
+    def metrics(self) -> dict:
+        return {
+            "capacity": self.total,
+            "trading_reserved": self.reserved,
+            "in_flight": self.in_flight,
+            "lanes": {
+                lane.name: {
+                    "limit": lane.limit,
+                    "in_flight": lane.in_flight,
+                    "queued": len(lane.waiters),
+                    "max_queue": lane.max_queue,
+                    "max_wait_s": lane.max_wait,
+                    "service_time_s": round(lane.service_time, 4),
+                    "saturated": not self._can_start(lane),
+                    **lane.counts,
+                }
+                for lane in self._by_priority
+            },
+        }
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        lane = self.controller.lane_for(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.controller.acquire(lane)
+        except Rejected as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status, headers={"Retry-After": str(e.retry_after)})
+            await response(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(lane, time.perf_counter() - started)
+
+
+@metrics.register_collector
+def _admission_collector():
+    m = admission.metrics()
+    lanes = m["lanes"]
+    yield "smark_admission_in_flight", "gauge", "Admitted requests running per lane.", [({"lane": n}, l["in_flight"]) for n, l in lanes.items()]
+    yield "smark_admission_queued", "gauge", "Requests waiting for admission per lane.", [({"lane": n}, l["queued"]) for n, l in lanes.items()]
+    yield "smark_admission_saturated", "gauge", "1 while a lane cannot start new requests.", [({"lane": n}, int(l["saturated"])) for n, l in lanes.items()]
+    yield "smark_admission_requests_total", "counter", "Admission decisions per lane.", [
+        ({"lane": n, "outcome": outcome}, l[outcome]) for n, l in lanes.items()
+        for outcome in ("admitted", "rejected_queue_full", "rejected_timeout")
+    ]
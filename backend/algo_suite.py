@@ -1,24 +1,40 @@
-import feedparser
-import requests
-from bs4 import BeautifulSoup
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import threading
 from urllib.parse import quote
+from . import metrics
+from .coldstart import lazy_import
+from .http_client import get_client, get_async_client
 import pandas as pd
 
-def fetch_real_sentiment(ticker):
+# The news sentiment stack is only loaded when a feed is scored
+feedparser = lazy_import("feedparser")
+vader = lazy_import("vaderSentiment.vaderSentiment")
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def _sentiment_analyzer():
+    # Building the analyzer parses the VADER lexicon; do it once per process
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = vader.SentimentIntensityAnalyzer()
+        return _analyzer
+
+def _news_url(ticker):
+    return f"https://news.google.com/rss/search?q={quote(ticker)}"
+
+def score_news_feed(ticker, content):
     """
-    Scans Google News for the ticker and returns a sentiment-based signal.
+    Scores the headlines of a Google News RSS payload and returns a sentiment-based signal.
     """
-    query = ticker
-    rss_url = f"https://news.google.com/rss/search?q={quote(query)}"
-    feed = feedparser.parse(rss_url)
+    feed = feedparser.parse(content)
     num_articles = 5
     articles = feed.entries[:num_articles]
 
     if not articles:
         return []
 
-    analyzer = SentimentIntensityAnalyzer()
+    analyzer = _sentiment_analyzer()
     total_score = 0
     
     for item in articles:
@@ -34,6 +50,25 @@ def fetch_real_sentiment(ticker):
     
     return []
 
+@metrics.timed("sentiment_fetch")
+def fetch_real_sentiment(ticker):
+    """
+    Scans Google News for the ticker and returns a sentiment-based signal.
+    """
+    with metrics.upstream("google_news"):
+        response = get_client().get(_news_url(ticker))
+        response.raise_for_status()
+    return score_news_feed(ticker, response.content)
+
+@metrics.timed("sentiment_fetch")
+async def fetch_real_sentiment_async(ticker):
+    """Async variant of fetch_real_sentiment using the pooled async client."""
+    with metrics.upstream("google_news"):
+        response = await get_async_client().get(_news_url(ticker))
+        response.raise_for_status()
+    return score_news_feed(ticker, response.content)
+
+@metrics.timed("detect_turtle_breakout")
 def detect_turtle_breakout(df, system=1):
     """
     Turtle Trading Rules:
@@ -69,6 +104,7 @@ def detect_turtle_breakout(df, system=1):
     
     return []
 
+@metrics.timed("detect_ichimoku_signals")
 def detect_ichimoku_signals(df):
     """
     Standard Ichimoku Kinko Hyo
@@ -0,0 +1,155 @@
+"""
+Stored, incrementally updated alpha analysis results.
+
+/analysis/alpha/{strategy_type} keeps one analysis_results row per strategy
+with the summary metrics, the per-date statistics they were reduced from
+(factor_engine.daily_factor_stats) and a digest of each date's signals.
+
+- Same signal set (fingerprint) and no date still waiting on prices: the
+  stored metrics are returned without loading prices or computing anything.
+- Otherwise only dates whose signals are new or changed, plus dates whose
+  forward returns were incomplete when stored, are computed. The other
+  dates' rows are reused and the summary is reduced again from all of them.
+- A row older than ALPHA_CACHE_MAX_AGE (adjusted closes are revised after
+  splits and dividends), a different price start or different
+  periods/quantiles start over from scratch.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from . import factor_engine
+from .. import metrics
+from ..database import AnalysisResult
+
+ALPHA_CACHE_MAX_AGE = float(os.getenv("ALPHA_CACHE_MAX_AGE", str(24 * 3600)))
+
+logger = logging.getLogger("AlphaAnalyzer")
+
+analysis_requests = metrics.counter(
+    "smark_alpha_analysis_total", "Alpha analyses served from the stored result, updated incrementally or computed in full.", ("result",)
+)
+
+
+def date_digests(factor: pd.Series) -> pd.Series:
+    """Order-independent digest (hex) of each date's (asset, value) rows."""
+    row_hashes = pd.util.hash_pandas_object(factor, index=True).to_numpy()
+    codes, dates = pd.factorize(factor.index.get_level_values(0))
+    sums = np.zeros(len(dates), dtype=np.uint64)
+    np.add.at(sums, codes, row_hashes)  # wraps modulo 2**64
+    return pd.Series([f"{int(s):016x}" for s in sums], index=pd.DatetimeIndex(dates, name="date")).sort_index()
+
+
+def fingerprint(digests: pd.Series, periods, quantiles: int) -> str:
+    h = hashlib.sha256(json.dumps([sorted(periods), quantiles]).encode())
+    for date, digest in digests.items():
+        h.update(f"{date.isoformat()}={digest};".encode())
+    return h.hexdigest()
+
+
+def _pending_dates(dates: pd.DatetimeIndex, prices: pd.DataFrame, periods) -> pd.DatetimeIndex:
+    """Dates whose longest forward return needs prices past the end of the panel."""
+    rows = prices.index.get_indexer(dates)
+    incomplete = np.where(rows >= 0, rows + max(periods) >= len(prices.index), dates > prices.index[-1])
+    return dates[incomplete]
+
+
+def _dump_state(daily: pd.DataFrame, digests: pd.Series, pending: pd.DatetimeIndex, periods, quantiles: int) -> str:
+    return json.dumps({
+        "periods": sorted(periods),
+        "quantiles": quantiles,
+        "digests": {d.isoformat(): v for d, v in digests.items()},
+        "pending": [d.isoformat() for d in pending],
+        "daily": {
+            "index": [d.isoformat() for d in daily.index],
+            "columns": list(daily.columns),
+            "data": daily.to_numpy().tolist(),
+        },
+    })
+
+
+def _load_state(row, periods, quantiles: int):
+    """The row's stored per-date state, or None when it cannot be reused."""
+    if row is None or not row.state or row.updated_at is None:
+        return None
+    if (datetime.datetime.utcnow() - row.updated_at).total_seconds() > ALPHA_CACHE_MAX_AGE:
+        return None
+    state = json.loads(row.state)
+    if state["periods"] != sorted(periods) or state["quantiles"] != quantiles:
+        return None
+    daily = state["daily"]
+    return {
+        "digests": pd.Series(list(state["digests"].values()), index=pd.DatetimeIndex(list(state["digests"]), name="date"), dtype=object),
+        "pending": pd.DatetimeIndex(state["pending"]),
+        "daily": pd.DataFrame(daily["data"], index=pd.DatetimeIndex(daily["index"], name="date"), columns=daily["columns"]),
+    }
+
+
+def cached_analysis(db, strategy_type: str, factor: pd.Series, load_prices,
+                    periods=factor_engine.DEFAULT_PERIODS, quantiles: int = factor_engine.DEFAULT_QUANTILES):
+    """
+    Alpha metrics for a strategy's factor (values indexed by (date, asset)),
+    from the stored result when possible. load_prices() returns the wide
+    close panel and is only called when something has to be computed.
+    Returns None when no prices are available. Failed analyses are returned
+    but not stored; the stored row keeps the last successful result.
+    """
+    digests = date_digests(factor)
+    current = fingerprint(digests, periods, quantiles)
+    row = db.query(AnalysisResult).filter(AnalysisResult.strategy_type == strategy_type).order_by(AnalysisResult.id.desc()).first()
+    state = _load_state(row, periods, quantiles)
+    if state is not None and row.fingerprint == current and state["pending"].empty:
+        analysis_requests.inc("hit")
+        return json.loads(row.metrics)
+
+    prices = load_prices()
+    if prices.empty:
+        return None
+    if state is not None and row.fingerprint == current and pd.Timestamp(row.price_end) == prices.index[-1]:
+        # Some dates still lack forward prices, but none have arrived since
+        analysis_requests.inc("hit")
+        return json.loads(row.metrics)
+    if state is not None and pd.Timestamp(row.price_start) != prices.index[0]:
+        # Forward-filling depends on where the panel starts
+        state = None
+
+    if state is not None:
+        stored = state["digests"].reindex(digests.index)
+        recompute = digests.index[stored != digests].union(state["pending"].intersection(digests.index))
+        reused = state["daily"].drop(state["daily"].index.difference(digests.index).union(recompute), errors="ignore")
+        analysis_requests.inc("incremental")
+    else:
+        recompute = digests.index
+        reused = None
+        analysis_requests.inc("full")
+
+    frames = [reused] if reused is not None and not reused.empty else []
+    if len(recompute):
+        subset = factor[factor.index.get_level_values(0).isin(recompute)]
+        frames.append(factor_engine.daily_factor_stats(subset, prices, periods, quantiles))
+    daily = pd.concat(frames).sort_index()
+
+    try:
+        calendar = factor_engine.trading_calendar(digests.index, prices.index)
+        results = {**factor_engine.summarize(daily, calendar), "summary": "Analysis complete"}
+    except ValueError as e:
+        logger.error(f"Alpha analysis for {strategy_type} failed: {e}")
+        return {"error": "Failed to clean data for factor analysis"}
+
+    if row is None:
+        row = AnalysisResult(strategy_type=strategy_type)
+        db.add(row)
+    row.metrics = json.dumps(jsonable_encoder(results))
+    row.fingerprint = current
+    row.price_start = prices.index[0].to_pydatetime()
+    row.price_end = prices.index[-1].to_pydatetime()
+    row.state = _dump_state(daily, digests, _pending_dates(daily.index, prices, periods), periods, quantiles)
+    row.updated_at = datetime.datetime.utcnow()
+    db.commit()
+    return json.loads(row.metrics)
@@ -1,10 +1,21 @@
+import os
 import pandas as pd
 import numpy as np
-import alphalens
-from alphalens.utils import get_clean_factor_and_forward_returns
 import logging
-import yfinance as yf
-from ..database import SessionLocal, Signal, Asset
+from . import factor_engine
+from ..coldstart import lazy_import
+from ..data_loader import load_close_panel
+from ..market_data import PERIODS, fetch_live_data
+
+# alphalens pulls in statsmodels, scipy and matplotlib; defer it to the first analysis
+alphalens = lazy_import("alphalens")
+alphalens_utils = lazy_import("alphalens.utils")
+
+# Fetch tickers missing from Historicaldata through the cached market data provider
+ALPHA_PRICE_FALLBACK = os.getenv("ALPHA_PRICE_FALLBACK", "1") == "1"
+
+# "native" (factor_engine, the default) or "alphalens" (reference implementation, same result schema)
+ALPHA_ENGINE = os.getenv("ALPHA_ENGINE", "native")
 
 logger = logging.getLogger("AlphaAnalyzer")
 
@@ -25,8 +36,8 @@ class AlphaAnalyzer:
             factor_data.index = factor_data.index.set_levels([pd.to_datetime(factor_data.index.levels[0]), factor_data.index.levels[1]])
 
             # Call Alphalens utility
-            clean_data = get_clean_factor_and_forward_returns(
-                factors=factor_data,
+            clean_data = alphalens_utils.get_clean_factor_and_forward_returns(
+                factor=factor_data,
                 prices=price_data,
                 periods=periods,
                 quantiles=5,
@@ -58,22 +69,30 @@ class AlphaAnalyzer:
         mean_return_by_q, std_err_by_q = alphalens.performance.mean_return_by_quantile(clean_data)
         return {
             "mean_return_by_quantile": mean_return_by_q.to_dict(),
-            "cumulative_returns": alphalens.performance.factor_cumulative_returns(clean_data, period=1).to_dict()
+            "cumulative_returns": alphalens.performance.factor_cumulative_returns(clean_data, period="1D").to_dict()
         }
 
-    def run_full_analysis(self, signals_df: pd.DataFrame, prices_df: pd.DataFrame):
+    def run_native_analysis(self, factors: pd.Series, prices: pd.DataFrame):
+        """Same metrics as the alphalens path, from factor_engine's vectorized implementation."""
+        try:
+            results = factor_engine.analyze(factors, prices)
+        except ValueError as e:
+            logger.error(f"Error in native factor analysis: {e}")
+            return {"error": "Failed to clean data for factor analysis"}
+        return {**results, "summary": "Analysis complete"}
+
+    def run_full_analysis(self, signals_df: pd.DataFrame, prices: pd.DataFrame, engine: str = ALPHA_ENGINE):
         """
         Run end-to-end analysis.
         signals_df: columns [date, asset, factor_value]
-        prices_df: columns [date, asset, price]
+        prices: wide close prices, index date and one column per asset (AlphaDataBridge)
         """
-        # Pivot prices
-        prices_pivoted = prices_df.pivot(index='date', columns='asset', values='price')
-        
-        # Format factors
-        factors = signals_df.set_index(['date', 'asset'])['factor_value']
+        factors = FactorConverter.to_factor_series(signals_df)
+
+        if engine == "native":
+            return self.run_native_analysis(factors, prices)
         
-        clean_data = self.prepare_alphalens_data(factors, prices_pivoted)
+        clean_data = self.prepare_alphalens_data(factors, prices)
         
         if clean_data is None:
             return {"error": "Failed to clean data for Alphalens"}
@@ -90,29 +109,51 @@ class AlphaAnalyzer:
 class FactorConverter:
     @staticmethod
     def signals_to_factor_df(signals: list):
-        """Convert a list of Signal objects to a DataFrame for AlphaAnalyzer."""
-        data = []
-        for sig in signals:
-            data.append({
-                "date": sig.created_at,
-                "asset": sig.asset.ticker,
-                "factor_value": sig.confidence
-            })
-        return pd.DataFrame(data)
+        """Convert (created_at, ticker, confidence) signal rows to a DataFrame for AlphaAnalyzer."""
+        return pd.DataFrame([tuple(sig) for sig in signals], columns=["date", "asset", "factor_value"])
+
+    @staticmethod
+    def to_factor_series(signals_df: pd.DataFrame) -> pd.Series:
+        """Factor values indexed by (date, asset): one per asset per trading day, on the daily price index."""
+        factors = signals_df.assign(date=pd.to_datetime(signals_df['date']).dt.normalize())
+        factors = factors.groupby(['date', 'asset'])['factor_value'].mean()
+        factors.index = factors.index.set_names(['date', 'asset'])
+        return factors
 
 class AlphaDataBridge:
     @staticmethod
-    def fetch_historical_prices(tickers: list, start_date: str, end_date: str):
-        """Fetch historical close prices for all tickers in signal list."""
-        data = []
-        for ticker in tickers:
-            df = yf.download(ticker, start=start_date, end=end_date)
-            if not df.empty:
-                df = df.reset_index()
-                for _, row in df.iterrows():
-                    data.append({
-                        "date": row['Date'],
-                        "asset": ticker,
-                        "price": row['Close']
-                    })
-        return pd.DataFrame(data)
+    def _fallback_closes(ticker: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+        # Daily bars from the incremental bar cache; only the missing tail goes upstream
+        needed = pd.Timestamp.now() - start
+        period = next((p for p, span in PERIODS.items() if span >= needed), "max")
+        bars = fetch_live_data(ticker, period=period, interval="1d")
+        if bars.empty:
+            return pd.Series(dtype=float)
+        index = bars.index.tz_localize(None) if bars.index.tz is not None else bars.index
+        closes = pd.Series(bars["close"].to_numpy(), index=index.normalize())
+        return closes[~closes.index.duplicated(keep="last")].loc[start:end]
+
+    @staticmethod
+    def fetch_historical_prices(tickers: list, start_date: str, end_date: str, fallback: bool = ALPHA_PRICE_FALLBACK) -> pd.DataFrame:
+        """
+        Close prices for the tickers as a wide DataFrame (date x asset).
+
+        Read from the local Historicaldata files; tickers without a file
+        (crypto, anything not downloaded) or whose file does not cover the
+        range come from the cached market data provider unless fallback is
+        off. A partially covered ticker keeps its local bars when the
+        provider has nothing.
+        """
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        panel, missing = load_close_panel(tickers, start, end)
+        if missing and fallback:
+            fetched = {t: AlphaDataBridge._fallback_closes(t, start, end) for t in missing}
+            fetched = {t: s for t, s in fetched.items() if not s.empty}
+            if fetched:
+                fetched = pd.DataFrame(fetched)
+                panel = panel.drop(columns=list(fetched.columns), errors="ignore")
+                panel = fetched.sort_index() if panel.empty else pd.concat([panel, fetched], axis=1).sort_index()
+        elif missing:
+            logger.info(f"No local prices for {len(missing)} tickers: {', '.join(missing[:10])}")
+        panel.columns.name = "asset"
+        return panel
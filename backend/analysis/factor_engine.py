@@ -0,0 +1,247 @@
+"""
+Vectorized factor analytics on a wide price panel.
+
+The native fast path for AlphaAnalyzer. It reproduces the alphalens
+pipeline used there (get_clean_factor_and_forward_returns with quantiles,
+factor_information_coefficient, demeaned mean_return_by_quantile and the
+long/short factor_cumulative_returns) on 2D NumPy arrays of dates x assets
+instead of per-date pandas groupbys, and without importing alphalens and
+its plotting stack.
+
+daily_factor_stats() computes everything that is per date (rank IC, mean
+demeaned return per quantile, factor-weighted portfolio return), a block of
+dates at a time so temporaries stay bounded; summarize() reduces those to
+the result schema over the trading calendar.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_PERIODS = (1, 5, 10)
+DEFAULT_QUANTILES = 5
+# Share of factor rows that may be dropped (no forward return, unbinnable date), as in alphalens
+DEFAULT_MAX_LOSS = 0.35
+# Dates processed per vectorized block
+BLOCK_DATES = 64
+
+
+class MaxLossExceeded(ValueError):
+    """Raised when cleaning drops more than max_loss of the factor rows."""
+
+
+def period_label(period: int) -> str:
+    """Forward-return column name for a period in trading days, e.g. 5 -> "5D"."""
+    return f"{period}D"
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """Forward-fill NaN down each column (leading NaN stay NaN)."""
+    rows = np.where(np.isnan(values), 0, np.arange(values.shape[0])[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+
+def forward_returns(filled: np.ndarray, rows: np.ndarray, period: int) -> np.ndarray:
+    """Returns from each of rows to `period` rows later of a forward-filled price array (NaN past the end)."""
+    out = np.full((len(rows), filled.shape[1]), np.nan)
+    ahead = rows + period
+    inside = ahead < filled.shape[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[inside] = filled[ahead[inside]] / filled[rows[inside]] - 1
+    return out
+
+
+def _row_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    counts = mask.sum(axis=1)
+    totals = np.where(mask, values, 0.0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return totals / counts
+
+
+def average_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks along each row, ties sharing their average rank; NaN stay NaN."""
+    n_cols = values.shape[1]
+    order = np.argsort(values, axis=1, kind="stable")  # NaN sort last
+    ordered = np.take_along_axis(values, order, axis=1)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ends = np.ones(values.shape, dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    # First and last sorted position of each element's run of equal values
+    positions = np.arange(n_cols)
+    first = np.maximum.accumulate(np.where(starts, positions, 0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, positions, n_cols)[:, ::-1], axis=1)[:, ::-1]
+    ranks = np.empty(values.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=1)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def row_correlation(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Pearson correlation of x and y along each row over mask (NaN when either side is constant)."""
+    dx = np.where(mask, x - _row_mean(x, mask)[:, None], 0.0)
+    dy = np.where(mask, y - _row_mean(y, mask)[:, None], 0.0)
+    denom = np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, (dx * dy).sum(axis=1) / denom, np.nan)
+
+
+def quantize(factor: np.ndarray, mask: np.ndarray, quantiles: int) -> np.ndarray:
+    """
+    Equal-count quantile (1..quantiles) of each masked value within its row,
+    as pd.qcut: bins are right-closed and a row whose quantile edges are not
+    unique is left unbinned (NaN).
+    """
+    out = np.full(factor.shape, np.nan)
+    rows = mask.any(axis=1)
+    if not rows.any():
+        return out
+    values = np.where(mask[rows], factor[rows], np.nan)
+    edges = np.nanquantile(values, np.linspace(0, 1, quantiles + 1), axis=1).T
+    valid = (np.diff(edges, axis=1) > 0).all(axis=1)
+    # Bin = number of interior edges strictly below the value
+    bins = (values[:, :, None] > edges[:, None, 1:-1]).sum(axis=2) + 1.0
+    bins[~(mask[rows] & valid[:, None])] = np.nan
+    out[rows] = bins
+    return out
+
+
+def _factor_matrix(factor: pd.Series, dates: pd.DatetimeIndex, assets: pd.Index) -> np.ndarray:
+    matrix = np.full((len(dates), len(assets)), np.nan)
+    date_pos = dates.get_indexer(factor.index.get_level_values(0))
+    asset_pos = assets.get_indexer(factor.index.get_level_values(1))
+    found = (date_pos >= 0) & (asset_pos >= 0)
+    matrix[date_pos[found], asset_pos[found]] = factor.to_numpy(dtype=float)[found]
+    return matrix
+
+
+def stat_columns(periods, quantiles: int) -> list:
+    """Columns of a daily_factor_stats frame after factor_rows and clean_rows."""
+    labels = [period_label(p) for p in sorted(periods)]
+    return (
+        [f"ic_{label}" for label in labels]
+        + [f"return_{label}" for label in labels]
+        + [f"q{q}_{label}" for label in labels for q in range(1, quantiles + 1)]
+    )
+
+
+def daily_factor_stats(factor: pd.Series, prices: pd.DataFrame, periods=DEFAULT_PERIODS,
+                       quantiles: int = DEFAULT_QUANTILES) -> pd.DataFrame:
+    """
+    Per-date factor statistics, one row per factor date.
+
+    factor: values indexed by (date, asset), one per asset per date.
+    prices: close prices, date index x asset columns, covering the factor
+    dates plus max(periods) trading days.
+
+    Columns: factor_rows, clean_rows (rows kept after cleaning), then for
+    each period label ic_<label> (rank IC), return_<label> (long/short
+    portfolio return) and q<n>_<label> (mean demeaned return of quantile n).
+    Statistics are NaN on dates that kept no rows. Every row depends only on
+    its own date's factor values, so frames for disjoint dates can be
+    concatenated and summarized together.
+    """
+    periods = sorted(periods)
+    columns = stat_columns(periods, quantiles)
+    factor_rows = factor.groupby(level=0).size()
+    daily = pd.DataFrame(np.nan, index=pd.DatetimeIndex(factor_rows.index, name="date"), columns=columns)
+    daily.insert(0, "factor_rows", factor_rows.to_numpy())
+    daily.insert(1, "clean_rows", 0)
+
+    assets = pd.Index(factor.index.get_level_values(1).unique())
+    dates = daily.index.intersection(prices.index).sort_values()
+    filled = _ffill(prices.reindex(columns=assets).to_numpy(dtype=float))
+    price_rows = prices.index.get_indexer(dates)
+    values = _factor_matrix(factor, dates, assets)
+
+    for start in range(0, len(dates), BLOCK_DATES):
+        block = slice(start, start + BLOCK_DATES)
+        returns = [forward_returns(filled, price_rows[block], period) for period in periods]
+        block_values = values[block]
+
+        # Rows with a finite factor, every forward return, and a quantile
+        mask = np.isfinite(block_values)
+        for period_returns in returns:
+            mask &= ~np.isnan(period_returns)
+        buckets = quantize(block_values, mask, quantiles)
+        mask &= ~np.isnan(buckets)
+        daily.loc[dates[block], "clean_rows"] = mask.sum(axis=1)
+
+        rows = mask.any(axis=1)
+        if not rows.any():
+            continue
+        mask, block_values, buckets = mask[rows], block_values[rows], buckets[rows]
+
+        factor_ranks = average_ranks(np.where(mask, block_values, np.nan))
+        demeaned_factor = np.where(mask, block_values - _row_mean(block_values, mask)[:, None], 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = demeaned_factor / np.abs(demeaned_factor).sum(axis=1)[:, None]
+
+        block_ic, block_portfolio, block_quantiles = [], [], []
+        for period_returns in returns:
+            period_returns = period_returns[rows]
+            block_ic.append(row_correlation(factor_ranks, average_ranks(np.where(mask, period_returns, np.nan)), mask))
+            weighted = np.where(mask, weights * period_returns, 0.0)
+            block_portfolio.append(np.where(np.isnan(weighted).any(axis=1), np.nan, weighted.sum(axis=1)))
+            demeaned = period_returns - _row_mean(period_returns, mask)[:, None]
+            block_quantiles.extend(_row_mean(demeaned, mask & (buckets == q)) for q in range(1, quantiles + 1))
+        daily.loc[dates[block][rows], columns] = np.column_stack(block_ic + block_portfolio + block_quantiles)
+
+    return daily
+
+
+def trading_calendar(factor_dates, price_dates) -> pd.DatetimeIndex:
+    """Every date that has a factor value or a price, the calendar alphalens reindexes daily series to."""
+    return pd.DatetimeIndex(factor_dates).union(pd.DatetimeIndex(price_dates)).unique().sort_values()
+
+
+def summarize(daily: pd.DataFrame, calendar: pd.DatetimeIndex, max_loss: float = DEFAULT_MAX_LOSS) -> dict:
+    """
+    The AlphaAnalyzer result schema from a daily_factor_stats frame:
+    ic_metrics (mean/std/t-stat of daily IC) and return_metrics (mean
+    demeaned return per quantile, cumulative 1D long/short returns).
+    """
+    factor_rows, clean_rows = daily["factor_rows"].sum(), daily["clean_rows"].sum()
+    loss = (factor_rows - clean_rows) / factor_rows if factor_rows else 1.0
+    if loss > max_loss:
+        raise MaxLossExceeded(f"Cleaning dropped {loss:.1%} of factor rows (max_loss {max_loss:.0%})")
+
+    kept = daily[daily["clean_rows"] > 0]
+    if kept.empty:
+        raise ValueError("No factor rows left after cleaning")
+    labels = [c[len("ic_"):] for c in daily.columns if c.startswith("ic_")]
+    span = calendar[(calendar >= kept.index[0]) & (calendar <= kept.index[-1])].rename("date")
+
+    # Days without factor rows count towards the t-stat sample, as in alphalens
+    ic = kept[[f"ic_{label}" for label in labels]].set_axis(labels, axis=1).reindex(span)
+    ic_metrics = {
+        "ic_mean": ic.mean().to_dict(),
+        "ic_std": ic.std().to_dict(),
+        "ic_t_stat": (ic.mean() / ic.std() * np.sqrt(len(ic))).to_dict(),
+    }
+
+    mean_returns = {}
+    for label in labels:
+        by_quantile = {int(c[1:].split("_")[0]): kept[c] for c in kept.columns if c.startswith("q") and c.endswith(f"_{label}")}
+        # Quantiles that never occurred are left out
+        mean_returns[label] = pd.DataFrame(by_quantile).dropna(how="all", axis=1).mean()
+    mean_by_quantile = pd.DataFrame(mean_returns).rename_axis("factor_quantile")
+
+    cumulative = {}
+    first = f"return_{period_label(1)}"
+    if first in kept:
+        cumulative = (1 + kept[first].reindex(span).fillna(0.0)).cumprod().to_dict()
+
+    return {
+        "ic_metrics": ic_metrics,
+        "return_metrics": {
+            "mean_return_by_quantile": mean_by_quantile.to_dict(),
+            "cumulative_returns": cumulative,
+        },
+    }
+
+
+def analyze(factor: pd.Series, prices: pd.DataFrame, periods=DEFAULT_PERIODS,
+            quantiles: int = DEFAULT_QUANTILES, max_loss: float = DEFAULT_MAX_LOSS) -> dict:
+    """daily_factor_stats + summarize over the factor and price calendar."""
+    daily = daily_factor_stats(factor, prices, periods, quantiles)
+    return summarize(daily, trading_calendar(factor.index.get_level_values(0), prices.index), max_loss)
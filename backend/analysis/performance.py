@@ -0,0 +1,171 @@
+"""
+Array-based performance metrics for backtests.
+
+Every function takes NumPy equity / return / position arrays and works in
+vectorized form (cumulative sums, accumulates and sliding windows), so
+metrics never need a per-bar Python loop.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+PERIODS_PER_YEAR = 252
+ROLLING_WINDOWS = (63, 252)
+
+
+def returns_from_equity(equity) -> np.ndarray:
+    """Simple per-bar returns of an equity curve (length n-1)."""
+    equity = np.asarray(equity, dtype=float)
+    if equity.size < 2:
+        return np.empty(0)
+    prev = equity[:-1]
+    out = np.zeros_like(prev)
+    np.divide(equity[1:] - prev, prev, out=out, where=prev > 0)
+    return out
+
+
+def annualized_return(returns, periods_per_year: int = PERIODS_PER_YEAR) -> float:
+    returns = np.asarray(returns, dtype=float)
+    return float(returns.mean() * periods_per_year) if returns.size else 0.0
+
+
+def annualized_volatility(returns, periods_per_year: int = PERIODS_PER_YEAR) -> float:
+    returns = np.asarray(returns, dtype=float)
+    return float(returns.std() * np.sqrt(periods_per_year)) if returns.size else 0.0
+
+
+def sharpe_ratio(returns, periods_per_year: int = PERIODS_PER_YEAR) -> float:
+    vol = annualized_volatility(returns, periods_per_year)
+    return annualized_return(returns, periods_per_year) / vol if vol > 0 else 0.0
+
+
+def sortino_ratio(returns, periods_per_year: int = PERIODS_PER_YEAR) -> float:
+    """Annualised return over downside deviation (target return of zero)."""
+    returns = np.asarray(returns, dtype=float)
+    if not returns.size:
+        return 0.0
+    downside = float(np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2)) * np.sqrt(periods_per_year))
+    return annualized_return(returns, periods_per_year) / downside if downside > 0 else 0.0
+
+
+def drawdown_series(equity) -> np.ndarray:
+    """Fractional drawdown from the running peak at every bar."""
+    equity = np.asarray(equity, dtype=float)
+    if not equity.size:
+        return np.empty(0)
+    running_max = np.maximum.accumulate(equity)
+    out = np.zeros_like(equity)
+    np.divide(running_max - equity, running_max, out=out, where=running_max > 0)
+    return out
+
+
+def max_drawdown(equity):
+    """
+    Maximum drawdown depth and duration.
+
+    Returns (depth, duration) where depth is a fraction of the peak and
+    duration is the longest number of bars spent below a previous peak.
+    """
+    equity = np.asarray(equity, dtype=float)
+    if not equity.size:
+        return 0.0, 0
+    idx = np.arange(equity.size)
+    at_peak = equity >= np.maximum.accumulate(equity)
+    last_peak = np.maximum.accumulate(np.where(at_peak, idx, 0))
+    return float(drawdown_series(equity).max()), int((idx - last_peak).max())
+
+
+def calmar_ratio(returns, equity, periods_per_year: int = PERIODS_PER_YEAR) -> float:
+    depth, _ = max_drawdown(equity)
+    return annualized_return(returns, periods_per_year) / depth if depth > 0 else 0.0
+
+
+def exposure(positions) -> float:
+    """Fraction of bars with a non-zero position."""
+    positions = np.asarray(positions, dtype=float)
+    return float(np.mean(positions != 0)) if positions.size else 0.0
+
+
+def turnover(positions, periods_per_year: int = PERIODS_PER_YEAR) -> float:
+    """Annualised turnover: mean absolute change in position weight per bar."""
+    positions = np.asarray(positions, dtype=float)
+    if positions.size < 2:
+        return 0.0
+    return float(np.abs(np.diff(positions)).mean() * periods_per_year)
+
+
+def trade_stats(pnl) -> dict:
+    """Win rate (fraction) and profit factor of a per-trade P&L array."""
+    pnl = np.asarray(pnl, dtype=float)
+    if not pnl.size:
+        return {"win_rate": 0.0, "profit_factor": float("inf")}
+    total_wins = pnl[pnl > 0].sum()
+    total_losses = -pnl[pnl < 0].sum()
+    return {
+        "win_rate": float(np.mean(pnl > 0)),
+        "profit_factor": float(total_wins / total_losses) if total_losses > 0 else float("inf"),
+    }
+
+
+def rolling_metrics(equity, windows=ROLLING_WINDOWS, periods_per_year: int = PERIODS_PER_YEAR) -> dict:
+    """
+    Rolling return, volatility, Sharpe and max drawdown per window.
+
+    Values are aligned with the equity bars; bars before a full window are NaN.
+    """
+    equity = np.asarray(equity, dtype=float)
+    returns = returns_from_equity(equity)
+    n = equity.size
+    out = {}
+    for w in windows:
+        series = {key: np.full(n, np.nan) for key in ("return", "volatility", "sharpe", "max_drawdown")}
+        if returns.size >= w:
+            csum = np.concatenate([[0.0], np.cumsum(returns)])
+            csq = np.concatenate([[0.0], np.cumsum(returns ** 2)])
+            mean = (csum[w:] - csum[:-w]) / w
+            var = np.maximum((csq[w:] - csq[:-w]) / w - mean ** 2, 0.0)
+            std = np.sqrt(var)
+            sharpe = np.zeros_like(mean)
+            np.divide(mean, std, out=sharpe, where=std > 0)
+
+            windows_eq = sliding_window_view(equity, w + 1)
+            peaks = np.maximum.accumulate(windows_eq, axis=1)
+            dd = ((peaks - windows_eq) / peaks).max(axis=1)
+
+            series["return"][w:] = windows_eq[:, -1] / windows_eq[:, 0] - 1.0
+            series["volatility"][w:] = std * np.sqrt(periods_per_year)
+            series["sharpe"][w:] = sharpe * np.sqrt(periods_per_year)
+            series["max_drawdown"][w:] = dd
+        out[w] = series
+    return out
+
+
+def compute_performance(equity, positions=None, periods_per_year: int = PERIODS_PER_YEAR) -> dict:
+    """Scalar performance summary of an equity curve (and optional position weights)."""
+    equity = np.asarray(equity, dtype=float)
+    returns = returns_from_equity(equity)
+    depth, duration = max_drawdown(equity)
+    summary = {
+        "total_return": float(equity[-1] / equity[0] - 1.0) if equity.size and equity[0] > 0 else 0.0,
+        "ann_return": annualized_return(returns, periods_per_year),
+        "ann_volatility": annualized_volatility(returns, periods_per_year),
+        "sharpe_ratio": sharpe_ratio(returns, periods_per_year),
+        "sortino_ratio": sortino_ratio(returns, periods_per_year),
+        "calmar_ratio": calmar_ratio(returns, equity, periods_per_year),
+        "max_drawdown": depth,
+        "max_drawdown_duration": duration,
+    }
+    if positions is not None:
+        summary["exposure"] = exposure(positions)
+        summary["turnover"] = turnover(positions, periods_per_year)
+    return summary
+
+
+def rolling_to_columns(rolling: dict, decimals: int = 4) -> dict:
+    """Flatten rolling_metrics output into JSON-friendly columns (NaN -> None)."""
+    columns = {}
+    for w, series in rolling.items():
+        for key, values in series.items():
+            rounded = np.round(values, decimals).astype(object)
+            rounded[np.isnan(values)] = None
+            columns[f"{key}_{w}"] = rounded.tolist()
+    return columns
@@ -0,0 +1,207 @@
+"""
+Monte Carlo / bootstrap robustness analysis for backtest results.
+
+Every path is simulated as part of one batched NumPy computation: a resample
+index matrix of shape (paths, steps) is drawn per chunk and all statistics
+are reduced along the step axis, so there is no per-path Python loop.
+
+Two resampling schemes are supported:
+- trades: resample the per-trade return sequence with replacement
+- block: circular block bootstrap of daily returns (keeps autocorrelation).
+  A path is a sequence of block starts, so statistics are precomputed once
+  per possible block and paths are reduced along the block axis instead.
+"""
+import numpy as np
+
+PERCENTILES = [5, 25, 50, 75, 95]
+HISTOGRAM_BINS = 40
+
+# Upper bound on paths * steps materialised at once; small chunks stay cache-friendly
+MAX_CHUNK_CELLS = 1_000_000
+
+
+def _chunk_sizes(n_paths: int, n_steps: int):
+    """Split n_paths into chunks so each (chunk, n_steps) matrix stays bounded."""
+    chunk = max(1, MAX_CHUNK_CELLS // max(n_steps, 1))
+    for start in range(0, n_paths, chunk):
+        yield min(chunk, n_paths - start)
+
+
+def _simulate_paths(step_returns: np.ndarray, index_fn, n_steps: int, n_paths: int, initial_capital: float, periods_per_year: float):
+    """
+    Compound resampled step returns into equity paths and reduce them.
+
+    index_fn(k) must return an int matrix (k, n_steps) of indices into
+    step_returns. Paths are compounded in log space (cumsum instead of
+    cumprod) and drawdowns are taken on the log equity curve.
+    """
+    step_returns = np.asarray(step_returns, dtype=float)
+    log_steps = np.log1p(np.maximum(step_returns, -0.999999))
+    finals, drawdowns, sharpes = [], [], []
+    for k in _chunk_sizes(n_paths, n_steps):
+        idx = index_fn(k)
+        log_equity = np.cumsum(log_steps[idx], axis=1)
+
+        # Starting capital (log equity 0) is the first peak of every path
+        running_max = np.maximum.accumulate(log_equity, axis=1)
+        np.maximum(running_max, 0.0, out=running_max)
+        drawdowns.append(-np.expm1((log_equity - running_max).min(axis=1)))
+        finals.append(initial_capital * np.exp(log_equity[:, -1]))
+
+        steps = step_returns[idx]
+        mean = steps.mean(axis=1)
+        std = steps.std(axis=1)
+        sharpe = np.zeros_like(mean)
+        np.divide(mean, std, out=sharpe, where=std > 0)
+        sharpes.append(sharpe * np.sqrt(periods_per_year))
+
+    return {
+        "final_equity": np.concatenate(finals),
+        "max_drawdown": np.concatenate(drawdowns),
+        "sharpe": np.concatenate(sharpes),
+    }
+
+
+def bootstrap_trades(
+    trade_returns,
+    initial_capital: float = 10000.0,
+    n_paths: int = 10000,
+    position_size: float = 0.1,
+    trades_per_year: float = 1.0,
+    seed: int = 42
+) -> dict:
+    """
+    Resample the trade return sequence with replacement.
+
+    trade_returns are raw per-trade returns of the traded instrument; each
+    trade moves equity by position_size * return, matching the Algo Dash
+    simulator. Sharpe is annualised with trades_per_year.
+    """
+    r = np.asarray(trade_returns, dtype=float)
+    if r.size == 0:
+        raise ValueError("No trades to resample")
+
+    rng = np.random.default_rng(seed)
+    n = r.size
+    return _simulate_paths(
+        position_size * r,
+        lambda k: rng.integers(0, n, size=(k, n), dtype=np.int32),
+        n,
+        n_paths,
+        initial_capital,
+        trades_per_year,
+    )
+
+
+def block_bootstrap_returns(
+    returns,
+    initial_capital: float = 10000.0,
+    n_paths: int = 10000,
+    block_size: int = 20,
+    periods_per_year: float = 252,
+    seed: int = 42
+) -> dict:
+    """
+    Circular block bootstrap of a periodic return series.
+
+    Blocks of block_size consecutive returns are stitched together (wrapping
+    around the end of the series) until each path matches the original length.
+    """
+    r = np.asarray(returns, dtype=float)
+    if r.size < 2:
+        raise ValueError("Not enough returns to bootstrap")
+
+    rng = np.random.default_rng(seed)
+    n = r.size
+    block_size = int(min(max(block_size, 1), n))
+    n_blocks = -(-n // block_size)
+    # Every block is full length except possibly the last, which is cut to the series length
+    center = r.mean()
+    full = _block_stats(r, block_size, center)
+    last = full if n_blocks * block_size == n else _block_stats(r, n - (n_blocks - 1) * block_size, center)
+    constant = np.ptp(r) == 0
+
+    finals, drawdowns, sharpes = [], [], []
+    # Chunked by path steps as _simulate_paths is, so a seed draws the same block starts
+    for k in _chunk_sizes(n_paths, n):
+        starts = rng.integers(0, n, size=(k, n_blocks), dtype=np.int32)
+        blocks = {name: np.concatenate([full[name][starts[:, :-1]], last[name][starts[:, -1:]]], axis=1) for name in full}
+
+        # Log equity at the start of each block, and the peak before it (starting capital included)
+        ends = np.cumsum(blocks["log_sum"], axis=1)
+        begins = ends - blocks["log_sum"]
+        peaks = np.maximum.accumulate(begins + blocks["log_peak"], axis=1)
+        prior_peak = np.maximum(np.concatenate([np.zeros((k, 1)), peaks[:, :-1]], axis=1), 0.0)
+        # Deepest point of each block below an earlier peak, or below a peak inside the block
+        depth = np.maximum(prior_peak - (begins + blocks["log_low"]), blocks["log_drawdown"])
+        drawdowns.append(-np.expm1(-depth.max(axis=1)))
+        finals.append(initial_capital * np.exp(ends[:, -1]))
+
+        # Mean and std from per-block sums of returns centred on the series mean
+        centred_mean = blocks["sum"].sum(axis=1) / n
+        std = np.sqrt(np.maximum(blocks["sum_sq"].sum(axis=1) / n - centred_mean ** 2, 0.0))
+        sharpe = np.zeros(k)
+        if not constant:
+            np.divide(centred_mean + center, std, out=sharpe, where=std > 0)
+        sharpes.append(sharpe * np.sqrt(periods_per_year))
+
+    return {
+        "final_equity": np.concatenate(finals),
+        "max_drawdown": np.concatenate(drawdowns),
+        "sharpe": np.concatenate(sharpes),
+    }
+
+
+def _block_stats(returns: np.ndarray, length: int, center: float) -> dict:
+    """
+    Statistics of the circular block of `length` returns starting at each
+    position: log return, highest and lowest running log return, deepest
+    drawdown within the block, and sums of the returns (less center) and
+    their squares. Computed for a chunk of starts at a time.
+    """
+    n = returns.size
+    log_returns = np.log1p(np.maximum(returns, -0.999999))
+    parts = []
+    first = 0
+    for k in _chunk_sizes(n, length):
+        window = (np.arange(first, first + k, dtype=np.int64)[:, None] + np.arange(length)) % n
+        first += k
+        log_path, centred = log_returns[window], returns[window]
+        del window
+        np.cumsum(log_path, axis=1, out=log_path)
+        running_peak = np.maximum.accumulate(log_path, axis=1)
+        part = {"log_sum": log_path[:, -1].copy(), "log_peak": running_peak[:, -1].copy(), "log_low": log_path.min(axis=1)}
+        part["log_drawdown"] = np.subtract(running_peak, log_path, out=running_peak).max(axis=1)
+        centred -= center
+        part["sum"] = centred.sum(axis=1)
+        part["sum_sq"] = np.square(centred, out=centred).sum(axis=1)
+        parts.append(part)
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def summarize_distribution(values: np.ndarray, confidence: float = 0.95) -> dict:
+    """Percentiles, confidence interval and histogram for one simulated statistic."""
+    values = np.asarray(values, dtype=float)
+    alpha = (1.0 - confidence) / 2.0
+    lower, upper = np.quantile(values, [alpha, 1.0 - alpha])
+    counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+    return {
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+        "ci_lower": float(lower),
+        "ci_upper": float(upper),
+        "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+    }
+
+
+def summarize_paths(paths: dict, initial_capital: float, confidence: float = 0.95) -> dict:
+    """Summarise simulated final equity, max drawdown and Sharpe distributions."""
+    return {
+        "confidence": confidence,
+        "n_paths": int(paths["final_equity"].size),
+        "prob_loss": float(np.mean(paths["final_equity"] < initial_capital)),
+        "final_equity": summarize_distribution(paths["final_equity"], confidence),
+        "max_drawdown": summarize_distribution(paths["max_drawdown"], confidence),
+        "sharpe": summarize_distribution(paths["sharpe"], confidence),
+    }
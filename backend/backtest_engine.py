@@ -1,9 +1,16 @@
 import pandas as pd
+import numpy as np
 from .database import SessionLocal, BacktestResult, Asset
 from .signal_engine import detect_divergence, detect_macd_cross, detect_turtle_breakout
-import yfinance as yf
+from .exit_resolver import resolve_exits, EXIT_OPEN
+from .analysis.performance import max_drawdown, compute_performance, trade_stats, rolling_metrics, rolling_to_columns, returns_from_equity
+from .analysis.robustness import bootstrap_trades, block_bootstrap_returns, summarize_paths
+from . import metrics
+from .coldstart import lazy_import
 from datetime import datetime
 
+yf = lazy_import("yfinance")
+
 class BacktestEngine:
     def __init__(self, db_session):
         self.db = db_session
@@ -15,14 +22,16 @@ class BacktestEngine:
         print(f"Running backtest for {ticker} using {strategy_name}...")
         
         # 1. Fetch data
-        df = yf.download(ticker, period=period, interval=interval)
+        with metrics.upstream("yfinance"):
+            df = yf.download(ticker, period=period, interval=interval)
         if df.empty:
             return None
         
         df.columns = [c.lower() for c in df.columns]
         
         # 2. Simulate Trades
-        trades = []
+        entries = []
+        directions = []
         # We simulate bar by bar (simplified)
         for i in range(50, len(df)):
             sub_df = df.iloc[:i+1]
@@ -37,36 +46,26 @@ class BacktestEngine:
                 
             for sig in signals:
                 # Basic execution logic: Enter at close, Exit at 2% SL or 5% TP
-                entry_price = float(df['close'].iloc[i])
-                direction = "buy" if "Bull" in sig['type'] or "Long" in sig['type'] else "sell"
-                
-                # Simple exit simulation for backtest
-                exit_price = entry_price
-                pnl = 0
-                for j in range(i+1, min(i+20, len(df))):
-                    future_price = float(df['close'].iloc[j])
-                    if direction == "buy":
-                        if future_price <= entry_price * 0.98: # SL
-                            exit_price = future_price
-                            break
-                        if future_price >= entry_price * 1.05: # TP
-                            exit_price = future_price
-                            break
-                    else:
-                        if future_price >= entry_price * 1.02: # SL
-                            exit_price = future_price
-                            break
-                        if future_price <= entry_price * 0.95: # TP
-                            exit_price = future_price
-                            break
-                    exit_price = future_price # End of window exit
-                
-                if direction == "buy":
-                    pnl = exit_price - entry_price
-                else:
-                    pnl = entry_price - exit_price
-                    
-                trades.append(pnl)
+                entries.append(i)
+                directions.append(1 if "Bull" in sig['type'] or "Long" in sig['type'] else -1)
+        
+        # Resolve every exit against intrabar high/low over the next 19 bars
+        trades = []
+        if entries:
+            entry_idx = np.array(entries)
+            direction = np.array(directions)
+            entry_price = df['close'].to_numpy(dtype=float)[entry_idx]
+            exits = resolve_exits(
+                df['open'], df['high'], df['low'], df['close'],
+                entry_idx,
+                direction,
+                stop_loss=np.where(direction > 0, entry_price * 0.98, entry_price * 1.02),
+                take_profit=np.where(direction > 0, entry_price * 1.05, entry_price * 0.95),
+                max_hold=19
+            )
+            pnl = (exits["exit_price"] - entry_price) * direction
+            trades = pnl.tolist()
+            trade_equity = np.cumprod(np.concatenate([[1.0], 1 + pnl / entry_price]))
 
         # 3. Calculate Metrics
         if not trades:
@@ -87,7 +86,7 @@ class BacktestEngine:
             total_trades=len(trades),
             profit_factor=profit_factor,
             total_pnl=total_pnl,
-            max_drawdown=0.0, # Placeholder
+            max_drawdown=max_drawdown(trade_equity)[0],
             run_at=datetime.utcnow()
         )
         
@@ -95,19 +94,252 @@ class BacktestEngine:
         self.db.commit()
         return result
 
-def run_nightly_backtests():
-    db = SessionLocal()
-    engine = BacktestEngine(db)
+
+@metrics.timed("backtest_simulation")
+def simulate_strategy(df: pd.DataFrame, strategy: str, initial_capital: float = 10000.0) -> dict:
+    """
+    Simulate a long-only Algo Dash strategy over daily bars.
+
+    Positions use 10% of capital with a 5% stop-loss and 10% take-profit.
+    Returns final capital, closed trades, equity curve (list and array),
+    position weights per bar, raw per-trade returns and max drawdown.
+    """
+    # Calculate indicators based on strategy
+    df = df.reset_index(drop=True)
+    
+    if strategy == "MACD_Cross":
+        df["ema12"] = df["close"].ewm(span=12).mean()
+        df["ema26"] = df["close"].ewm(span=26).mean()
+        df["macd"] = df["ema12"] - df["ema26"]
+        df["signal"] = df["macd"].ewm(span=9).mean()
+        df["signal_buy"] = (df["macd"] > df["signal"]) & (df["macd"].shift(1) <= df["signal"].shift(1))
+        df["signal_sell"] = (df["macd"] < df["signal"]) & (df["macd"].shift(1) >= df["signal"].shift(1))
+    elif strategy == "RSI_Divergence":
+        delta = df["close"].diff()
+        gain = delta.where(delta > 0, 0).rolling(14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+        rs = gain / loss
+        df["rsi"] = 100 - (100 / (1 + rs))
+        df["signal_buy"] = df["rsi"] < 30
+        df["signal_sell"] = df["rsi"] > 70
+    elif strategy == "Turtle_Breakout":
+        df["high_20"] = df["high"].rolling(20).max()
+        df["low_20"] = df["low"].rolling(20).min()
+        df["signal_buy"] = df["close"] > df["high_20"].shift(1)
+        df["signal_sell"] = df["close"] < df["low_20"].shift(1)
+    else:  # Ichimoku
+        df["tenkan"] = (df["high"].rolling(9).max() + df["low"].rolling(9).min()) / 2
+        df["kijun"] = (df["high"].rolling(26).max() + df["low"].rolling(26).min()) / 2
+        df["signal_buy"] = (df["tenkan"] > df["kijun"]) & (df["tenkan"].shift(1) <= df["kijun"].shift(1))
+        df["signal_sell"] = (df["tenkan"] < df["kijun"]) & (df["tenkan"].shift(1) >= df["kijun"].shift(1))
+    
+    # Resolve exits for every candidate entry at once (5% SL / 10% TP, intrabar)
+    close = df["close"].to_numpy(dtype=float)
+    buy = df["signal_buy"].fillna(False).to_numpy(dtype=bool)
+    candidates = np.flatnonzero(buy[50:]) + 50
+    exits = resolve_exits(
+        df["open"], df["high"], df["low"], close,
+        candidates,
+        direction=1,
+        stop_loss=close[candidates] * 0.95,
+        take_profit=close[candidates] * 1.10,
+        exit_signal=df["signal_sell"].fillna(False).to_numpy(dtype=bool)
+    )
+    
+    # One position at a time: chain each exit to the next candidate entry
+    taken = []
+    k = 0
+    while k < len(candidates) and exits["reason"][k] != EXIT_OPEN:
+        taken.append(k)
+        k = np.searchsorted(candidates, exits["exit_idx"][k], side="right")
+    taken = np.array(taken, dtype=np.int64)
+    
+    entry_idx = candidates[taken]
+    exit_idx = exits["exit_idx"][taken]
+    entry_price = close[entry_idx]
+    exit_price = exits["exit_price"][taken]
+    trade_returns = (exit_price - entry_price) / entry_price
+    
+    # Compound 10% position size per trade
+    capital_after = initial_capital * np.cumprod(1 + 0.1 * trade_returns)
+    capital_before = np.concatenate([[initial_capital], capital_after[:-1]])
+    pnl_dollars = capital_after - capital_before
+    capital = float(capital_after[-1]) if len(capital_after) else initial_capital
+    
+    dates = df["timestamp"].dt.strftime("%Y-%m-%d").to_numpy()
+    trades = [
+        {
+            "entry_time": dates[e],
+            "exit_time": dates[x],
+            "entry_price": float(ep),
+            "exit_price": float(xp),
+            "pnl": round(float(pnl), 2),
+            "pnl_pct": round(float(r) * 100, 2),
+            "direction": "long",
+            "exit_reason": reason
+        }
+        for e, x, ep, xp, pnl, r, reason in zip(
+            entry_idx, exit_idx, entry_price, exit_price, pnl_dollars, trade_returns, exits["reason"][taken]
+        )
+    ]
+    
+    # Equity per bar is the capital after the last exit at or before that bar
+    bars = np.concatenate([[0], np.arange(50, len(df))])
+    equity = np.concatenate([[initial_capital], capital_after])[np.searchsorted(exit_idx, bars, side="right")]
+    equity_curve = [
+        {"time": t, "value": round(float(v), 2)} for t, v in zip(dates[bars], equity)
+    ]
+    
+    # Position weight per bar: held from the bar after entry through the exit bar
+    held = np.zeros(len(df) + 1)
+    np.add.at(held, entry_idx + 1, 1)
+    np.add.at(held, exit_idx + 1, -1)
+    positions = 0.1 * np.cumsum(held)[:len(df)][bars]
+
+    return {
+        "capital": capital,
+        "trades": trades,
+        "trade_returns": trade_returns,
+        "equity_curve": equity_curve,
+        "equity": equity,
+        "dates": dates[bars],
+        "positions": positions,
+        "max_drawdown": max_drawdown(equity)[0]
+    }
+
+
+def backtest_report(df: pd.DataFrame, strategy: str, initial_capital: float = 10000.0, include_rolling: bool = False,
+                    on_progress=None) -> dict:
+    """
+    Simulate a strategy and summarise it for the Algo Dash.
+
+    Returns {"response": API payload (without ticker), "record": unrounded
+    fields for BacktestResult}. Pure function, so it can run in a worker process.
+
+    on_progress: optional callable receiving the completed fraction (0-1)
+    after each stage (simulation, metrics, rolling metrics); it may raise
+    to abort the run.
+    """
+    report_progress = on_progress or (lambda fraction: None)
+    sim = simulate_strategy(df, strategy, initial_capital)
+    capital = sim["capital"]
+    trades = sim["trades"]
+    report_progress(0.5)
+    
+    # Calculate Tidy Finance metrics
+    perf = compute_performance(sim["equity"], sim["positions"])
+    stats = trade_stats([t["pnl"] for t in trades])
+    win_rate = stats["win_rate"] * 100
+    profit_factor = min(stats["profit_factor"], 999)  # Cap for DB
     
-    # Get active assets
-    assets = db.query(Asset).filter(Asset.is_active == True).all()
-    strategies = ["RSI_Divergence", "MACD_Cross", "Turtle_System_1"]
+    response = {
+        "strategy": strategy,
+        "initial_capital": initial_capital,
+        "final_capital": round(capital, 2),
+        "total_return_pct": round(perf["total_return"] * 100, 2),
+        "metrics": {
+            "sharpe_ratio": round(perf["sharpe_ratio"], 2),
+            "sortino_ratio": round(perf["sortino_ratio"], 2),
+            "calmar_ratio": round(perf["calmar_ratio"], 2),
+            "max_drawdown_pct": round(perf["max_drawdown"] * 100, 2),
+            "max_drawdown_duration_bars": perf["max_drawdown_duration"],
+            "win_rate_pct": round(win_rate, 2),
+            "profit_factor": round(profit_factor, 2),
+            "total_trades": len(trades),
+            "ann_return_pct": round(perf["ann_return"] * 100, 2),
+            "ann_volatility_pct": round(perf["ann_volatility"] * 100, 2),
+            "exposure_pct": round(perf["exposure"] * 100, 2),
+            "turnover": round(perf["turnover"], 2)
+        },
+        "equity_curve": sim["equity_curve"],
+        "trades": trades[-20:]  # Return last 20 trades
+    }
+    report_progress(0.7)
     
-    for asset in assets:
-        for strategy in strategies:
-            try:
-                engine.run_backtest(asset.ticker, strategy)
-            except Exception as e:
-                print(f"Backtest failed for {asset.ticker} {strategy}: {e}")
+    if include_rolling:
+        # Columnar rolling 63/252-bar metrics aligned with equity_curve
+        response["rolling_metrics"] = {
+            "time": sim["dates"].tolist(),
+            **rolling_to_columns(rolling_metrics(sim["equity"]))
+        }
+        report_progress(0.9)
     
-    db.close()
+    record = {
+        "win_rate": win_rate,
+        "total_trades": len(trades),
+        "profit_factor": profit_factor,
+        "total_pnl": capital - initial_capital,
+        "max_drawdown": perf["max_drawdown"]
+    }
+    return {"response": response, "record": record}
+
+
+@metrics.timed("monte_carlo")
+def monte_carlo_report(df: pd.DataFrame, strategy: str, initial_capital: float = 10000.0, method: str = "trades",
+                       n_paths: int = 10000, block_size: int = 20, confidence: float = 0.95, seed: int = 42) -> dict:
+    """
+    Monte Carlo robustness analysis of a strategy backtest.
+
+    method: "trades" resamples trade returns, "block" block-bootstraps bar returns.
+    Raises ValueError for invalid simulation parameters.
+    """
+    sim = simulate_strategy(df, strategy, initial_capital)
+    
+    if method == "trades":
+        years = max((df["timestamp"].iloc[-1] - df["timestamp"].iloc[0]).days / 365.25, 1 / 365.25)
+        paths = bootstrap_trades(
+            sim["trade_returns"],
+            initial_capital=initial_capital,
+            n_paths=n_paths,
+            trades_per_year=len(sim["trade_returns"]) / years,
+            seed=seed
+        )
+    else:
+        paths = block_bootstrap_returns(
+            returns_from_equity(sim["equity"]),
+            initial_capital=initial_capital,
+            n_paths=n_paths,
+            block_size=block_size,
+            seed=seed
+        )
+    
+    return {
+        "observed": {
+            "final_capital": round(sim["capital"], 2),
+            "max_drawdown_pct": round(sim["max_drawdown"] * 100, 2),
+            "total_trades": len(sim["trades"])
+        },
+        "simulation": summarize_paths(paths, initial_capital, confidence)
+    }
+
+
+def run_nightly_backtests(on_progress=None):
+    """
+    Backtest every active asset with each strategy.
+
+    on_progress: optional callable receiving the completed fraction (0-1)
+    after each backtest; it may raise to abort the run.
+    """
+    db = SessionLocal()
+    try:
+        engine = BacktestEngine(db)
+        
+        # Get active assets
+        assets = db.query(Asset).filter(Asset.is_active == True).all()
+        strategies = ["RSI_Divergence", "MACD_Cross", "Turtle_System_1"]
+        total = len(assets) * len(strategies)
+        completed = 0
+        
+        for asset in assets:
+            for strategy in strategies:
+                try:
+                    engine.run_backtest(asset.ticker, strategy)
+                except Exception as e:
+                    print(f"Backtest failed for {asset.ticker} {strategy}: {e}")
+                completed += 1
+                if on_progress:
+                    on_progress(completed / total)
+        
+        return {"assets": len(assets), "backtests": total}
+    finally:
+        db.close()
@@ -0,0 +1,164 @@
+"""
+Chart payload encoding for OHLCV endpoints.
+
+Builds chart responses straight from column arrays instead of one dict per
+bar, in three formats:
+- rows: legacy list of {time, open, high, low, close, ...} dicts
+- columnar: {time: [...], open: [...], ...}
+- arrow: Apache Arrow IPC stream (requires pyarrow)
+
+Responses carry a strong ETag derived from a fingerprint of the data, so a
+repeat request with If-None-Match gets a 304 before anything is encoded.
+Bodies are compressed with brotli or gzip according to Accept-Encoding.
+
+orjson, brotli and pyarrow are optional; the stdlib json/gzip paths are used
+when they are not installed.
+"""
+import gzip
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, Request, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+FORMATS = ("rows", "columnar", "arrow")
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 1024
+
+
+def ohlcv_columns(df: pd.DataFrame, times, fields=("open", "high", "low", "close"), date_format: str = "%Y-%m-%d") -> dict:
+    """
+    Extract chart columns as NumPy arrays.
+
+    times: DatetimeIndex or datetime Series aligned with df.
+    """
+    times = pd.DatetimeIndex(times)
+    columns = {"time": np.asarray(times.strftime(date_format), dtype=object)}
+    for field in fields:
+        values = df[field].to_numpy(dtype=float)
+        if field == "volume":
+            values = np.nan_to_num(values, nan=0.0)
+        columns[field] = values
+    return columns
+
+
+def fingerprint(columns: dict, *extra) -> str:
+    """Stable hash of the column data (and any extra identifying values)."""
+    h = hashlib.blake2b(digest_size=16)
+    for value in extra:
+        h.update(str(value).encode())
+        h.update(b"\0")
+    for name, values in columns.items():
+        h.update(name.encode())
+        if values.dtype == object:
+            h.update("\0".join(map(str, values)).encode())
+        else:
+            h.update(np.ascontiguousarray(values).tobytes())
+    return h.hexdigest()
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=lambda o: o.tolist() if isinstance(o, np.ndarray) else str(o)).encode()
+
+
+def _json_columns(columns: dict) -> dict:
+    # Object arrays (time strings) are not natively serializable by orjson
+    return {k: (v.tolist() if v.dtype == object or orjson is None else v) for k, v in columns.items()}
+
+
+def _rows(columns: dict) -> list:
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*(columns[k].tolist() for k in keys))]
+
+
+def _arrow_bytes(columns: dict, metadata: dict) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Arrow format requires pyarrow on the server")
+    table = pa.table({k: (v.tolist() if v.dtype == object else v) for k, v in columns.items()})
+    table = table.replace_schema_metadata({k: str(v) for k, v in metadata.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _negotiate_encoding(request: Request):
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in request.headers.get("accept-encoding", "").split(",")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _matching_etag(request: Request, base_tag: str):
+    """Return the If-None-Match tag that matches the data fingerprint, if any."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return f'"{base_tag}"'
+        # Compressed variants share the data fingerprint: "<hash>-gzip"
+        if tag.strip('"').split("-")[0] == base_tag:
+            return tag
+    return None
+
+
+def chart_response(request: Request, columns: dict, fmt: str = "rows", envelope: dict = None) -> Response:
+    """
+    Encode chart columns in the requested format with ETag and compression.
+
+    envelope: extra top-level keys (e.g. ticker); the data is placed under
+    "data". Without an envelope the data itself is the JSON body.
+    """
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Use one of: {', '.join(FORMATS)}")
+
+    envelope = envelope or {}
+    base_tag = fingerprint(columns, fmt, *sorted(envelope.items()))
+    encoding = _negotiate_encoding(request)
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    matched = _matching_etag(request, base_tag)
+    if matched:
+        headers["ETag"] = matched
+        return Response(status_code=304, headers=headers)
+
+    if fmt == "arrow":
+        body = _arrow_bytes(columns, envelope)
+        media_type = ARROW_MEDIA_TYPE
+    else:
+        data = _rows(columns) if fmt == "rows" else _json_columns(columns)
+        body = _dumps({**envelope, "data": data} if envelope else data)
+        media_type = "application/json"
+
+    if encoding and len(body) >= MIN_COMPRESS_SIZE:
+        body = brotli.compress(body, quality=5) if encoding == "br" else gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = encoding
+        headers["ETag"] = f'"{base_tag}-{encoding}"'
+    else:
+        headers["ETag"] = f'"{base_tag}"'
+
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,186 @@
+"""
+Cold-start helpers for the serverless entry point.
+
+- lazy_import(name) returns a module facade that imports the real module on
+  first attribute access, so heavy optional dependencies (alphalens, yfinance,
+  alpaca, the news sentiment stack) are only paid for by the routes that use them.
+- With IMPORT_PROFILE=1 an import hook records the cumulative and self time of
+  every module imported after this one (like `python -X importtime`).
+
+startup_report() combines both with the total import time of the app and is
+served at /startup/report.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+
+IMPORT_PROFILE = os.getenv("IMPORT_PROFILE", "0") == "1"
+
+_process_started = time.time()
+_app_import_started = None
+_app_import_finished = None
+
+_lazy_modules = {}
+_lazy_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is used."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+        self.__dict__["_load_seconds"] = None
+        self.__dict__["_loaded_at"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lazy_lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_load_seconds"] = time.perf_counter() - started
+                    self.__dict__["_loaded_at"] = time.time()
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Module facade for `name`; one shared facade per module name."""
+    with _lazy_lock:
+        module = _lazy_modules.get(name)
+        if module is None:
+            module = _lazy_modules[name] = LazyModule(name)
+        return module
+
+
+class _TimedLoader:
+    """Wraps a loader to time module execution; hands the module back to the real loader."""
+
+    def __init__(self, loader, name: str, profiler):
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._profiler.timed(self._name, self._loader.create_module, spec)
+
+    def exec_module(self, module):
+        # Keep the wrapper out of module metadata (importlib.resources, pickling, reloads)
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler.timed(self._name, self._loader.exec_module, module)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class ImportProfiler:
+    """Meta path hook recording per-module import times."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._times = {}  # module -> [cumulative, self]
+        self._installed = False
+
+    def install(self):
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name, self)
+                return spec
+        return None
+
+    def timed(self, name: str, fn, *args):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                entry = self._times.setdefault(name, [0.0, 0.0])
+                entry[0] += elapsed
+                entry[1] += elapsed - children
+
+    def top(self, limit: int = 30) -> list:
+        with self._lock:
+            items = sorted(self._times.items(), key=lambda kv: kv[1][0], reverse=True)
+        return [
+            {"module": name, "cumulative_ms": round(cum * 1000, 2), "self_ms": round(own * 1000, 2)}
+            for name, (cum, own) in items[:limit]
+        ]
+
+    def module_count(self) -> int:
+        with self._lock:
+            return len(self._times)
+
+
+profiler = ImportProfiler()
+if IMPORT_PROFILE:
+    profiler.install()
+
+
+def mark_app_import_start():
+    global _app_import_started
+    _app_import_started = time.perf_counter()
+
+
+def mark_app_import_done():
+    """Called by main.py once every route is registered."""
+    global _app_import_finished
+    _app_import_finished = time.perf_counter()
+
+
+def startup_report(limit: int = 30) -> dict:
+    app_seconds = None
+    if _app_import_started is not None and _app_import_finished is not None:
+        app_seconds = round(_app_import_finished - _app_import_started, 4)
+    with _lazy_lock:
+        lazy = [
+            {
+                "module": name,
+                "loaded": module.__dict__["_module"] is not None,
+                "load_ms": round(module.__dict__["_load_seconds"] * 1000, 2) if module.__dict__["_load_seconds"] is not None else None,
+                "loaded_after_start_s": round(module.__dict__["_loaded_at"] - _process_started, 2) if module.__dict__["_loaded_at"] is not None else None,
+            }
+            for name, module in sorted(_lazy_modules.items())
+        ]
+    return {
+        "app_import_seconds": app_seconds,
+        "uptime_seconds": round(time.time() - _process_started, 2),
+        "modules_loaded": len(sys.modules),
+        "lazy_modules": lazy,
+        "import_profile": {"modules_timed": profiler.module_count(), "slowest": profiler.top(limit)} if profiler._installed else None,
+    }
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Tests never touch the committed smark.db: point the app at a scratch database before backend.database is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='smark-tests-'), 'smark.db')}")
@@ -8,13 +8,41 @@ Loads CSV files from Historicaldata folder with robust format:
 """
 
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List
 import os
 
+from . import metrics
+
 # Data directory relative to backend folder
 DATA_DIR = Path(__file__).parent.parent / "Historicaldata"
 
+# Close series kept in memory by load_close_panel (one per file)
+CLOSE_CACHE_SIZE = int(os.getenv("CLOSE_CACHE_SIZE", "1024"))
+
+# Calendar days a file may start after / end before the requested range and still cover it (weekends, holidays)
+COVERAGE_SLACK_DAYS = int(os.getenv("COVERAGE_SLACK_DAYS", "5"))
+
+ASSET_TYPE_LABELS = {
+    "CS": "Common Stock",
+    "ADRC": "ADR",
+    "ETF": "ETF",
+    "ETN": "ETN",
+    "ETS": "ETS",
+    "ETV": "ETV",
+    "FUND": "Fund",
+    "INDEX": "Index",
+    "PFD": "Preferred Stock",
+    "RIGHT": "Right",
+    "SP": "Structured Product",
+    "UNCLASSIFIED": "Unclassified",
+    "UNIT": "Unit",
+    "WARRANT": "Warrant",
+    "delisted": "Delisted",
+}
+
+@metrics.timed("load_historical_data")
 def load_historical_data(
     ticker: str, 
     timeframe: str = "day",
@@ -33,18 +61,9 @@ def load_historical_data(
     Returns:
         DataFrame with columns: timestamp, open, high, low, close, volume, vwap, transactions
     """
-    # Build filename: CS_AAPL_day.csv or ADRC_BABA_day.csv
-    filename = f"{asset_type}_{ticker}_{timeframe}.csv"
-    filepath = DATA_DIR / filename
-    
-    if not filepath.exists():
-        # Try alternative asset type
-        alt_type = "ADRC" if asset_type == "CS" else "CS"
-        alt_filepath = DATA_DIR / f"{alt_type}_{ticker}_{timeframe}.csv"
-        if alt_filepath.exists():
-            filepath = alt_filepath
-        else:
-            raise FileNotFoundError(f"Data file not found: {filename}")
+    filepath = find_data_file(ticker, timeframe, asset_type)
+    if filepath is None:
+        raise FileNotFoundError(f"Data file not found: {asset_type}_{ticker}_{timeframe}.csv")
     
     df = pd.read_csv(filepath, parse_dates=["Time"])
     
@@ -90,6 +109,89 @@ def load_historical_data(
     return df[final_cols].dropna(subset=["close"])
 
 
+def find_data_file(ticker: str, timeframe: str = "day", asset_type: str = "CS") -> Optional[Path]:
+    """Path of a ticker's data file (CS_AAPL_day.csv or ADRC_BABA_day.csv), trying the other listing type, or None."""
+    filepath = DATA_DIR / f"{asset_type}_{ticker}_{timeframe}.csv"
+    if filepath.exists():
+        return filepath
+    # Try alternative asset type
+    alt_type = "ADRC" if asset_type == "CS" else "CS"
+    alt_filepath = DATA_DIR / f"{alt_type}_{ticker}_{timeframe}.csv"
+    return alt_filepath if alt_filepath.exists() else None
+
+
+@lru_cache(maxsize=CLOSE_CACHE_SIZE)
+def _close_series(path: str, mtime: float, use_adjusted: bool) -> pd.Series:
+    # Only the time and close columns are parsed; mtime in the key drops entries for rewritten files
+    df = pd.read_csv(path, usecols=lambda c: c in ("Time", "Close", "AdjClose"), parse_dates=["Time"], index_col="Time")
+    close = df["Close"]
+    # Same rule as load_historical_data: adjusted closes when the file has any
+    if use_adjusted and "AdjClose" in df.columns and df["AdjClose"].notna().any():
+        close = df["AdjClose"]
+    return close.dropna()
+
+
+@metrics.timed("load_close_panel")
+def load_close_panel(tickers: List[str], start=None, end=None, use_adjusted: bool = True) -> tuple:
+    """
+    Daily closes for many tickers as one wide DataFrame (date index x ticker
+    columns), read from the local data files and bounded to [start, end].
+
+    Returns (panel, missing): missing lists the tickers with no local file or
+    whose file does not cover [start, end] (within COVERAGE_SLACK_DAYS).
+    Partially covered tickers are still in the panel with the bars they have.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    slack = pd.Timedelta(days=COVERAGE_SLACK_DAYS)
+    columns, missing = {}, []
+    for ticker in dict.fromkeys(tickers):
+        filepath = find_data_file(ticker)
+        if filepath is None:
+            missing.append(ticker)
+            continue
+        close = _close_series(str(filepath), filepath.stat().st_mtime, use_adjusted).loc[start:end]
+        if close.empty:
+            missing.append(ticker)
+            continue
+        columns[ticker] = close
+        if (start is not None and close.index[0] > start + slack) or (end is not None and close.index[-1] < end - slack):
+            missing.append(ticker)
+    panel = pd.concat(columns, axis=1).sort_index() if columns else pd.DataFrame()
+    panel.index.name = "date"
+    return panel, missing
+
+
+def parse_data_filename(name: str) -> Optional[dict]:
+    """
+    Parse a data file name into ticker metadata, or None if it is not a daily file.
+
+    CS_AAPL_day.csv -> ticker AAPL, asset_type CS
+    delisted_ADRC_ABB_2023-05-22_day.csv -> ticker ADRC_ABB_2023-05-22, asset_type delisted,
+        symbol ABB, listed_type ADRC, delisted_date 2023-05-22
+
+    ticker/asset_type always round-trip through load_historical_data.
+    """
+    if not name.endswith("_day.csv"):
+        return None
+    parts = name[:-len(".csv")].split("_")
+    if len(parts) < 3:
+        return None
+    asset_type = parts[0]
+    ticker = "_".join(parts[1:-1])  # Handle tickers like AKO.A
+    info = {
+        "ticker": ticker,
+        "asset_type": asset_type,
+        "symbol": ticker,
+        "type_label": ASSET_TYPE_LABELS.get(asset_type, asset_type),
+    }
+    if asset_type == "delisted" and len(parts) >= 5:
+        info["symbol"] = "_".join(parts[2:-2])
+        info["listed_type"] = parts[1]
+        info["delisted_date"] = parts[-2]
+    return info
+
+
 def get_available_tickers() -> List[dict]:
     """
     Return list of available tickers with metadata.
@@ -103,16 +205,12 @@ def get_available_tickers() -> List[dict]:
         return tickers
     
     for filepath in DATA_DIR.glob("*_day.csv"):
-        filename = filepath.stem  # e.g., CS_AAPL_day
-        parts = filename.split("_")
-        if len(parts) >= 3:
-            asset_type = parts[0]  # CS or ADRC
-            ticker = "_".join(parts[1:-1])  # Handle tickers like AKO.A
-            
+        info = parse_data_filename(filepath.name)  # e.g., CS_AAPL_day.csv
+        if info:
             tickers.append({
-                "ticker": ticker,
-                "asset_type": asset_type,
-                "type_label": "Common Stock" if asset_type == "CS" else "ADR",
+                "ticker": info["ticker"],
+                "asset_type": info["asset_type"],
+                "type_label": info["type_label"],
                 "filename": filepath.name
             })
     
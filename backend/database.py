@@ -1,10 +1,19 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, inspect, text, make_url, Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+import asyncio
 import datetime
+import time
+import uuid
 
 import os
 
+from . import metrics
+
 # Supabase (PostgreSQL) or local SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./smark.db")
 
@@ -12,9 +21,197 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./smark.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+# ---- connection pool ----
+# Sessions are held by sync routes (Starlette's threadpool), the io offload pool
+# and the job workers. The pool is sized for the offload threads; overflow covers
+# bursts up to this process's share of DB_MAX_CONNECTIONS, which is split across
+# WEB_CONCURRENCY worker processes (Postgres / Supabase limit connections).
+_db_threads = int(os.getenv("IO_WORKERS", "16")) + int(os.getenv("BACKTEST_WORKERS", "2"))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "60"))
+_process_connections = max(2, DB_MAX_CONNECTIONS // max(1, int(os.getenv("WEB_CONCURRENCY", "1"))))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(min(_db_threads, _process_connections))))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds; below typical server/proxy idle timeouts
+
+# SQLite pragmas, applied to every new connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024)))  # Negative: KiB
+
+# The async engine (read-only routes) has its own pool, carved out of the same budget
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", str(max(2, _process_connections // 4))))
+ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "0"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(max(0, _process_connections - DB_POOL_SIZE - ASYNC_DB_POOL_SIZE - ASYNC_DB_MAX_OVERFLOW))))
+
+db_pool_checkout_seconds = metrics.histogram("smark_db_pool_checkout_seconds", "Time spent waiting for a pooled DB connection.", ("pool",))
+db_pool_timeouts = metrics.counter("smark_db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.", ("pool",))
+
+class _TimedCheckout:
+    """Pool mixin recording how long each checkout waited for a connection."""
+    label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            db_pool_timeouts.inc(self.label)
+            raise
+        finally:
+            db_pool_checkout_seconds.observe(time.perf_counter() - started, self.label)
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    label = "sync"
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    label = "async"
+
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+def _async_url(url: str):
+    """
+    The same database through an asyncio driver (aiosqlite / asyncpg), or
+    None when the backend has none configured. libpq's sslmode= query
+    parameter becomes asyncpg's ssl=.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return None
+    query = dict(parsed.query)
+    if backend == "postgresql" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}", query=query).render_as_string(hide_password=False)
+
+def _async_connect_args(url: str) -> dict:
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    # Supabase's pgbouncer pooler (transaction mode, port 6543) hands each
+    # transaction a different server connection, so asyncpg must not cache
+    # prepared statements or reuse their names across connections
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+def _engine_options(url: str, pool_class=TimedQueuePool, pool_size: int = None, max_overflow: int = None, connect_args: dict = None) -> dict:
+    options = {
+        "poolclass": pool_class,
+        "pool_size": DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if url.startswith("sqlite"):
+        if ":memory:" in url or url.split("://", 1)[1] in ("", "/"):
+            # One shared in-process database; keep SQLAlchemy's default pool for it
+            return {"connect_args": {"check_same_thread": False}}
+        return {**options, "connect_args": {"check_same_thread": False}}
+    options = {**options, "pool_pre_ping": True, "pool_recycle": DB_POOL_RECYCLE}
+    return {**options, "connect_args": connect_args} if connect_args else options
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async path for read-heavy request handlers: queries are awaited on the event loop
+# instead of holding a threadpool thread. Batch jobs and writes keep the sync engine.
+# Backends without an async driver serve those routes from the sync engine (get_async_db).
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+if ASYNC_DATABASE_URL:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(
+        ASYNC_DATABASE_URL, TimedAsyncQueuePool, ASYNC_DB_POOL_SIZE, ASYNC_DB_MAX_OVERFLOW, _async_connect_args(ASYNC_DATABASE_URL)
+    ))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+else:
+    print(f"No async driver for {engine.dialect.name}; async routes use the sync engine")
+    async_engine = AsyncSessionLocal = None
+
+_sync_engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer; writers wait up to
+    # busy_timeout for the lock instead of failing with "database is locked"
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.close()
+
+if engine.dialect.name == "sqlite":
+    for _engine in _sync_engines:
+        event.listen(_engine, "connect", _sqlite_pragmas)
+
+def _pools():
+    return [(label, e.pool) for label, e in zip(("sync", "async"), _sync_engines) if isinstance(e.pool, QueuePool)]
+
+@metrics.register_collector
+def _pool_collector():
+    pools = _pools()
+    yield "smark_db_pool_size", "gauge", "Configured persistent connections in the DB pool.", [({"pool": n}, p.size()) for n, p in pools]
+    yield "smark_db_pool_checked_out", "gauge", "DB connections currently in use.", [({"pool": n}, p.checkedout()) for n, p in pools]
+    yield "smark_db_pool_overflow", "gauge", "Connections open beyond the pool size.", [({"pool": n}, max(p.overflow(), 0)) for n, p in pools]
+
+def pool_status() -> dict:
+    status = {"backend": engine.dialect.name}
+    for label, pool in _pools():
+        status[label] = {
+            "pool": type(pool).__name__, "size": pool.size(), "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0), "max_overflow": pool._max_overflow, "timeout_s": DB_POOL_TIMEOUT,
+        }
+    return status
+
+# ---- timing of statements, flushes and commits (exposed on /metrics) ----
+
+db_statement_seconds = metrics.histogram("smark_db_statement_duration_seconds", "Time spent executing SQL statements.")
+
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    db_statement_seconds.observe(time.perf_counter() - context._metrics_started)
+
+for _engine in _sync_engines:
+    event.listen(_engine, "before_cursor_execute", _statement_started)
+    event.listen(_engine, "after_cursor_execute", _statement_finished)
+
+def _mark(name):
+    def listener(session, *args):
+        session.info[name] = time.perf_counter()
+    return listener
+
+def _observe(name, timer):
+    def listener(session, *args):
+        started = session.info.pop(name, None)
+        if started is not None:
+            metrics.timer_seconds.observe(time.perf_counter() - started, timer)
+    return listener
+
+event.listen(SessionLocal, "before_flush", _mark("_flush_started"))
+event.listen(SessionLocal, "after_flush_postexec", _observe("_flush_started", "db_flush"))
+event.listen(SessionLocal, "before_commit", _mark("_commit_started"))
+event.listen(SessionLocal, "after_commit", _observe("_commit_started", "db_commit"))
+event.listen(SessionLocal, "after_rollback", lambda session: session.info.pop("_commit_started", None))
+
+def dialect_insert(bind, model):
+    """INSERT construct with ON CONFLICT support for the bound database."""
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Upserts are not implemented for {dialect}")
+
+def upsert_increment(db, model, key: dict, deltas: dict):
+    """Insert the row for key, or add deltas to its columns if it exists (and touch updated_at)."""
+    stmt = dialect_insert(db.get_bind(), model).values(**key, **deltas, updated_at=datetime.datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={**{col: getattr(model, col) + stmt.excluded[col] for col in deltas}, "updated_at": stmt.excluded.updated_at},
+    )
+    db.execute(stmt)
+
 Base = declarative_base()
 
 class Asset(Base):
@@ -37,9 +234,19 @@ class Signal(Base):
     take_profit = Column(Float)
     status = Column(String, default="Pending")
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    bar_time = Column(DateTime, nullable=True)  # UTC time of the bar the signal was detected on
+    strategy = Column(String, nullable=True)  # Normalized strategy family of signal_type: macd, rsi, turtle, ...
 
     asset = relationship("Asset")
 
+    __table_args__ = (
+        # Natural key: one row per signal per bar (see signal_store.py)
+        Index("uq_signals_natural_key", "asset_id", "signal_type", "timeframe", "bar_time", unique=True),
+        Index("ix_signals_asset_created_at", "asset_id", "created_at"),
+        Index("ix_signals_created_at", "created_at"),
+        Index("ix_signals_strategy_created_at", "strategy", "created_at"),
+    )
+
 class EconomicEvent(Base):
     __tablename__ = "economic_events"
     id = Column(Integer, primary_key=True, index=True)
@@ -54,6 +261,26 @@ class Account(Base):
     balance = Column(Float, default=10000.0)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+class AccountStats(Base):
+    """Realized P&L over all closed trades, maintained by account_stats.py (a single row)."""
+    __tablename__ = "account_stats"
+    id = Column(Integer, primary_key=True)
+    realized_pnl = Column(Float, default=0.0)
+    trades_count = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class TickerStats(Base):
+    """Realized P&L of closed trades per ticker, maintained by account_stats.py."""
+    __tablename__ = "ticker_stats"
+    ticker = Column(String, primary_key=True)
+    realized_pnl = Column(Float, default=0.0)
+    trades_count = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
 class Trade(Base):
     __tablename__ = "trades"
     id = Column(Integer, primary_key=True, index=True)
@@ -69,6 +296,12 @@ class Trade(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     closed_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Open positions and the closed-trade history (newest first)
+        Index("ix_trades_status_closed_at", "status", "closed_at"),
+        Index("ix_trades_ticker_status_closed_at", "ticker", "status", "closed_at"),
+    )
+
 class BacktestResult(Base):
     __tablename__ = "backtest_results"
     id = Column(Integer, primary_key=True, index=True)
@@ -80,7 +313,12 @@ class BacktestResult(Base):
     profit_factor = Column(Float)
     total_pnl = Column(Float)
     max_drawdown = Column(Float)
-    run_at = Column(DateTime, default=datetime.datetime.utcnow)
+    run_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+
+    __table_args__ = (
+        Index("ix_backtest_results_ticker_run_at", "ticker", "run_at"),
+        Index("ix_backtest_results_strategy_run_at", "strategy_name", "run_at"),
+    )
 
 class StrategyState(Base):
     __tablename__ = "strategy_states"
@@ -91,12 +329,149 @@ class StrategyState(Base):
     total_signals_count = Column(Integer, default=0)
     accuracy_score = Column(Float, default=0.0)
 
+class ArchivePartition(Base):
+    """One monthly archive table of signals or backtest_results (see retention.py)."""
+    __tablename__ = "archive_partitions"
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String)  # signals, backtest_results
+    month = Column(String)  # YYYY-MM
+    table_name = Column(String)
+    row_count = Column(Integer, default=0)
+    archived_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_archive_partitions_source_month", "source", "month", unique=True),
+    )
+
+class SignalRollup(Base):
+    """Monthly signal counts per asset and strategy, kept for archived rows."""
+    __tablename__ = "signal_rollups"
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String)  # YYYY-MM
+    asset_id = Column(Integer)
+    strategy = Column(String)
+    signals = Column(Integer, default=0)
+    sum_confidence = Column(Float, default=0.0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_signal_rollups_key", "month", "asset_id", "strategy", unique=True),
+    )
+
+class BacktestRollup(Base):
+    """Monthly backtest totals per strategy and ticker, kept for archived rows."""
+    __tablename__ = "backtest_rollups"
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String)  # YYYY-MM
+    strategy_name = Column(String)
+    ticker = Column(String)
+    runs = Column(Integer, default=0)
+    sum_win_rate = Column(Float, default=0.0)
+    sum_profit_factor = Column(Float, default=0.0)
+    sum_total_pnl = Column(Float, default=0.0)
+    sum_max_drawdown = Column(Float, default=0.0)
+    sum_total_trades = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    __table_args__ = (
+        Index("uq_backtest_rollups_key", "month", "strategy_name", "ticker", unique=True),
+    )
+
 class AnalysisResult(Base):
     __tablename__ = "analysis_results"
     id = Column(Integer, primary_key=True, index=True)
     strategy_type = Column(String, index=True)
     metrics = Column(String)  # JSON string
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    # Incremental state (analysis/alpha_cache.py)
+    fingerprint = Column(String)  # signal set + periods/quantiles
+    price_start = Column(DateTime)
+    price_end = Column(DateTime)
+    state = Column(String)  # JSON: per-date statistics and signal digests
+    updated_at = Column(DateTime)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True, index=True)  # uuid4 hex
+    kind = Column(String, index=True)  # nightly_backtests, algo_backtest
+    status = Column(String, default="queued", index=True)  # queued, running, done, failed, cancelled
+    progress = Column(Float, default=0.0)
+    params = Column(String)  # JSON string
+    result = Column(String, nullable=True)  # JSON string
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+def get_db():
+    """FastAPI dependency yielding a session that is closed after the request."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+class ThreadedSession:
+    """
+    The part of the AsyncSession interface the async routes use, over a sync
+    Session whose calls run in a worker thread. Stands in for AsyncSession
+    on backends without an async driver.
+    """
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        # Rows are fetched in the worker thread; the caller gets a buffered result
+        def run():
+            return self.sync_session.execute(statement, *args, **kwargs).freeze()
+        return (await asyncio.to_thread(run))()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, self.sync_session, *args, **kwargs)
+
+    async def commit(self):
+        await asyncio.to_thread(self.sync_session.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self.sync_session.rollback)
+
+    async def close(self):
+        await asyncio.to_thread(self.sync_session.close)
+
+async def get_async_db():
+    """FastAPI dependency yielding an AsyncSession (or a ThreadedSession), for async routes that only read."""
+    if AsyncSessionLocal is None:
+        db = ThreadedSession(SessionLocal())
+        try:
+            yield db
+        finally:
+            await db.close()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _migrate(conn):
+    """
+    Bring existing tables up to the models: add missing (nullable) columns and
+    missing indexes. create_all only creates tables that do not exist yet.
+    """
+    insp = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        existing = {c["name"] for c in insp.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl}"))
+                print(f"Migrated: added {table.name}.{column.name}")
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        _migrate(conn)
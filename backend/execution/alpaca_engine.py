@@ -1,9 +1,12 @@
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest, GetOrdersRequest
-from alpaca.trading.enums import OrderSide, TimeInForce, QueryOrderStatus
-from alpaca.data.historical import StockHistoricalDataClient
 import logging
 import os
+from ..coldstart import lazy_import
+
+# alpaca-py is only imported once an Alpaca call is made
+alpaca_trading = lazy_import("alpaca.trading.client")
+alpaca_requests = lazy_import("alpaca.trading.requests")
+alpaca_enums = lazy_import("alpaca.trading.enums")
+alpaca_data = lazy_import("alpaca.data.historical")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -22,8 +25,8 @@ class AlpacaEngine:
         """Initialize Alpaca Trading Client."""
         if self.api_key and self.secret_key:
             try:
-                self.client = TradingClient(self.api_key, self.secret_key, paper=self.paper)
-                self.data_client = StockHistoricalDataClient(self.api_key, self.secret_key)
+                self.client = alpaca_trading.TradingClient(self.api_key, self.secret_key, paper=self.paper)
+                self.data_client = alpaca_data.StockHistoricalDataClient(self.api_key, self.secret_key)
                 
                 # Verify connection by getting account info
                 account = self.client.get_account()
@@ -48,17 +51,18 @@ class AlpacaEngine:
             logger.error(f"Failed to get account info: {e}")
             return None
 
-    def place_market_order(self, symbol, side, qty, time_in_force=TimeInForce.GTC):
+    def place_market_order(self, symbol, side, qty, time_in_force=None):
         """Place a market order on Alpaca."""
         if not self.connected:
             return None
         
         try:
-            order_request = MarketOrderRequest(
+            enums = alpaca_enums
+            order_request = alpaca_requests.MarketOrderRequest(
                 symbol=symbol,
                 qty=qty,
-                side=OrderSide.BUY if side.lower() == "buy" else OrderSide.SELL,
-                time_in_force=time_in_force
+                side=enums.OrderSide.BUY if side.lower() == "buy" else enums.OrderSide.SELL,
+                time_in_force=time_in_force or enums.TimeInForce.GTC
             )
             order = self.client.submit_order(order_data=order_request)
             logger.info(f"Alpaca order submitted: {order.id}")
@@ -90,12 +94,12 @@ class AlpacaEngine:
             logger.error(f"Failed to close position for {symbol}: {e}")
             return False
 
-    def get_orders(self, status=QueryOrderStatus.OPEN):
+    def get_orders(self, status=None):
         """Get recent orders."""
         if not self.connected:
             return []
         try:
-            request_params = GetOrdersRequest(status=status)
+            request_params = alpaca_requests.GetOrdersRequest(status=status or alpaca_enums.QueryOrderStatus.OPEN)
             orders = self.client.get_orders(filter=request_params)
             return [dict(o) for o in orders]
         except Exception as e:
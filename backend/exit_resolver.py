@@ -0,0 +1,133 @@
+"""
+Intrabar Stop-Loss / Take-Profit Exit Resolver
+
+Finds, for every open trade at once, the first bar after entry whose
+high/low touches the stop-loss or take-profit (or whose exit signal fires).
+The search is a vectorized first-index lookup over the future window,
+processed in growing column blocks so only unresolved trades are rescanned.
+
+Fill rules:
+- Gap-through: if the bar opens beyond a level, fill at the open
+  (worse than the stop, better than the target).
+- SL and TP both touched inside one bar: assume the stop was hit first.
+- SL or TP touched intrabar: fill at the level.
+- Exit signal without a touch: fill at the close.
+- No event: exit at the close of the last bar in the window.
+"""
+
+import numpy as np
+
+EXIT_STOP_LOSS = "stop_loss"
+EXIT_TAKE_PROFIT = "take_profit"
+EXIT_SIGNAL = "signal"
+EXIT_TIME = "time"      # max_hold bars elapsed
+EXIT_OPEN = "open"      # ran out of data, still open at the last bar
+
+_REASONS = np.array([EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_SIGNAL, EXIT_TIME, EXIT_OPEN])
+_SL, _TP, _SIG, _TIME, _OPEN = range(5)
+
+
+def resolve_exits(
+    open_,
+    high,
+    low,
+    close,
+    entry_idx,
+    direction,
+    stop_loss,
+    take_profit,
+    exit_signal=None,
+    max_hold=None,
+    block_size: int = 32
+) -> dict:
+    """
+    Resolve exits for many trades in one vectorized pass.
+
+    Args:
+        open_, high, low, close: 1-D bar arrays of equal length
+        entry_idx: bar index of each entry (filled at that bar's close)
+        direction: +1 for long, -1 for short, per trade
+        stop_loss, take_profit: price levels per trade (NaN disables a level)
+        exit_signal: optional boolean array per bar; exits at the close
+        max_hold: optional max bars held; None searches to the end of data
+        block_size: initial number of future bars scanned per pass
+
+    Returns:
+        dict with exit_idx, exit_price (float arrays) and reason (str array)
+    """
+    open_ = np.asarray(open_, dtype=float)
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    n = close.size
+
+    entry_idx = np.asarray(entry_idx, dtype=np.int64)
+    m = entry_idx.size
+    is_long = np.broadcast_to(np.asarray(direction) > 0, (m,))
+    stop_loss = np.broadcast_to(np.asarray(stop_loss, dtype=float), (m,))
+    take_profit = np.broadcast_to(np.asarray(take_profit, dtype=float), (m,))
+    signal = np.zeros(n, dtype=bool) if exit_signal is None else np.asarray(exit_signal, dtype=bool)
+
+    last_idx = np.full(m, n - 1, dtype=np.int64)
+    if max_hold is not None:
+        last_idx = np.minimum(entry_idx + max_hold, n - 1)
+
+    exit_idx = last_idx.copy()
+    if max_hold is None:
+        reason = np.full(m, _OPEN, dtype=np.int8)
+    else:
+        reason = np.where(entry_idx + max_hold <= n - 1, _TIME, _OPEN).astype(np.int8)
+    touched_sl = np.zeros(m, dtype=bool)
+    touched_tp = np.zeros(m, dtype=bool)
+
+    pending = np.flatnonzero(entry_idx < last_idx)
+    offset = 0
+    while pending.size:
+        cols = np.arange(offset + 1, offset + block_size + 1)
+        idx = entry_idx[pending, None] + cols
+        valid = idx <= last_idx[pending, None]
+        idx = np.minimum(idx, n - 1)
+
+        bar_high = high[idx]
+        bar_low = low[idx]
+        longs = is_long[pending, None]
+        sl = stop_loss[pending, None]
+        tp = take_profit[pending, None]
+        sl_hit = np.where(longs, bar_low <= sl, bar_high >= sl)
+        tp_hit = np.where(longs, bar_high >= tp, bar_low <= tp)
+        hit = (sl_hit | tp_hit | signal[idx]) & valid
+
+        found = hit.any(axis=1)
+        rows = np.flatnonzero(found)
+        first = hit[rows].argmax(axis=1)
+        trades = pending[rows]
+        exit_idx[trades] = idx[rows, first]
+        touched_sl[trades] = sl_hit[rows, first]
+        touched_tp[trades] = tp_hit[rows, first]
+        reason[trades] = _SIG
+
+        # Drop resolved trades and trades whose window is exhausted
+        keep = ~found & valid[:, -1]
+        pending = pending[keep]
+        offset += block_size
+        block_size *= 2
+
+    exit_price = close[exit_idx].copy()
+
+    bar_open = open_[exit_idx]
+    gap_sl = touched_sl & np.where(is_long, bar_open <= stop_loss, bar_open >= stop_loss)
+    gap_tp = touched_tp & ~gap_sl & np.where(is_long, bar_open >= take_profit, bar_open <= take_profit)
+    at_sl = touched_sl & ~gap_sl & ~gap_tp
+    at_tp = touched_tp & ~touched_sl & ~gap_tp
+
+    exit_price[gap_sl | gap_tp] = bar_open[gap_sl | gap_tp]
+    exit_price[at_sl] = stop_loss[at_sl]
+    exit_price[at_tp] = take_profit[at_tp]
+    reason[gap_sl | at_sl] = _SL
+    reason[gap_tp | at_tp] = _TP
+
+    return {
+        "exit_idx": exit_idx,
+        "exit_price": exit_price,
+        "reason": _REASONS[reason],
+    }
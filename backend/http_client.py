@@ -0,0 +1,59 @@
+"""
+Shared pooled HTTP clients for upstream calls (news feeds, REST APIs).
+
+Clients keep connections alive between requests and always apply timeouts,
+so a slow upstream can never hold a worker indefinitely. The async client
+serves async handlers; the sync client serves worker threads and Inngest.
+"""
+import os
+import threading
+
+import httpx
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+
+USER_AGENT = "Mozilla/5.0 (compatible; SmarkSignalEngine/1.5)"
+
+_sync_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def _client_options() -> dict:
+    return {
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS // 2),
+        "headers": {"User-Agent": USER_AGENT},
+        "follow_redirects": True,
+    }
+
+
+def get_client() -> httpx.Client:
+    """Process-wide pooled sync client."""
+    global _sync_client
+    with _lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(**_client_options())
+        return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Pooled async client, bound to the running event loop."""
+    global _async_client
+    with _lock:
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(**_client_options())
+        return _async_client
+
+
+async def close_clients():
+    global _sync_client, _async_client
+    with _lock:
+        sync_client, async_client = _sync_client, _async_client
+        _sync_client = _async_client = None
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.aclose()
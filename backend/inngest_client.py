@@ -2,7 +2,6 @@
 Inngest client initialization for Smark backend.
 """
 import os
-from inngest import Inngest
 
 # Get Inngest keys from environment variables
 INNGEST_EVENT_KEY = os.getenv("INNGEST_EVENT_KEY")
@@ -11,6 +10,9 @@ INNGEST_SIGNING_KEY = os.getenv("INNGEST_SIGNING_KEY")
 # Initialize Inngest client only if signing key is available
 # The signing key is required for inngest_serve() to work
 if INNGEST_SIGNING_KEY:
+    # Imported here so deployments without Inngest skip loading the SDK
+    from inngest import Inngest
+
     inngest_client = Inngest(
         app_id="smark-backend",
         event_key=INNGEST_EVENT_KEY,  # Optional: for Inngest Cloud
@@ -4,10 +4,12 @@ Includes cron jobs for market data syncing and signal processing workflows.
 """
 from inngest import Inngest, TriggerCron, TriggerEvent
 from .inngest_client import inngest_client
-from .database import SessionLocal, Asset, Signal
+from .database import SessionLocal
+from .signal_store import asset_ids, signal_rows, upsert_signals
+from .realtime import broker
 from .signal_engine import detect_divergence, detect_macd_cross, detect_sentiment, detect_ichimoku_signals
 import pandas as pd
-import yfinance as yf
+from .market_data import fetch_live_data
 from datetime import datetime
 from functools import wraps
 
@@ -38,26 +40,6 @@ CRYPTO_TICKERS = [
 ALL_TICKERS = STOCK_TICKERS + CRYPTO_TICKERS
 
 
-def fetch_live_data(ticker: str, period="1mo", interval="1h"):
-    """Fetch market data using yfinance."""
-    try:
-        ticker_obj = yf.Ticker(ticker)
-        df = ticker_obj.history(period=period, interval=interval)
-        
-        if df.empty:
-            return pd.DataFrame()
-            
-        df.columns = [c.lower() for c in df.columns]
-        required = ['open', 'high', 'low', 'close']
-        if not all(col in df.columns for col in required):
-            return pd.DataFrame()
-            
-        return df
-    except Exception as e:
-        print(f"Error fetching data for {ticker}: {e}")
-        return pd.DataFrame()
-
-
 # Use conditional decorator based on whether Inngest is configured
 inngest_decorator = inngest_client.create_function if inngest_client is not None else noop_decorator
 
@@ -136,7 +118,7 @@ async def process_signals_workflow(ctx, step):
     # Step 3: Store signals in database
     stored_count = await step.run(
         "store-signals",
-        lambda: _store_signals(ticker, signals)
+        lambda: _store_signals(ticker, signals, df.index[-1])
     )
     
     return {
@@ -157,36 +139,20 @@ def _detect_all_signals(ticker: str, df: pd.DataFrame):
     return signals
 
 
-def _store_signals(ticker: str, signals: list):
-    """Store detected signals in the database."""
-    db = SessionLocal()
+def _store_signals(ticker: str, signals: list, bar_time):
+    """Upsert detected signals; a signal already stored for this bar is refreshed, not duplicated."""
+    if not signals:
+        return 0
+    asset_id = asset_ids.resolve([ticker], "Auto-Synced")[ticker]
+    db = SessionLocal(expire_on_commit=False)
     try:
-        # Get or create asset
-        asset = db.query(Asset).filter(Asset.ticker == ticker).first()
-        if not asset:
-            asset = Asset(ticker=ticker, asset_class="Auto-Synced")
-            db.add(asset)
-            db.commit()
-            db.refresh(asset)
-        
-        # Store each signal
-        stored_count = 0
-        for sig in signals:
-            db_sig = Signal(
-                asset_id=asset.id,
-                signal_type=sig["type"],
-                confidence=sig["confidence"],
-                entry_price=sig.get("entry_price", 0.0),
-                stop_loss=sig.get("entry_price", 0.0) * 0.98,
-                take_profit=sig.get("entry_price", 0.0) * 1.05,
-            )
-            db.add(db_sig)
-            stored_count += 1
-        
+        db_signals = upsert_signals(db, signal_rows(asset_id, signals, "1h", bar_time))
         db.commit()
-        return stored_count
     finally:
         db.close()
+    for db_sig in db_signals:
+        broker.publish_signal(db_sig, ticker)
+    return len(db_signals)
 
 
 @inngest_decorator(
@@ -208,3 +174,22 @@ async def nightly_backtest_cron(ctx, step):
         "message": "Nightly backtests complete",
         "timestamp": datetime.utcnow().isoformat()
     }
+
+
+@inngest_decorator(
+    fn_id="retention-cron",
+    trigger=TriggerCron(cron="0 3 * * *")  # 3 AM daily, after the backtests
+)
+async def retention_cron(ctx, step):
+    """
+    Cron job: Moves signals and backtest results past their retention window into monthly archive tables.
+    """
+    from .retention import run_retention
+
+    result = await step.run("archive-old-rows", run_retention)
+
+    return {
+        "message": "Retention complete",
+        "archived": result,
+        "timestamp": datetime.utcnow().isoformat()
+    }
@@ -0,0 +1,288 @@
+"""
+Local background job queue for long-running work (backtests).
+
+Jobs run on a bounded in-process thread pool, so no external broker is
+needed. Job state is persisted in the `jobs` table: submit returns a job id
+immediately, and callers poll status/progress and fetch the result once done.
+
+Job functions receive a JobContext and report progress with
+`ctx.progress(fraction)`, which also raises JobCancelled once the job has
+been cancelled (cooperative cancellation).
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from . import metrics
+from .database import SessionLocal, Job
+
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobQueueFull(Exception):
+    """Raised when the number of queued jobs reached the limit."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function once the job has been cancelled."""
+
+
+class JobContext:
+    def __init__(self, queue, job_id: str):
+        self._queue = queue
+        self.job_id = job_id
+        self._cancel = threading.Event()
+        self._last_write = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def progress(self, fraction: float):
+        """Record progress (0-1). Raises JobCancelled if the job was cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self._queue._set_progress(self, min(max(float(fraction), 0.0), 1.0))
+
+
+def _dumps(value) -> str:
+    def default(o):
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return str(o)
+    return json.dumps(value, default=default)
+
+
+def _latency_summary(samples) -> dict:
+    if not samples:
+        return {"count": 0}
+    arr = np.fromiter(samples, dtype=float)
+    return {
+        "count": int(arr.size),
+        "mean_s": round(float(arr.mean()), 4),
+        "p50_s": round(float(np.percentile(arr, 50)), 4),
+        "p95_s": round(float(np.percentile(arr, 95)), 4),
+        "max_s": round(float(arr.max()), 4),
+    }
+
+
+class JobQueue:
+    # Progress is written to the database at most this often per job
+    PROGRESS_WRITE_INTERVAL = 1.0
+
+    def __init__(self, max_workers: int = BACKTEST_WORKERS, max_queued: int = JOB_QUEUE_MAX, session_factory=SessionLocal):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._session_factory = session_factory
+        self._executor = None
+        self._lock = threading.Lock()
+        self._live = {}  # job_id -> {"ctx", "future", "status", "progress"}
+        self._queued = 0
+        self._running = 0
+        self._counts = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+        self._wait_times = deque(maxlen=500)
+        self._run_times = deque(maxlen=500)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Created lazily so importing the module never starts threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="smark-job")
+        return self._executor
+
+    def _update_row(self, job_id: str, **fields):
+        db = self._session_factory()
+        try:
+            db.query(Job).filter(Job.id == job_id).update(fields)
+            db.commit()
+        finally:
+            db.close()
+
+    def submit(self, kind: str, fn, params: dict = None) -> str:
+        """
+        Queue fn(ctx) for execution and return the job id.
+        Raises JobQueueFull when max_queued jobs are already waiting.
+        """
+        with self._lock:
+            if self._queued >= self.max_queued:
+                self._counts["rejected"] += 1
+                raise JobQueueFull(f"Job queue is full ({self.max_queued} queued)")
+            self._queued += 1
+            self._counts["submitted"] += 1
+
+        job_id = uuid.uuid4().hex
+        db = self._session_factory()
+        try:
+            db.add(Job(id=job_id, kind=kind, status="queued", progress=0.0, params=_dumps(params or {})))
+            db.commit()
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            raise
+        finally:
+            db.close()
+
+        ctx = JobContext(self, job_id)
+        with self._lock:
+            self._live[job_id] = {"ctx": ctx, "status": "queued", "progress": 0.0, "submitted": time.monotonic()}
+            self._live[job_id]["future"] = self._pool().submit(self._run, job_id, fn, ctx)
+        return job_id
+
+    def _run(self, job_id: str, fn, ctx: JobContext):
+        with self._lock:
+            live = self._live[job_id]
+            self._queued -= 1
+            if ctx.cancelled:
+                self._finish_locked(job_id, "cancelled")
+                cancelled_early = True
+            else:
+                cancelled_early = False
+                self._running += 1
+                live["status"] = "running"
+                self._wait_times.append(time.monotonic() - live["submitted"])
+        if cancelled_early:
+            self._update_row(job_id, status="cancelled", finished_at=datetime.utcnow())
+            return
+        started = time.monotonic()
+        self._update_row(job_id, status="running", started_at=datetime.utcnow())
+
+        status, result, error = "done", None, None
+        try:
+            result = fn(ctx)
+        except JobCancelled:
+            status = "cancelled"
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            print(f"Job {job_id} failed: {error}")
+
+        self._run_times.append(time.monotonic() - started)
+        fields = {"status": status, "finished_at": datetime.utcnow(), "error": error}
+        if status == "done":
+            fields.update(progress=1.0, result=_dumps(result))
+        self._update_row(job_id, **fields)
+        with self._lock:
+            self._running -= 1
+            self._finish_locked(job_id, status)
+
+    def _finish_locked(self, job_id: str, status: str):
+        self._counts[status] += 1
+        self._live.pop(job_id, None)
+
+    def _set_progress(self, ctx: JobContext, fraction: float):
+        with self._lock:
+            live = self._live.get(ctx.job_id)
+            if live:
+                live["progress"] = fraction
+        now = time.monotonic()
+        if now - ctx._last_write >= self.PROGRESS_WRITE_INTERVAL:
+            ctx._last_write = now
+            self._update_row(ctx.job_id, progress=fraction)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation. Returns False if the job is unknown or already finished."""
+        with self._lock:
+            live = self._live.get(job_id)
+            if not live:
+                return False
+            live["ctx"]._cancel.set()
+            never_started = live["future"].cancel()
+            if never_started:
+                self._queued -= 1
+                self._finish_locked(job_id, "cancelled")
+        if never_started:
+            # The worker will never run, so settle the row here
+            self._update_row(job_id, status="cancelled", finished_at=datetime.utcnow())
+        return True
+
+    def get(self, job_id: str, include_result: bool = True):
+        db = self._session_factory()
+        try:
+            job = db.query(Job).filter(Job.id == job_id).first()
+            if not job:
+                return None
+            data = self._to_dict(job, include_result)
+        finally:
+            db.close()
+        with self._lock:
+            live = self._live.get(job_id)
+            if live:
+                # In-memory state is fresher than the throttled database row
+                data["status"] = live["status"]
+                data["progress"] = live["progress"]
+                if live["ctx"].cancelled:
+                    data["status"] = "cancelling"
+        return data
+
+    def list(self, limit: int = 20, kind: str = None):
+        db = self._session_factory()
+        try:
+            query = db.query(Job)
+            if kind:
+                query = query.filter(Job.kind == kind)
+            jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+            return [self._to_dict(j, include_result=False) for j in jobs]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _to_dict(job: Job, include_result: bool) -> dict:
+        data = {
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "progress": job.progress,
+            "params": json.loads(job.params) if job.params else {},
+            "error": job.error,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+        if include_result:
+            data["result"] = json.loads(job.result) if job.result else None
+        return data
+
+    def recover(self):
+        """Mark jobs left queued/running by a previous process as failed."""
+        db = self._session_factory()
+        try:
+            db.query(Job).filter(Job.status.in_(ACTIVE_STATUSES)).update(
+                {"status": "failed", "error": "Interrupted by server restart", "finished_at": datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "counts": dict(self._counts),
+                "queue_wait": _latency_summary(self._wait_times),
+                "run_time": _latency_summary(self._run_times),
+            }
+
+
+job_queue = JobQueue()
+
+
+@metrics.register_collector
+def _job_collector():
+    m = job_queue.metrics()
+    yield "smark_jobs_queued", "gauge", "Background jobs waiting for a worker.", [({}, m["queue_depth"])]
+    yield "smark_jobs_running", "gauge", "Background jobs currently running.", [({}, m["running"])]
+    yield "smark_jobs_total", "counter", "Background jobs by outcome.", [({"outcome": k}, v) for k, v in m["counts"].items()]
@@ -1,21 +1,45 @@
-from fastapi import FastAPI, Depends, HTTPException
+from . import coldstart
+coldstart.mark_app_import_start()
+
+from fastapi import FastAPI, Depends, HTTPException, Request, WebSocket, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .database import SessionLocal, init_db, Asset, Signal, Trade, Account, BacktestResult
-from .signal_engine import detect_divergence, detect_macd_cross, detect_sentiment, generate_pro_analysis, detect_ichimoku_signals
-from .backtest_engine import run_nightly_backtests
+from .database import SessionLocal, async_engine, init_db, get_db, get_async_db, pool_status as db_pool_status, Asset, Signal, Trade, Account, BacktestResult
+from .signal_engine import detect_sentiment_async, generate_pro_analysis, collect_signals
+from .backtest_engine import run_nightly_backtests, backtest_report, monte_carlo_report
 from .risk_manager import RiskManager
-from .data_loader import load_historical_data, get_available_tickers, get_ticker_data_summary
+from .jobs import job_queue, JobQueueFull
+from .chart_payload import ohlcv_columns, chart_response
+from .market_data import fetch_live_data
+from .response_cache import get_cache, interval_ttl, cache_stats, NEGATIVE_TTL
+from .offload import io_pool, cpu_pool, pool_metrics, shutdown_pools
+from .http_client import close_clients
+from .realtime import broker
+from . import metrics, profiler
+from .admission import admission, AdmissionMiddleware
+from .data_loader import load_historical_data, get_ticker_data_summary
+from .ticker_index import get_ticker_index
+from .pagination import keyset_statement, keyset_rows, InvalidCursor, InvalidFields
+from .account_stats import account_totals, ticker_breakdown, record_close, ensure_account_stats
+from .signal_store import asset_ids, backfill_strategies, bar_timestamp, signal_rows, upsert_signals
+from .retention import archive_months, spanning_source, monthly_signal_summary, monthly_backtest_summary, retention_status
 from pydantic import BaseModel
 from typing import List, Optional
 import pandas as pd
 import numpy as np
 import random
-from datetime import datetime, timedelta
-from .execution.manager import ExecutionManager
-from .analysis.alpha_engine import AlphaAnalyzer, FactorConverter, AlphaDataBridge
+import asyncio
+import json
+import time
+from datetime import datetime
+from .routers import execution as execution_routes, alpha as alpha_routes
 
-execution_manager = ExecutionManager()
-alpha_analyzer = AlphaAnalyzer()
+# Per-endpoint response caches (see response_cache.py)
+suggestion_cache = get_cache("analysis_suggestion")
+history_cache = get_cache("history")
 
 class DataPoint(BaseModel):
     time: str
@@ -27,44 +51,57 @@ class DataPoint(BaseModel):
 class MarketDataUpload(BaseModel):
     ticker: str
     data: List[DataPoint]
+    timeframe: str = "upload"  # Bar interval of the data; part of the stored signals' key
 
 from fastapi.middleware.cors import CORSMiddleware
-from inngest.fast_api import serve as inngest_serve
 from .inngest_client import inngest_client
-from .inngest_functions import sync_market_data, process_signals_workflow, nightly_backtest_cron
 
 app = FastAPI(title="Smark Signal Engine")
 
+# Added before CORS so shed responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
-
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+app.add_middleware(metrics.MetricsMiddleware)
+if profiler.enabled():
+    app.add_middleware(profiler.ProfilerMiddleware)
 
 @app.on_event("startup")
 def startup_event():
     init_db()
+    backfill_strategies()
+    ensure_account_stats()
+    job_queue.recover()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_pools()
+    await close_clients()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # Register Inngest functions only if Inngest is configured
 if inngest_client is not None:
+    from inngest.fast_api import serve as inngest_serve
+    from .inngest_functions import sync_market_data, process_signals_workflow, nightly_backtest_cron, retention_cron
+
     inngest_serve(
         app=app,
         client=inngest_client,
-        functions=[sync_market_data, process_signals_workflow, nightly_backtest_cron]
+        functions=[sync_market_data, process_signals_workflow, nightly_backtest_cron, retention_cron]
     )
 else:
     print("INFO: Inngest is not configured. Set INNGEST_SIGNING_KEY environment variable to enable Inngest functions.")
 
+app.include_router(execution_routes.router)
+app.include_router(alpha_routes.router)
+
 
 class RiskRequest(BaseModel):
     account_balance: float
@@ -86,146 +123,341 @@ def read_root():
     return {"message": "Smark API is running"}
 
 @app.get("/account/summary")
-def get_account_summary(db: Session = Depends(get_db)):
-    account = db.query(Account).first()
+async def get_account_summary(db: AsyncSession = Depends(get_async_db)):
+    account = (await db.execute(select(Account).limit(1))).scalar_one_or_none()
     if not account:
         account = Account(balance=10000.0)
         db.add(account)
-        db.commit()
-        db.refresh(account)
+        await db.commit()
     
-    closed_trades = db.query(Trade).filter(Trade.status == "Closed").all()
-    total_pnl = sum(t.pnl for t in closed_trades)
+    # Maintained on every close; no scan of the trade history
+    totals = await db.run_sync(account_totals)
     
     return {
         "balance": account.balance,
-        "total_pnl": total_pnl,
-        "trades_count": len(closed_trades)
+        "total_pnl": totals["realized_pnl"],
+        "trades_count": totals["trades_count"],
+        "wins": totals["wins"],
+        "losses": totals["losses"],
+        "win_rate": totals["win_rate"]
     }
 
-@app.post("/trades/open")
-def open_trade(req: TradeOpenRequest, db: Session = Depends(get_db)):
-    df = fetch_live_data(req.ticker, period="1d", interval="1m")
+@app.get("/account/pnl-by-ticker")
+def get_pnl_by_ticker(db: Session = Depends(get_db)):
+    """Realized P&L, trade count and wins/losses per ticker."""
+    return ticker_breakdown(db)
+
+async def _current_price(ticker: str) -> float:
+    """Last close from the shared market data provider, fetched on the io pool."""
+    df = await io_pool.run(fetch_live_data, ticker, period="1d", interval="1m")
     if df.empty:
         # Fallback if 1m is not available for stocks sometimes after hours
-        df = fetch_live_data(req.ticker, period="5d", interval="1h")
+        df = await io_pool.run(fetch_live_data, ticker, period="5d", interval="1h")
         if df.empty:
             raise HTTPException(status_code=400, detail="Could not fetch current price")
-    
-    current_price = float(df['close'].iloc[-1])
-    
-    trade = Trade(
-        ticker=req.ticker,
-        direction=req.direction,
-        entry_price=current_price,
-        stop_loss=req.stop_loss,
-        take_profit=req.take_profit,
-        amount=req.amount,
-        status="Open"
-    )
-    db.add(trade)
-    db.commit()
+    return float(df['close'].iloc[-1])
+
+@app.post("/trades/open")
+async def open_trade(req: TradeOpenRequest):
+    current_price = await _current_price(req.ticker)
+    trade = await io_pool.run(_insert_trade, req, current_price)
+    broker.publish_trade(trade)
     return {"message": "Trade opened", "entry_price": current_price}
 
+def _insert_trade(req: TradeOpenRequest, entry_price: float) -> Trade:
+    # Objects stay loaded after commit so they can be pushed without reloading
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        trade = Trade(
+            ticker=req.ticker,
+            direction=req.direction,
+            entry_price=entry_price,
+            stop_loss=req.stop_loss,
+            take_profit=req.take_profit,
+            amount=req.amount,
+            status="Open"
+        )
+        db.add(trade)
+        db.commit()
+        return trade
+    finally:
+        db.close()
+
 @app.get("/trades/active")
-def get_active_trades(db: Session = Depends(get_db)):
-    trades = db.query(Trade).filter(Trade.status == "Open").all()
-    return [
-        {
-            "id": t.id,
-            "ticker": t.ticker,
-            "direction": t.direction,
-            "entry_price": t.entry_price,
-            "amount": t.amount,
-            "created_at": t.created_at
-        } for t in trades
-    ]
+async def get_active_trades(db: AsyncSession = Depends(get_async_db)):
+    # Column-only query: rows come back as tuples, no ORM objects are built
+    result = await db.execute(select(
+        Trade.id, Trade.ticker, Trade.direction, Trade.entry_price, Trade.amount, Trade.created_at
+    ).where(Trade.status == "Open"))
+    return [row._asdict() for row in result]
+
+# ---- paginated feeds ----
+# Newest first; the cursor for the next page is returned in the X-Next-Cursor header
+# (absent on the last page), so the response bodies stay plain lists.
+
+MAX_PAGE_SIZE = 500
+
+TRADE_HISTORY_COLUMNS = {
+    "id": Trade.id, "ticker": Trade.ticker, "direction": Trade.direction,
+    "entry_price": Trade.entry_price, "exit_price": Trade.exit_price,
+    "stop_loss": Trade.stop_loss, "take_profit": Trade.take_profit,
+    "amount": Trade.amount, "pnl": Trade.pnl, "status": Trade.status,
+    "created_at": Trade.created_at, "closed_at": Trade.closed_at,
+}
+
+# Built over the hot table or its UNION ALL with archive partitions (retention.spanning_source)
+def _signal_columns(src) -> dict:
+    return {
+        "id": src.c.id, "ticker": Asset.ticker, "type": src.c.signal_type, "confidence": src.c.confidence,
+        "entry": src.c.entry_price, "sl": src.c.stop_loss, "tp": src.c.take_profit,
+        "created_at": src.c.created_at,
+    }
+
+def _backtest_columns(src) -> dict:
+    return {
+        "strategy": src.c.strategy_name, "ticker": src.c.ticker,
+        "win_rate": src.c.win_rate, "total_trades": src.c.total_trades,
+        "profit_factor": src.c.profit_factor, "total_pnl": src.c.total_pnl,
+        "max_drawdown": src.c.max_drawdown, "run_at": src.c.run_at,
+    }
+
+async def _source(db: AsyncSession, source: str, include_archive: bool, since, until):
+    if not include_archive:
+        return spanning_source(source)
+    months = await db.run_sync(lambda s: archive_months(s, source, since, until))
+    return spanning_source(source, months)
+
+async def _page(db: AsyncSession, response: Response, stmt, columns: dict, time_col, id_col, cursor, limit, fields, since, until):
+    if since is not None:
+        stmt = stmt.where(time_col >= since)
+    if until is not None:
+        stmt = stmt.where(time_col < until)
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    try:
+        stmt, names = keyset_statement(stmt, columns, time_col, id_col, cursor, limit, fields)
+    except (InvalidCursor, InvalidFields) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    rows, next_cursor = keyset_rows((await db.execute(stmt)).all(), names, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 @app.get("/trades/history", response_model=List[dict])
-def get_trade_history(db: Session = Depends(get_db)):
-    trades = db.query(Trade).filter(Trade.status == "Closed").order_by(Trade.closed_at.desc()).all()
-    return [
-        {
-            "id": t.id,
-            "ticker": t.ticker,
-            "direction": t.direction,
-            "entry_price": t.entry_price,
-            "exit_price": t.exit_price,
-            "stop_loss": t.stop_loss,
-            "take_profit": t.take_profit,
-            "amount": t.amount,
-            "pnl": t.pnl,
-            "status": t.status,
-            "created_at": t.created_at,
-            "closed_at": t.closed_at
-        } for t in trades
-    ]
+async def get_trade_history(
+    response: Response, ticker: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None,
+    limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Closed trades, most recently closed first.
+    fields: comma-separated subset of columns; since/until bound closed_at.
+    """
+    stmt = select(Trade).where(Trade.status == "Closed")
+    if ticker:
+        stmt = stmt.where(Trade.ticker == ticker)
+    return await _page(db, response, stmt, TRADE_HISTORY_COLUMNS, Trade.closed_at, Trade.id, cursor, limit, fields, since, until)
 
 @app.post("/trades/close/{trade_id}")
-def close_trade(trade_id: int, db: Session = Depends(get_db)):
-    trade = db.query(Trade).filter(Trade.id == trade_id).first()
-    if not trade or trade.status == "Closed":
+async def close_trade(trade_id: int):
+    ticker = await io_pool.run(_open_trade_ticker, trade_id)
+    if ticker is None:
         raise HTTPException(status_code=404, detail="Trade not found or already closed")
     
-    df = fetch_live_data(trade.ticker, period="1d", interval="1m")
-    if df.empty:
-        df = fetch_live_data(trade.ticker, period="5d", interval="1h")
-        if df.empty:
-             raise HTTPException(status_code=400, detail="Could not fetch current price")
-    
-    exit_price = float(df['close'].iloc[-1])
-    
-    if trade.direction == "buy":
-        pnl = (exit_price - trade.entry_price) * trade.amount
-    else:
-        pnl = (trade.entry_price - exit_price) * trade.amount
+    # No session is held while the price is fetched
+    exit_price = await _current_price(ticker)
     
-    trade.exit_price = exit_price
-    trade.pnl = pnl
-    trade.status = "Closed"
-    trade.closed_at = datetime.utcnow()
-    
-    account = db.query(Account).first()
-    if account:
-        account.balance += pnl
-    
-    db.commit()
+    trade, pnl = await io_pool.run(_close_trade_row, trade_id, exit_price)
+    if trade is None:
+        raise HTTPException(status_code=404, detail="Trade not found or already closed")
+    broker.publish_trade(trade)
     return {"message": "Trade closed", "exit_price": exit_price, "pnl": pnl}
 
+def _open_trade_ticker(trade_id: int) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        return db.query(Trade.ticker).filter(Trade.id == trade_id, Trade.status != "Closed").scalar()
+    finally:
+        db.close()
+
+def _close_trade_row(trade_id: int, exit_price: float):
+    """Close an open trade at exit_price and book its P&L. Returns (trade, pnl), or (None, None) if it is not open."""
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        trade = db.query(Trade).filter(Trade.id == trade_id).first()
+        if not trade or trade.status == "Closed":
+            return None, None
+        
+        if trade.direction == "buy":
+            pnl = (exit_price - trade.entry_price) * trade.amount
+        else:
+            pnl = (trade.entry_price - exit_price) * trade.amount
+        
+        # Only an open trade is closed, so a concurrent close cannot count the trade twice
+        closed = db.query(Trade).filter(Trade.id == trade.id, Trade.status != "Closed").update(
+            {"exit_price": exit_price, "pnl": pnl, "status": "Closed", "closed_at": datetime.utcnow()}
+        )
+        if not closed:
+            db.rollback()
+            return None, None
+        record_close(db, trade.ticker, pnl)
+        
+        account = db.query(Account).first()
+        if account:
+            account.balance += pnl
+        
+        db.commit()
+        return trade, pnl
+    finally:
+        db.close()
+
 @app.get("/signals", response_model=List[dict])
-def get_signals(db: Session = Depends(get_db)):
-    signals = db.query(Signal).order_by(Signal.created_at.desc()).limit(20).all()
-    return [
-        {
-            "ticker": s.asset.ticker,
-            "type": s.signal_type,
-            "confidence": s.confidence,
-            "entry": s.entry_price,
-            "sl": s.stop_loss,
-            "tp": s.take_profit,
-            "created_at": s.created_at
-        } for s in signals
-    ]
+async def get_signals(
+    response: Response, ticker: Optional[str] = None, strategy: Optional[str] = None,
+    since: Optional[datetime] = None, until: Optional[datetime] = None, include_archive: bool = False,
+    limit: int = 20, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Detected signals, newest first.
+    strategy: strategy key (macd, rsi, turtle, ichimoku, ...); since/until bound created_at.
+    include_archive: also read signals moved out by retention (bound since/until to keep it cheap).
+    """
+    src = await _source(db, "signals", include_archive, since, until)
+    # One joined query instead of loading each signal's asset separately
+    stmt = select(src).join(Asset, Asset.id == src.c.asset_id)
+    if ticker:
+        stmt = stmt.where(Asset.ticker == ticker)
+    if strategy:
+        stmt = stmt.where(src.c.strategy == strategy.lower())
+    return await _page(db, response, stmt, _signal_columns(src), src.c.created_at, src.c.id, cursor, limit, fields, since, until)
 
 @app.get("/backtests", response_model=List[dict])
-def get_backtest_results(db: Session = Depends(get_db)):
-    results = db.query(BacktestResult).order_by(BacktestResult.run_at.desc()).limit(50).all()
-    return [
-        {
-            "strategy": r.strategy_name,
-            "ticker": r.ticker,
-            "win_rate": r.win_rate,
-            "total_trades": r.total_trades,
-            "profit_factor": r.profit_factor,
-            "total_pnl": r.total_pnl,
-            "run_at": r.run_at
-        } for r in results
-    ]
+async def get_backtest_results(
+    response: Response, ticker: Optional[str] = None, strategy: Optional[str] = None,
+    since: Optional[datetime] = None, until: Optional[datetime] = None, include_archive: bool = False,
+    limit: int = 50, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stored backtest results, newest first. since/until bound run_at.
+    include_archive: also read results moved out by retention.
+    """
+    src = await _source(db, "backtest_results", include_archive, since, until)
+    stmt = select(src)
+    if ticker:
+        stmt = stmt.where(src.c.ticker == ticker)
+    if strategy:
+        stmt = stmt.where(src.c.strategy_name == strategy)
+    return await _page(db, response, stmt, _backtest_columns(src), src.c.run_at, src.c.id, cursor, limit, fields, since, until)
+
+@app.get("/analytics/signals/monthly")
+def get_monthly_signals(ticker: Optional[str] = None, strategy: Optional[str] = None, db: Session = Depends(get_db)):
+    """Signals per month over the full history, archived months included (from rollups)."""
+    return monthly_signal_summary(db, ticker, strategy)
+
+@app.get("/analytics/backtests/monthly")
+def get_monthly_backtests(ticker: Optional[str] = None, strategy: Optional[str] = None, db: Session = Depends(get_db)):
+    """Backtest runs and average metrics per month over the full history, archived months included."""
+    return monthly_backtest_summary(db, ticker, strategy)
+
+@app.get("/retention/status")
+def get_retention_status(db: Session = Depends(get_db)):
+    """Hot row counts, retention windows and archive partitions per source."""
+    return retention_status(db)
 
 @app.post("/backtests/run")
 def trigger_backtests():
-    run_nightly_backtests()
-    return {"message": "Backtests triggered successfully"}
+    job_id = _submit_job("nightly_backtests", lambda ctx: run_nightly_backtests(on_progress=ctx.progress))
+    return {"message": "Backtests queued", "job_id": job_id}
+
+# ==================== JOB ENDPOINTS ====================
+
+def _submit_job(kind: str, fn, params: dict = None) -> str:
+    try:
+        return job_queue.submit(kind, fn, params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+@app.get("/jobs")
+def list_jobs(limit: int = 20, kind: Optional[str] = None):
+    """List recent background jobs (without results)."""
+    return job_queue.list(limit=min(limit, 100), kind=kind)
+
+@app.get("/metrics")
+def get_metrics():
+    """Route latencies, hot-path timers, cache and upstream counters in Prometheus text format."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def require_profile_admin(x_profile_token: Optional[str] = Header(None), profile_token: Optional[str] = None):
+    if not profiler.is_admin(x_profile_token or profile_token or ""):
+        raise HTTPException(status_code=403, detail="Profiles require a valid PROFILE_TOKEN.")
+
+@app.get("/profiles", dependencies=[Depends(require_profile_admin)])
+def get_profiles(limit: int = 50):
+    """Recently captured request profiles, newest first."""
+    return profiler.list_profiles(min(limit, 200))
+
+@app.get("/profiles/{profile_id}", dependencies=[Depends(require_profile_admin)])
+def get_profile(profile_id: str, format: str = "folded"):
+    """A stored profile as collapsed stacks (folded) or a speedscope JSON document."""
+    if format not in ("folded", "speedscope"):
+        raise HTTPException(status_code=400, detail="format must be 'folded' or 'speedscope'.")
+    try:
+        folded = profiler.load_folded(profile_id)
+        meta = profiler.load_meta(profile_id)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    if format == "folded":
+        return Response(folded, media_type="text/plain; charset=utf-8")
+    name = f"{meta['method']} {meta['path']} ({meta['duration_s']}s)"
+    return profiler.to_speedscope(folded, name, meta["interval_ms"] / 1000)
+
+@app.get("/cache/metrics")
+def get_cache_metrics():
+    """Hit ratio, stale hits and coalesced requests per cached endpoint."""
+    return cache_stats()
+
+@app.websocket("/ws")
+async def websocket_feed(websocket: WebSocket):
+    """Push channel for new signals, trade updates and live bars (see realtime.py)."""
+    await broker.serve(websocket)
+
+@app.get("/realtime/metrics")
+async def get_realtime_metrics():
+    """Connected clients, subscriptions and push/coalescing counters."""
+    return broker.metrics()
+
+@app.get("/admission/metrics")
+def get_admission_metrics():
+    """Per-lane concurrency, queue depth, saturation and shed counts."""
+    return admission.metrics()
+
+@app.get("/startup/report")
+def get_startup_report(limit: int = 30):
+    """App import time, lazily loaded modules and (with IMPORT_PROFILE=1) per-module import times."""
+    return coldstart.startup_report(limit)
+
+@app.get("/pools/metrics")
+def get_pool_metrics():
+    """Concurrency, queue wait and run time of the I/O and CPU offload pools, and DB connection pool usage."""
+    return {**pool_metrics(), "db": db_pool_status()}
+
+@app.get("/jobs/metrics")
+def get_job_metrics():
+    """Queue depth, running jobs and queue-wait / run-time latency."""
+    return job_queue.metrics()
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Poll job status, progress and (once done) the result."""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Job not found or already finished")
+    return {"message": "Cancellation requested", "job_id": job_id}
 
 @app.post("/calculate-risk")
 def calculate_risk(req: RiskRequest):
@@ -238,63 +470,33 @@ def calculate_risk(req: RiskRequest):
         "unit": "Lots" if req.is_forex else "Units"
     }
 
-# Real data fetcher
-import yfinance as yf
-
-def fetch_live_data(ticker: str, period="1mo", interval="1h"):
-    try:
-        yf_ticker = ticker
-        if ticker.endswith("USDT"):
-             yf_ticker = ticker.replace("USDT", "-USD")
-        
-        # Using Ticker.history for a cleaner flat DataFrame
-        ticker_obj = yf.Ticker(yf_ticker)
-        df = ticker_obj.history(period=period, interval=interval)
-        
-        if df.empty:
-            return pd.DataFrame()
-            
-        # Normalize columns to lowercase
-        df.columns = [c.lower() for c in df.columns]
-        
-        # Ensure we have required columns
-        required = ['open', 'high', 'low', 'close']
-        if not all(col in df.columns for col in required):
-            # If columns are named differently (e.g. capitalized), this handles it.
-            # Ticker.history usually returns Capitalized names.
-            return pd.DataFrame()
-            
-        return df
-    except Exception as e:
-        print(f"Error fetching data for {ticker}: {e}")
-        return pd.DataFrame()
-
 @app.get("/history/{ticker}")
-def get_history(ticker: str):
+async def get_history(ticker: str, request: Request, format: str = "rows"):
+    """
+    Daily bars for charting (lightweight-charts format).
+    format: rows (list of bars), columnar ({time: [...], open: [...]}) or arrow.
+    """
+    columns = await history_cache.aget_or_compute(ticker, lambda: io_pool.run(_history_columns, ticker), ttl=_daily_ttl, stale_ttl=60)
+    if columns is None:
+        return []
+    return chart_response(request, columns, format)
+
+def _history_columns(ticker: str):
     # Retrieve real historical data for charting
     df = fetch_live_data(ticker, period="6mo", interval="1d")
-    
     if df.empty:
-        return []
-        
-    # Convert to lightweight-charts format
-    chart_data = []
-    
+        return None
     # yf.download with interval='1d' usually returns DatetimeIndex
-    for index, row in df.iterrows():
-        chart_data.append({
-            "time": index.strftime("%Y-%m-%d"),
-            "open": row['open'],
-            "high": row['high'],
-            "low": row['low'],
-            "close": row['close']
-        })
-    return chart_data
+    return ohlcv_columns(df, df.index)
+
+def _daily_ttl(columns):
+    return interval_ttl("1d") if columns is not None else NEGATIVE_TTL
 
 @app.post("/process-data")
-def process_external_data(req: MarketDataUpload, db: Session = Depends(get_db)):
+async def process_external_data(req: MarketDataUpload):
     """
     Processes external market data and generates signals.
+    Detectors run on the CPU pool and the signals are stored on the io pool, as in /scan.
     """
     if not req.data:
         raise HTTPException(status_code=400, detail="No data provided")
@@ -315,79 +517,164 @@ def process_external_data(req: MarketDataUpload, db: Session = Depends(get_db)):
     if len(df) < 50:
          return {"message": "Not enough data for processing (min 50 candles)", "signals_found": 0}
 
-    signals = detect_divergence(df)
-    signals.extend(detect_macd_cross(df))
-    signals.extend(detect_ichimoku_signals(df))
+    try:
+        bar_time = bar_timestamp(req.data[-1].time)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unrecognized bar time: {req.data[-1].time}")
     
-    asset = db.query(Asset).filter(Asset.ticker == req.ticker).first()
-    if not asset:
-        asset = Asset(ticker=req.ticker, asset_class="Uploaded")
-        db.add(asset)
-        db.commit()
-        db.refresh(asset)
-        
-    for sig in signals:
-        db_sig = Signal(
-            asset_id=asset.id,
-            signal_type=sig["type"],
-            confidence=sig["confidence"],
-            entry_price=sig.get("entry_price", 0.0),
-            stop_loss=sig.get("entry_price", 0.0) * 0.98,
-            take_profit=sig.get("entry_price", 0.0) * 1.05,
-        )
-        db.add(db_sig)
-        
-    db.commit()
+    # Divergence, MACD and Ichimoku; uploaded data carries no sentiment
+    signals = await cpu_pool.run(collect_signals, df, [])
+    await io_pool.run(_save_uploaded_signals, req.ticker, signals, req.timeframe, bar_time)
     return {"message": f"Processed {len(req.data)} bars for {req.ticker}", "signals_found": len(signals), "details": signals}
 
+def _save_uploaded_signals(ticker: str, signals: list, timeframe: str, bar_time) -> int:
+    """Upsert the signals detected on uploaded bars and push them. Returns the row count."""
+    asset_id = asset_ids.resolve([ticker], "Uploaded")[ticker]
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        stored = upsert_signals(db, signal_rows(asset_id, signals, timeframe, bar_time))
+        db.commit()
+    finally:
+        db.close()
+    for db_sig in stored:
+        broker.publish_signal(db_sig, ticker)
+    return len(stored)
+
 # Mock endpoint to trigger signal scan (In production this would be a background task)
 @app.post("/scan/{ticker}")
-def scan_ticker(ticker: str, db: Session = Depends(get_db)):
-    # Fetch Live Data
-    df = fetch_live_data(ticker, period="1mo", interval="1h") 
-    
-    if df.empty or len(df) < 50:
+async def scan_ticker(ticker: str):
+    result = await _scan_one(ticker)
+    if result["status"] == "error":
+        raise HTTPException(status_code=500, detail=result["error"])
+    if result["status"] != "ok":
         return {"message": f"Not enough data found for {ticker}", "signals_found": 0}
+    await io_pool.run(_save_scan_batch, [result])
+    return {"message": f"Scan complete for {ticker}", "signals_found": len(result["signals"]), "details": result["signals"]}
 
-    signals = detect_divergence(df)
-    signals.extend(detect_macd_cross(df))
-    signals.extend(detect_sentiment(ticker))
-    signals.extend(detect_ichimoku_signals(df))
-    
-    asset = db.query(Asset).filter(Asset.ticker == ticker).first()
-    if not asset:
-        asset = Asset(ticker=ticker, asset_class="Mock")
-        db.add(asset)
+class ScanRequest(BaseModel):
+    tickers: List[str]
+    stream: bool = False  # Stream one NDJSON line per ticker as it completes
+
+SCAN_MAX_TICKERS = 200
+SCAN_CONCURRENCY = 8
+SCAN_INTERVAL = "1h"
+
+@app.post("/scan")
+async def scan_tickers(req: ScanRequest):
+    """
+    Scan a list of tickers: data is fetched concurrently (at most SCAN_CONCURRENCY
+    at a time), detectors run on the CPU pool, and all signals are stored in
+    one transaction. Results carry per-ticker timings.
+    """
+    tickers = list(dict.fromkeys(t.strip() for t in req.tickers if t.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="No tickers provided")
+    if len(tickers) > SCAN_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {SCAN_MAX_TICKERS} tickers per scan")
+    
+    started = time.perf_counter()
+    limit = asyncio.Semaphore(SCAN_CONCURRENCY)
+    
+    async def scan_limited(ticker):
+        async with limit:
+            return await _scan_one(ticker)
+    
+    tasks = [asyncio.ensure_future(scan_limited(t)) for t in tickers]
+    
+    async def finish(results):
+        stored = await io_pool.run(_save_scan_batch, results)
+        return {
+            "tickers": len(tickers),
+            "signals_found": sum(len(r["signals"]) for r in results),
+            "signals_stored": stored,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+    
+    if req.stream:
+        async def lines():
+            results = []
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    result = await next_done
+                    results.append(result)
+                    yield json.dumps(jsonable_encoder(result)) + "\n"
+                yield json.dumps({"summary": await finish(results)}) + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    results = await asyncio.gather(*tasks)
+    return {"results": results, **(await finish(results))}
+
+async def _scan_one(ticker: str) -> dict:
+    """Fetch, detect and time one ticker; failures are reported, not raised."""
+    t0 = time.perf_counter()
+    result = {"ticker": ticker, "status": "ok", "signals": []}
+    try:
+        # Fetch Live Data
+        df = await io_pool.run(fetch_live_data, ticker, period="1mo", interval=SCAN_INTERVAL)
+        t1 = time.perf_counter()
+        result["fetch_ms"] = round((t1 - t0) * 1000, 1)
+        if df.empty or len(df) < 50:
+            result["status"] = "insufficient_data"
+        else:
+            result["bar_time"] = df.index[-1]
+            sentiment = await detect_sentiment_async(ticker)
+            result["signals"] = await cpu_pool.run(collect_signals, df, sentiment)
+            result["detect_ms"] = round((time.perf_counter() - t1) * 1000, 1)
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["total_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return result
+
+def _save_scan_batch(results: list) -> int:
+    """
+    Upsert the signals of scan results in one transaction. Signals already
+    stored for the same bar are refreshed, not duplicated. Returns the row count.
+    """
+    results = [r for r in results if r["signals"]]
+    if not results:
+        return 0
+    ids = asset_ids.resolve([r["ticker"] for r in results], "Mock")
+    rows = [row for r in results for row in signal_rows(ids[r["ticker"]], r["signals"], SCAN_INTERVAL, r["bar_time"])]
+    
+    # Objects stay loaded after commit so they can be pushed without reloading
+    db = SessionLocal(expire_on_commit=False)
+    try:
+        stored = upsert_signals(db, rows)
         db.commit()
-        db.refresh(asset)
-        
-    for sig in signals:
-        # Avoid duplicates logic (omitted for brevity)
-        db_sig = Signal(
-            asset_id=asset.id,
-            signal_type=sig["type"],
-            confidence=sig["confidence"],
-            entry_price=sig.get("entry_price", 0.0),
-            stop_loss=sig.get("entry_price", 0.0) * 0.98, # Mock SL
-            take_profit=sig.get("entry_price", 0.0) * 1.05, # Mock TP
-        )
-        db.add(db_sig)
-        
-    db.commit()
-    return {"message": f"Scan complete for {ticker}", "signals_found": len(signals), "details": signals}
+    finally:
+        db.close()
+    
+    tickers = {asset_id: t for t, asset_id in ids.items()}
+    for db_sig in stored:
+        broker.publish_signal(db_sig, tickers[db_sig.asset_id])
+    return len(stored)
+
 @app.get("/analysis/suggestion/{ticker}")
-def get_analysis_suggestion(ticker: str):
+async def get_analysis_suggestion(ticker: str):
     """
     Returns a high-conviction trade setup based on Titan strategies.
+    Cached until the next 15m bar; concurrent requests share one computation.
     """
+    return await suggestion_cache.aget_or_compute(ticker, lambda: _build_suggestion(ticker), ttl=lambda _: interval_ttl("15m"), stale_ttl=60)
+
+def _suggestion_bars(ticker: str) -> pd.DataFrame:
     df = fetch_live_data(ticker, period="1mo", interval="15m") 
     if df.empty:
         df = fetch_live_data(ticker, period="1mo", interval="1h")
+    return df
+
+async def _build_suggestion(ticker: str):
+    # Bars and news are fetched concurrently; the analysis runs on the CPU pool
+    df, sentiment = await asyncio.gather(io_pool.run(_suggestion_bars, ticker), detect_sentiment_async(ticker))
         
     if df.empty:
         raise HTTPException(status_code=404, detail="No data found for asset")
         
-    suggestion = generate_pro_analysis(ticker, df)
+    suggestion = await cpu_pool.run(generate_pro_analysis, ticker, df, sentiment)
     if not suggestion:
         return {"ticker": ticker, "recommendation": "NEUTRAL", "reasoning": "Waiting for high-conviction pattern convergence."}
     
@@ -412,48 +699,82 @@ class BacktestRequest(BaseModel):
     strategy: str = "MACD_Cross"  # MACD_Cross, RSI_Divergence, Turtle_Breakout, Ichimoku
     initial_capital: float = 10000.0
     asset_type: str = "CS"  # CS = Common Stock, ADRC = ADR
+    include_rolling: bool = False  # Add rolling 63/252-bar metrics to the response
 
 @app.get("/algo-dash/tickers")
-def get_algo_dash_tickers():
-    """Get list of available tickers for Algo Dash."""
-    tickers = get_available_tickers()
-    # Limit to first 500 for performance
+def get_algo_dash_tickers(q: str = "", asset_type: Optional[str] = None, limit: int = 100, cursor: Optional[str] = None):
+    """
+    Search the ticker catalogue for Algo Dash.
+    q: case-insensitive symbol prefix (typeahead); asset_type: comma-separated filter
+    (CS, ADRC, ETF, PFD, WARRANT, delisted, ...). Pass next_cursor back as cursor for the next page.
+    """
+    index = get_ticker_index()
+    asset_types = [t.strip() for t in asset_type.split(",") if t.strip()] if asset_type else None
+    try:
+        page = index.search(q, asset_types, limit=min(max(limit, 1), 1000), cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
-        "tickers": tickers[:500],
-        "total": len(tickers),
+        **page,
+        "total": len(index),
+        "asset_types": index.asset_type_counts(),
         "strategies": ["MACD_Cross", "RSI_Divergence", "Turtle_Breakout", "Ichimoku"]
     }
 
 @app.get("/algo-dash/historical/{ticker}")
-def get_algo_dash_historical(ticker: str, asset_type: str = "CS"):
-    """Get historical OHLCV data for charting."""
+async def get_algo_dash_historical(ticker: str, request: Request, asset_type: str = "CS", format: str = "rows"):
+    """
+    Get historical OHLCV data for charting.
+    format: rows (list of bars), columnar ({time: [...], open: [...]}) or arrow.
+    """
     try:
-        df = load_historical_data(ticker, asset_type=asset_type)
-        
-        # Convert to chart-friendly format
-        chart_data = []
-        for _, row in df.iterrows():
-            chart_data.append({
-                "time": row["timestamp"].strftime("%Y-%m-%d"),
-                "open": float(row["open"]),
-                "high": float(row["high"]),
-                "low": float(row["low"]),
-                "close": float(row["close"]),
-                "volume": float(row["volume"]) if pd.notna(row["volume"]) else 0
-            })
-        
-        return {"ticker": ticker, "data": chart_data}
+        df = await io_pool.run(load_historical_data, ticker, asset_type=asset_type)
+        columns = ohlcv_columns(df, df["timestamp"], fields=("open", "high", "low", "close", "volume"))
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Data not found for {ticker}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    return chart_response(request, columns, format, envelope={"ticker": ticker})
 
 @app.post("/algo-dash/run-backtest")
-def run_algo_backtest(req: BacktestRequest, db: Session = Depends(get_db)):
+async def run_algo_backtest(req: BacktestRequest):
     """
     Run a backtest on historical data using specified strategy.
     Returns equity curve, trades, and Tidy Finance metrics.
     """
+    df = await io_pool.run(_load_backtest_data, req)
+    report = await cpu_pool.run(backtest_report, df, req.strategy, req.initial_capital, req.include_rolling)
+    await io_pool.run(_save_backtest_result, req, report["record"])
+    return {"ticker": req.ticker, **report["response"]}
+
+@app.post("/algo-dash/backtest-jobs")
+def submit_algo_backtest(req: BacktestRequest):
+    """
+    Queue a backtest as a background job. Poll /jobs/{job_id} for progress and the result.
+    """
+    def job(ctx):
+        db = SessionLocal()
+        try:
+            return _execute_algo_backtest(req, db, on_progress=ctx.progress)
+        finally:
+            db.close()
+    
+    job_id = _submit_job("algo_backtest", job, dict(req))
+    return {"message": "Backtest queued", "job_id": job_id}
+
+def _execute_algo_backtest(req: BacktestRequest, db: Session, on_progress=None) -> dict:
+    # on_progress (a job's ctx.progress) may raise between stages to cancel the run; a cancelled run saves nothing
+    report_progress = on_progress or (lambda fraction: None)
+    report_progress(0.0)
+    df = _load_backtest_data(req)
+    report_progress(0.1)
+    report = backtest_report(df, req.strategy, req.initial_capital, req.include_rolling, on_progress=report_progress)
+    report_progress(0.95)
+    _save_backtest_result(req, report["record"], db)
+    return {"ticker": req.ticker, **report["response"]}
+
+def _load_backtest_data(req: BacktestRequest) -> pd.DataFrame:
     try:
         df = load_historical_data(req.ticker, asset_type=req.asset_type)
     except FileNotFoundError:
@@ -461,147 +782,56 @@ def run_algo_backtest(req: BacktestRequest, db: Session = Depends(get_db)):
     
     if len(df) < 50:
         raise HTTPException(status_code=400, detail="Not enough data for backtesting (min 50 bars)")
+    return df
+
+def _save_backtest_result(req: BacktestRequest, record: dict, db: Session = None):
+    # Save backtest result to database
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        db.add(BacktestResult(ticker=req.ticker, strategy_name=req.strategy, **record))
+        db.commit()
+    finally:
+        if own_session:
+            db.close()
+
+class MonteCarloRequest(BacktestRequest):
+    method: str = "trades"  # trades = resample trade P&L, block = block-bootstrap daily returns
+    n_paths: int = 10000
+    block_size: int = 20
+    confidence: float = 0.95
+    seed: int = 42
+
+@app.post("/algo-dash/monte-carlo")
+async def run_algo_monte_carlo(req: MonteCarloRequest):
+    """
+    Monte Carlo robustness analysis of a strategy backtest.
+    Returns distributions and confidence intervals for final equity, max drawdown and Sharpe.
+    """
+    if req.method not in ("trades", "block"):
+        raise HTTPException(status_code=400, detail="Invalid method. Use 'trades' or 'block'.")
+    if not 1 <= req.n_paths <= 100000:
+        raise HTTPException(status_code=400, detail="n_paths must be between 1 and 100000")
+    if not 0 < req.confidence < 1:
+        raise HTTPException(status_code=400, detail="confidence must be between 0 and 1")
     
-    # Run backtest
-    capital = req.initial_capital
-    equity_curve = [{"time": df.iloc[0]["timestamp"].strftime("%Y-%m-%d"), "value": capital}]
-    trades = []
-    position = None
-    running_max = capital
-    max_drawdown = 0
-    
-    # Calculate indicators based on strategy
-    df = df.reset_index(drop=True)
-    
-    if req.strategy == "MACD_Cross":
-        df["ema12"] = df["close"].ewm(span=12).mean()
-        df["ema26"] = df["close"].ewm(span=26).mean()
-        df["macd"] = df["ema12"] - df["ema26"]
-        df["signal"] = df["macd"].ewm(span=9).mean()
-        df["signal_buy"] = (df["macd"] > df["signal"]) & (df["macd"].shift(1) <= df["signal"].shift(1))
-        df["signal_sell"] = (df["macd"] < df["signal"]) & (df["macd"].shift(1) >= df["signal"].shift(1))
-    elif req.strategy == "RSI_Divergence":
-        delta = df["close"].diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        df["rsi"] = 100 - (100 / (1 + rs))
-        df["signal_buy"] = df["rsi"] < 30
-        df["signal_sell"] = df["rsi"] > 70
-    elif req.strategy == "Turtle_Breakout":
-        df["high_20"] = df["high"].rolling(20).max()
-        df["low_20"] = df["low"].rolling(20).min()
-        df["signal_buy"] = df["close"] > df["high_20"].shift(1)
-        df["signal_sell"] = df["close"] < df["low_20"].shift(1)
-    else:  # Ichimoku
-        df["tenkan"] = (df["high"].rolling(9).max() + df["low"].rolling(9).min()) / 2
-        df["kijun"] = (df["high"].rolling(26).max() + df["low"].rolling(26).min()) / 2
-        df["signal_buy"] = (df["tenkan"] > df["kijun"]) & (df["tenkan"].shift(1) <= df["kijun"].shift(1))
-        df["signal_sell"] = (df["tenkan"] < df["kijun"]) & (df["tenkan"].shift(1) >= df["kijun"].shift(1))
-    
-    # Simulate trades
-    for i in range(50, len(df)):
-        row = df.iloc[i]
-        
-        # Entry logic
-        if position is None:
-            if row.get("signal_buy", False):
-                position = {
-                    "entry_price": row["close"],
-                    "entry_time": row["timestamp"].strftime("%Y-%m-%d"),
-                    "direction": "long"
-                }
-        else:
-            # Exit logic
-            exit_trade = False
-            if row.get("signal_sell", False):
-                exit_trade = True
-            
-            # Simple stop-loss (5%) and take-profit (10%)
-            if position["direction"] == "long":
-                pnl_pct = (row["close"] - position["entry_price"]) / position["entry_price"]
-                if pnl_pct <= -0.05 or pnl_pct >= 0.10:
-                    exit_trade = True
-            
-            if exit_trade:
-                pnl_pct = (row["close"] - position["entry_price"]) / position["entry_price"]
-                pnl_dollars = capital * 0.1 * pnl_pct  # 10% position size
-                capital += pnl_dollars
-                
-                trades.append({
-                    "entry_time": position["entry_time"],
-                    "exit_time": row["timestamp"].strftime("%Y-%m-%d"),
-                    "entry_price": position["entry_price"],
-                    "exit_price": row["close"],
-                    "pnl": round(pnl_dollars, 2),
-                    "pnl_pct": round(pnl_pct * 100, 2),
-                    "direction": position["direction"]
-                })
-                position = None
-        
-        # Track equity curve
-        equity_curve.append({
-            "time": row["timestamp"].strftime("%Y-%m-%d"),
-            "value": round(capital, 2)
-        })
-        
-        # Track max drawdown
-        running_max = max(running_max, capital)
-        drawdown = (running_max - capital) / running_max
-        max_drawdown = max(max_drawdown, drawdown)
-    
-    # Calculate Tidy Finance metrics
-    returns = []
-    for i in range(1, len(equity_curve)):
-        prev = equity_curve[i-1]["value"]
-        curr = equity_curve[i]["value"]
-        if prev > 0:
-            returns.append((curr - prev) / prev)
-    
-    returns_arr = np.array(returns)
-    total_return = (capital - req.initial_capital) / req.initial_capital
-    ann_return = np.mean(returns_arr) * 252 if len(returns_arr) > 0 else 0
-    ann_volatility = np.std(returns_arr) * np.sqrt(252) if len(returns_arr) > 0 else 0
-    sharpe_ratio = ann_return / ann_volatility if ann_volatility > 0 else 0
-    
-    # Win rate and profit factor
-    wins = [t for t in trades if t["pnl"] > 0]
-    losses = [t for t in trades if t["pnl"] < 0]
-    win_rate = len(wins) / len(trades) * 100 if trades else 0
-    total_wins = sum(t["pnl"] for t in wins)
-    total_losses = abs(sum(t["pnl"] for t in losses))
-    profit_factor = total_wins / total_losses if total_losses > 0 else float('inf')
+    df = await io_pool.run(_load_backtest_data, req)
     
-    # Save backtest result to database
-    result = BacktestResult(
-        ticker=req.ticker,
-        strategy_name=req.strategy,
-        win_rate=win_rate,
-        total_trades=len(trades),
-        profit_factor=min(profit_factor, 999),  # Cap for DB
-        total_pnl=capital - req.initial_capital,
-        max_drawdown=max_drawdown
-    )
-    db.add(result)
-    db.commit()
+    try:
+        report = await cpu_pool.run(
+            monte_carlo_report, df, req.strategy, req.initial_capital,
+            req.method, req.n_paths, req.block_size, req.confidence, req.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "ticker": req.ticker,
         "strategy": req.strategy,
+        "method": req.method,
+        "seed": req.seed,
         "initial_capital": req.initial_capital,
-        "final_capital": round(capital, 2),
-        "total_return_pct": round(total_return * 100, 2),
-        "metrics": {
-            "sharpe_ratio": round(sharpe_ratio, 2),
-            "max_drawdown_pct": round(max_drawdown * 100, 2),
-            "win_rate_pct": round(win_rate, 2),
-            "profit_factor": round(min(profit_factor, 999), 2),
-            "total_trades": len(trades),
-            "ann_return_pct": round(ann_return * 100, 2),
-            "ann_volatility_pct": round(ann_volatility * 100, 2)
-        },
-        "equity_curve": equity_curve,
-        "trades": trades[-20:]  # Return last 20 trades
+        **report
     }
 
 @app.get("/algo-dash/ticker-summary/{ticker}")
@@ -609,82 +839,4 @@ def get_ticker_summary(ticker: str, asset_type: str = "CS"):
     """Get summary statistics for a ticker."""
     return get_ticker_data_summary(ticker, asset_type)
 
-# ==================== EXECUTION ENDPOINTS ====================
-
-@app.get("/execution/status")
-def get_execution_status():
-    """Get current execution engines status."""
-    return execution_manager.get_status()
-
-@app.post("/execution/platform")
-def set_execution_platform(platform: str):
-    """Switch active trading platform (mt5/alpaca)."""
-    success = execution_manager.set_active_platform(platform)
-    if not success:
-        raise HTTPException(status_code=400, detail="Invalid platform. Use 'mt5' or 'alpaca'.")
-    return {"message": f"Platform switched to {platform}"}
-
-class TradeRequest(BaseModel):
-    symbol: str
-    side: str  # buy/sell
-    volume: float
-    price: Optional[float] = None
-    sl: Optional[float] = None
-    tp: Optional[float] = None
-
-@app.post("/execution/trade")
-def execute_trade(req: TradeRequest):
-    """Execute a trade on the active platform."""
-    result = execution_manager.execute_trade(
-        req.symbol, req.side, req.volume, req.price, req.sl, req.tp
-    )
-    if not result:
-        raise HTTPException(status_code=500, detail="Trade execution failed.")
-    return {"message": "Trade executed", "result": result}
-
-@app.get("/execution/positions")
-def get_execution_positions():
-    """Get active positions from the current platform."""
-    return execution_manager.get_positions()
-
-@app.post("/execution/close/{ticket_or_symbol}")
-def close_execution_position(ticket_or_symbol: str):
-    """Close an active position."""
-    # Try as integer first (MT5 ticket)
-    try:
-        val = int(ticket_or_symbol)
-    except ValueError:
-        val = ticket_or_symbol
-        
-    success = execution_manager.close_position(val)
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to close position.")
-    return {"message": "Position closed successfully"}
-
-# ==================== ANALYSIS ENDPOINTS ====================
-
-@app.post("/analysis/alpha/{strategy_type}")
-def run_alpha_analysis(strategy_type: str, db: Session = Depends(get_db)):
-    """Run Alphalens analysis on a specific strategy type."""
-    # 1. Fetch signals for this strategy
-    signals = db.query(Signal).filter(Signal.signal_type.contains(strategy_type)).all()
-    if not signals:
-        raise HTTPException(status_code=404, detail="No signals found for this strategy.")
-    
-    # 2. Convert to factor DF
-    signals_df = FactorConverter.signals_to_factor_df(signals)
-    
-    # 3. Fetch historical prices
-    tickers = list(signals_df['asset'].unique())
-    start_date = signals_df['date'].min().strftime('%Y-%m-%d')
-    end_date = (signals_df['date'].max() + timedelta(days=10)).strftime('%Y-%m-%d')
-    
-    prices_df = AlphaDataBridge.fetch_historical_prices(tickers, start_date, end_date)
-    
-    if prices_df.empty:
-        raise HTTPException(status_code=500, detail="Failed to fetch historical prices for analysis.")
-    
-    # 4. Run Analysis
-    results = alpha_analyzer.run_full_analysis(signals_df, prices_df)
-    
-    return results
+coldstart.mark_app_import_done()
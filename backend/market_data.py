@@ -0,0 +1,247 @@
+"""
+Market Data Provider with an incremental bar cache.
+
+Live bars are kept per (symbol, interval) in memory and on disk. The first
+request for a window fetches it in full; later requests only fetch bars from
+the last cached timestamp onwards and merge them in place (the last bar is
+re-fetched because it may still be forming).
+
+The upstream is pluggable: YFinanceSource is the default, and
+StaticSource serves local DataFrames for tests and offline use.
+"""
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from . import metrics
+
+REQUIRED_COLUMNS = ["open", "high", "low", "close"]
+
+# Serverless file systems are read-only except /tmp
+DEFAULT_CACHE_DIR = "/tmp/smark_bars" if os.getenv("VERCEL") else str(Path(__file__).parent.parent / ".cache" / "bars")
+CACHE_DIR = Path(os.getenv("MARKET_DATA_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+# Skip the upstream entirely if the key was refreshed this recently
+MIN_REFRESH_SECONDS = float(os.getenv("MARKET_DATA_MIN_REFRESH", "15"))
+
+# Cap on bars kept per (symbol, interval)
+MAX_CACHED_BARS = 20000
+
+bar_requests = metrics.counter("smark_market_data_requests_total", "Bar cache lookups: full fetch, delta top-up or served from cache.", ("result",))
+
+PERIODS = {
+    "1d": pd.Timedelta(days=1),
+    "5d": pd.Timedelta(days=5),
+    "1mo": pd.Timedelta(days=31),
+    "3mo": pd.Timedelta(days=92),
+    "6mo": pd.Timedelta(days=183),
+    "1y": pd.Timedelta(days=366),
+    "2y": pd.Timedelta(days=731),
+    "5y": pd.Timedelta(days=1827),
+    "10y": pd.Timedelta(days=3653),
+}
+
+INTERVALS = {
+    "1m": pd.Timedelta(minutes=1),
+    "2m": pd.Timedelta(minutes=2),
+    "5m": pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+    "30m": pd.Timedelta(minutes=30),
+    "60m": pd.Timedelta(hours=1),
+    "90m": pd.Timedelta(minutes=90),
+    "1h": pd.Timedelta(hours=1),
+    "1d": pd.Timedelta(days=1),
+    "5d": pd.Timedelta(days=5),
+    "1wk": pd.Timedelta(weeks=1),
+    "1mo": pd.Timedelta(days=30),
+    "3mo": pd.Timedelta(days=91),
+}
+
+
+def normalize_symbol(ticker: str) -> str:
+    """Map app tickers to yfinance symbols (BTCUSDT -> BTC-USD)."""
+    if ticker.endswith("USDT"):
+        return ticker.replace("USDT", "-USD")
+    return ticker
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Lowercase columns and require OHLC; returns an empty frame if unusable."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    df.columns = [c.lower() for c in df.columns]
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        return pd.DataFrame()
+    return df
+
+
+def _as_utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class YFinanceSource:
+    """Fetch bars from yfinance by period or from a start timestamp."""
+
+    def fetch(self, symbol: str, interval: str, period: str = None, start=None) -> pd.DataFrame:
+        import yfinance as yf
+        ticker_obj = yf.Ticker(normalize_symbol(symbol))
+        with metrics.upstream("yfinance"):
+            if start is not None:
+                df = ticker_obj.history(start=start, interval=interval)
+            else:
+                df = ticker_obj.history(period=period, interval=interval)
+        return normalize_bars(df)
+
+
+class StaticSource:
+    """Serve bars from local DataFrames keyed by (symbol, interval). Used by tests."""
+
+    def __init__(self, frames: dict = None):
+        self.frames = frames or {}
+        self.calls = []
+
+    def fetch(self, symbol: str, interval: str, period: str = None, start=None) -> pd.DataFrame:
+        self.calls.append((symbol, interval, period, start))
+        df = normalize_bars(self.frames.get((symbol, interval)))
+        if df.empty:
+            return df
+        if start is not None:
+            return df[df.index >= start]
+        if period in PERIODS:
+            return df[df.index > df.index[-1] - PERIODS[period]]
+        return df
+
+
+class _Entry:
+    __slots__ = ("bars", "covered_from", "fetched_at")
+
+    def __init__(self, bars: pd.DataFrame, covered_from, fetched_at: float):
+        self.bars = bars
+        self.covered_from = covered_from  # earliest UTC time the cache is complete from (None = full history)
+        self.fetched_at = fetched_at
+
+
+class MarketDataProvider:
+    def __init__(self, source=None, cache_dir: Path = CACHE_DIR, min_refresh_seconds: float = MIN_REFRESH_SECONDS):
+        self.source = source or YFinanceSource()
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.min_refresh_seconds = min_refresh_seconds
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def set_source(self, source):
+        """Swap the upstream source and drop cached bars."""
+        with self._lock:
+            self.source = source
+            self._entries.clear()
+
+    def _key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _cache_path(self, symbol: str, interval: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9.\-]", "_", symbol)
+        return self.cache_dir / f"{safe}__{interval}.pkl"
+
+    def _load(self, symbol: str, interval: str):
+        if self.cache_dir is None:
+            return None
+        path = self._cache_path(symbol, interval)
+        if not path.exists():
+            return None
+        try:
+            data = pd.read_pickle(path)
+            return _Entry(data["bars"], data["covered_from"], data.get("fetched_at", 0.0))
+        except Exception as e:
+            print(f"Ignoring unreadable bar cache {path}: {e}")
+            return None
+
+    def _save(self, symbol: str, interval: str, entry: _Entry):
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._cache_path(symbol, interval)
+            tmp = path.with_suffix(".tmp")
+            pd.to_pickle({"bars": entry.bars, "covered_from": entry.covered_from, "fetched_at": entry.fetched_at}, tmp)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not write bar cache for {symbol} {interval}: {e}")
+
+    @staticmethod
+    def _merge(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+        if old is None or old.empty:
+            merged = new
+        elif new.empty:
+            merged = old
+        else:
+            merged = pd.concat([old, new])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        return merged.iloc[-MAX_CACHED_BARS:]
+
+    def get_bars(self, symbol: str, period: str = "1mo", interval: str = "1h") -> pd.DataFrame:
+        """
+        Bars for the last `period` of `interval` bars, topped up incrementally.
+        Returns an empty DataFrame if nothing is available.
+        """
+        key = (symbol, interval)
+        window = PERIODS.get(period)
+        now = pd.Timestamp.now(tz="UTC")
+
+        with self._key_lock(key):
+            entry = self._entries.get(key) or self._load(symbol, interval)
+            if entry is not None and (entry.bars.empty or (window is not None and _as_utc(entry.bars.index[-1]) < now - window)):
+                # Too stale for a delta top-up: the gap would exceed the window itself
+                entry = None
+            needs_full = (
+                entry is None
+                or (window is None and entry.covered_from is not None)
+                or (window is not None and entry.covered_from is not None and entry.covered_from > now - window)
+            )
+
+            if needs_full:
+                bar_requests.inc("full")
+                bars = self.source.fetch(symbol, interval, period=period)
+                if bars.empty:
+                    return pd.DataFrame()
+                covered_from = None if window is None else now - window
+                if entry is not None and covered_from is not None:
+                    covered_from = min(covered_from, entry.covered_from)
+                entry = _Entry(self._merge(entry.bars if entry else None, bars), covered_from, time.time())
+                self._save(symbol, interval, entry)
+            elif time.time() - entry.fetched_at >= self.min_refresh_seconds:
+                # Delta top-up from the last cached bar (it may still be forming)
+                bar_requests.inc("delta")
+                delta = self.source.fetch(symbol, interval, start=entry.bars.index[-1])
+                entry = _Entry(self._merge(entry.bars, delta), entry.covered_from, time.time())
+                if not delta.empty:
+                    self._save(symbol, interval, entry)
+            else:
+                bar_requests.inc("cached")
+
+            self._entries[key] = entry
+            bars = entry.bars
+
+        if window is not None:
+            # Anchor the window on the last bar so closed markets still return the last session
+            bars = bars[bars.index > bars.index[-1] - window]
+        return bars.copy()
+
+
+market_data = MarketDataProvider()
+
+
+def fetch_live_data(ticker: str, period="1mo", interval="1h") -> pd.DataFrame:
+    """Fetch market data through the shared cached provider (empty DataFrame on failure)."""
+    try:
+        return market_data.get_bars(ticker, period=period, interval=interval)
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,278 @@
+"""
+Process-wide metrics in the Prometheus text exposition format.
+
+- MetricsMiddleware records a latency histogram per (method, route template,
+  status) for every HTTP request.
+- timer(name) / timed(name) time named hot paths (data loading, detectors,
+  sentiment, backtest simulation, DB flushes) into smark_timer_seconds.
+- upstream(service) counts and times calls to external services.
+- Existing stats (response caches, offload pools, job queue, WebSocket
+  broker) are read by collectors only when /metrics is scraped.
+
+Recording is a dict lookup and a few additions under a lock, so an idle
+process pays nothing. Observations made in process-pool workers are drained
+after each task and merged into the parent (see offload.py).
+"""
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; covers sub-millisecond detectors up to minute-long backtests
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_metrics = {}  # name -> Counter | Histogram
+_collectors = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        with _lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def _drain(self):
+        values, self._values = self._values, {}
+        return values
+
+    def _merge(self, values):
+        for labels, value in values.items():
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def _render(self):
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_label_str(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with _lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def _drain(self):
+        values, self._values = self._values, {}
+        return values
+
+    def _merge(self, values):
+        for labels, other in values.items():
+            state = self._values.get(labels)
+            if state is None:
+                self._values[labels] = list(other)
+            else:
+                for i, v in enumerate(other):
+                    state[i] += v
+
+    def _render(self):
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_label_str(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_label_str(self.labelnames, labels)} {_format_value(state[-1])}"
+            yield f"{self.name}_count{_label_str(self.labelnames, labels)} {cumulative}"
+
+
+def _register(cls, name, help, labelnames, **kwargs):
+    with _lock:
+        metric = _metrics.get(name)
+        if metric is None:
+            metric = _metrics[name] = cls(name, help, labelnames, **kwargs)
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} is already registered with a different type or labels")
+        return metric
+
+
+def counter(name: str, help: str, labelnames=()) -> Counter:
+    return _register(Counter, name, help, labelnames)
+
+
+def histogram(name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, help, labelnames, buckets=buckets)
+
+
+def register_collector(fn):
+    """
+    fn() is called at scrape time and returns (name, kind, help, samples)
+    tuples, samples being (labels dict, value) pairs.
+    """
+    _collectors.append(fn)
+    return fn
+
+
+# ---- named timers and upstream calls ----
+
+timer_seconds = histogram("smark_timer_seconds", "Time spent in named hot paths.", ("timer",))
+timer_errors = counter("smark_timer_errors_total", "Named hot paths that raised.", ("timer",))
+upstream_seconds = histogram("smark_upstream_request_duration_seconds", "Latency of calls to external services.", ("service",))
+upstream_requests = counter("smark_upstream_requests_total", "Calls to external services by outcome.", ("service", "outcome"))
+
+
+@contextmanager
+def timer(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        timer_errors.inc(name)
+        raise
+    finally:
+        timer_seconds.observe(time.perf_counter() - started, name)
+
+
+def timed(name: str):
+    """Decorator form of timer(); works on plain and async functions."""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with timer(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def upstream(service: str):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        upstream_seconds.observe(time.perf_counter() - started, service)
+        upstream_requests.inc(service, outcome)
+
+
+# ---- HTTP middleware ----
+
+http_seconds = histogram("smark_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"))
+http_in_flight = {"value": 0}
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; labels requests by route template to keep cardinality bounded."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with _lock:
+            http_in_flight["value"] += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            with _lock:
+                http_in_flight["value"] -= 1
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+            http_seconds.observe(time.perf_counter() - started, scope["method"], template, str(status))
+
+
+@register_collector
+def _http_collector():
+    yield "smark_http_requests_in_flight", "gauge", "HTTP requests currently being served.", [({}, http_in_flight["value"])]
+
+
+# ---- worker processes ----
+
+def drain() -> dict:
+    """Take (and reset) everything recorded in this process since the last drain."""
+    with _lock:
+        return {name: metric._drain() for name, metric in _metrics.items() if metric._values}
+
+
+def merge(snapshot: dict):
+    """Add observations drained in another process."""
+    with _lock:
+        for name, values in snapshot.items():
+            metric = _metrics.get(name)
+            if metric is not None:
+                metric._merge(values)
+
+
+# ---- exposition ----
+
+def render() -> str:
+    lines = []
+    with _lock:
+        for name, metric in sorted(_metrics.items()):
+            if not metric._values:
+                continue
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric._render())
+    for collector in _collectors:
+        try:
+            families = list(collector())
+        except Exception as e:
+            print(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+            continue
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_label_str(labels.keys(), labels.values())} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
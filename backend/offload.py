@@ -0,0 +1,152 @@
+"""
+Bounded offload pools for async handlers.
+
+Blocking work is dispatched to one of two sized pools so it never runs on
+the event loop or in the threadpool that serves cheap sync routes:
+- io_pool: threads for blocking I/O (yfinance, broker APIs, file reads, DB writes)
+- cpu_pool: processes for CPU-bound analysis and backtests
+
+Each pool's worker count is its concurrency limit. Queue wait (submit to
+start) and run time are recorded per pool and exposed by pool_metrics().
+
+CPU_POOL_KIND=thread runs the CPU pool on threads instead (the default on
+serverless platforms, where worker processes are not available). Functions
+sent to a process pool must be importable module-level functions.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import metrics, profiler
+from .jobs import _latency_summary
+
+IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 2))))
+CPU_POOL_KIND = os.getenv("CPU_POOL_KIND", "thread" if os.getenv("VERCEL") else "process")
+
+
+def _timed_call(fn, args, kwargs, profile_interval=None):
+    # Runs in the worker; wall-clock timestamps are comparable across processes
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result, None
+
+
+def _timed_process_call(fn, args, kwargs, profile_interval=None):
+    # Ship the worker's timer observations (and stack samples of a profiled
+    # request) back to the parent, which cannot see inside the process
+    started = time.time()
+    if profile_interval:
+        result, stacks = profiler.sample_call(fn, args, kwargs, profile_interval)
+    else:
+        result, stacks = fn(*args, **kwargs), None
+    return started, time.time(), result, (metrics.drain(), stacks)
+
+
+class OffloadPool:
+    def __init__(self, name: str, max_workers: int, kind: str = "thread"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown pool kind: {kind}")
+        self.name = name
+        self.max_workers = max_workers
+        self.kind = kind
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0}
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    def _pool(self):
+        # Created lazily so importing the module never starts threads or processes
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    methods = multiprocessing.get_all_start_methods()
+                    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"smark-{self.name}")
+            return self._executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await its result."""
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        with self._lock:
+            self._pending += 1
+            self._counts["submitted"] += 1
+        try:
+            call = _timed_process_call if self.kind == "process" else _timed_call
+            future = self._pool().submit(call, fn, args, kwargs, profiler.active_interval())
+            started, finished, result, worker_data = await asyncio.wrap_future(future, loop=loop)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next call
+            with self._lock:
+                self._executor = None
+            self._record_failure()
+            raise
+        except BaseException:
+            self._record_failure()
+            raise
+        if worker_data is not None:
+            worker_metrics, worker_stacks = worker_data
+            metrics.merge(worker_metrics)
+            profiler.add_worker_stacks(worker_stacks, self.name)
+        with self._lock:
+            self._pending -= 1
+            self._counts["completed"] += 1
+            self._wait_times.append(max(started - submitted, 0.0))
+            self._run_times.append(finished - started)
+        return result
+
+    def _record_failure(self):
+        with self._lock:
+            self._pending -= 1
+            self._counts["failed"] += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "workers": self.max_workers,
+                "in_flight": self._pending,
+                "queued": max(self._pending - self.max_workers, 0),
+                "counts": dict(self._counts),
+                "queue_wait": _latency_summary(self._wait_times),
+                "run_time": _latency_summary(self._run_times),
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+io_pool = OffloadPool("io", IO_WORKERS, "thread")
+cpu_pool = OffloadPool("cpu", CPU_WORKERS, CPU_POOL_KIND)
+
+
+def pool_metrics() -> dict:
+    return {pool.name: pool.metrics() for pool in (io_pool, cpu_pool)}
+
+
+@metrics.register_collector
+def _pool_collector():
+    pools = [(pool.name, pool.metrics()) for pool in (io_pool, cpu_pool)]
+    yield "smark_pool_in_flight", "gauge", "Tasks submitted to an offload pool and not yet finished.", [({"pool": name}, m["in_flight"]) for name, m in pools]
+    yield "smark_pool_queued", "gauge", "Tasks waiting for a free offload worker.", [({"pool": name}, m["queued"]) for name, m in pools]
+    yield "smark_pool_tasks_total", "counter", "Offload tasks by outcome.", [
+        ({"pool": name, "outcome": outcome}, m["counts"][outcome]) for name, m in pools for outcome in ("completed", "failed")
+    ]
+
+
+def shutdown_pools():
+    for pool in (io_pool, cpu_pool):
+        pool.shutdown()
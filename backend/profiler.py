@@ -0,0 +1,305 @@
+"""
+Opt-in sampling profiler for individual requests.
+
+A request is profiled when it carries the admin token (X-Profile-Token header
+or profile_token query parameter) together with an X-Profile: 1 header or
+profile=1 query flag, or at random with probability PROFILE_SAMPLE_RATE for
+the routes in PROFILE_ROUTES. While it runs, a sampler thread records the
+stacks of every busy thread in the process every PROFILE_INTERVAL_MS. Work
+sent to a process pool is sampled inside the worker and merged in (see
+offload.py).
+
+Samples are process-wide: other requests running at the same time show up
+too, each stack rooted at its thread name.
+
+Profiles are written to PROFILE_DIR as collapsed stacks ("<id>.folded",
+readable by flamegraph.pl, speedscope and most flame-graph tools) with a
+small JSON sidecar, and the newest PROFILE_KEEP are kept. The response
+carries an X-Profile-Id header; GET /profiles lists recent profiles and
+GET /profiles/{id}?format=speedscope converts one for speedscope.app.
+
+Without PROFILE_TOKEN or PROFILE_SAMPLE_RATE the middleware is not installed
+at all.
+"""
+import contextvars
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from urllib.parse import parse_qs
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_ROUTES = tuple(r for r in os.getenv("PROFILE_ROUTES", "/algo-dash/run-backtest,/analysis/suggestion").split(",") if r)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+# Concurrent profiled requests; further requests run unprofiled
+PROFILE_MAX_ACTIVE = int(os.getenv("PROFILE_MAX_ACTIVE", "2"))
+
+# Serverless file systems are read-only except /tmp
+DEFAULT_PROFILE_DIR = "/tmp/smark_profiles" if os.getenv("VERCEL") else str(Path(__file__).parent.parent / ".cache" / "profiles")
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", DEFAULT_PROFILE_DIR))
+
+_PROJECT_ROOT = str(Path(__file__).parent.parent)
+
+# Leaf frames of threads that are parked rather than working
+_IDLE_LEAVES = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"), ("queue.py", "get"), ("thread.py", "_worker"),
+    ("connection.py", "_recv"), ("connection.py", "_poll"), ("socket.py", "accept"),
+}
+
+_active = contextvars.ContextVar("smark_active_profile", default=None)
+_active_count = 0
+_active_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _collapse(frame, root: str):
+    leaf = frame.f_code
+    if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class Sampler:
+    """Samples thread stacks at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id  # None samples every thread
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (self.thread_id is not None and ident != self.thread_id):
+                continue
+            stack = _collapse(frame, names.get(ident, f"thread-{ident}"))
+            if stack is not None:
+                self.stacks[stack] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="smark-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+
+def active_interval():
+    """Sampling interval if the current request is being profiled, else None."""
+    profile = _active.get()
+    return profile.interval if profile is not None else None
+
+
+def add_worker_stacks(stacks: dict, pool: str):
+    """Merge stacks sampled inside a pool worker into the current request's profile."""
+    profile = _active.get()
+    if profile is not None and stacks:
+        for stack, count in stacks.items():
+            profile.stacks[f"{pool} worker;{stack}"] += count
+
+
+def sample_call(fn, args, kwargs, interval: float):
+    """Run fn in the current thread while sampling it (used inside pool workers)."""
+    sampler = Sampler(interval, threading.get_ident()).start()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        stacks = sampler.stop()
+    return result, dict(stacks)
+
+
+# ---- storage ----
+
+def _save(profile_id: str, stacks: Counter, meta: dict):
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        folded = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        (PROFILE_DIR / f"{profile_id}.folded").write_text(folded)
+        (PROFILE_DIR / f"{profile_id}.json").write_text(json.dumps(meta))
+        _prune()
+    except OSError as e:
+        print(f"Could not store profile {profile_id}: {e}")
+
+
+def _prune():
+    metas = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in metas[PROFILE_KEEP:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def list_profiles(limit: int = 50) -> list:
+    if not PROFILE_DIR.is_dir():
+        return []
+    metas = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    profiles = []
+    for path in metas[:limit]:
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def _profile_path(profile_id: str, suffix: str) -> Path:
+    # Ids are uuid hex; anything else cannot name a stored profile
+    if not profile_id.isalnum():
+        raise FileNotFoundError(profile_id)
+    return PROFILE_DIR / f"{profile_id}{suffix}"
+
+
+def load_folded(profile_id: str) -> str:
+    return _profile_path(profile_id, ".folded").read_text()
+
+
+def load_meta(profile_id: str) -> dict:
+    return json.loads(_profile_path(profile_id, ".json").read_text())
+
+
+def to_speedscope(folded: str, name: str, interval: float) -> dict:
+    """Convert collapsed stacks to a speedscope "sampled" profile (weights in ms)."""
+    frames, index = [], {}
+    samples, weights = [], []
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        ids = []
+        for label in stack.split(";"):
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            ids.append(index[label])
+        samples.append(ids)
+        weights.append(int(count) * interval * 1000)
+    total = sum(weights)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled", "name": name, "unit": "milliseconds",
+            "startValue": 0, "endValue": total, "samples": samples, "weights": weights,
+        }],
+        "name": name,
+        "exporter": "smark-profiler",
+    }
+
+
+# ---- middleware ----
+
+class _Profile:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+
+
+def _requested(scope) -> tuple:
+    """(opted in via flag, carries a valid admin token)."""
+    headers = dict(scope.get("headers") or [])
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    flag = headers.get(b"x-profile", b"").decode("latin-1") == "1" or query.get("profile", [""])[0] == "1"
+    token = headers.get(b"x-profile-token", b"").decode("latin-1") or query.get("profile_token", [""])[0]
+    return flag, bool(PROFILE_TOKEN) and token == PROFILE_TOKEN
+
+
+def is_admin(token: str) -> bool:
+    return bool(PROFILE_TOKEN) and token == PROFILE_TOKEN
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _active_count
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        flag, admin = _requested(scope)
+        wanted = (flag and admin) or (
+            PROFILE_SAMPLE_RATE > 0 and scope["path"].startswith(PROFILE_ROUTES) and random.random() < PROFILE_SAMPLE_RATE
+        )
+        if wanted:
+            with _active_lock:
+                wanted = _active_count < PROFILE_MAX_ACTIVE
+                if wanted:
+                    _active_count += 1
+        if not wanted:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profile = _Profile(PROFILE_INTERVAL)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        token = _active.set(profile)
+        sampler = Sampler(PROFILE_INTERVAL).start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            profile.stacks.update(sampler.stop())
+            _active.reset(token)
+            with _active_lock:
+                _active_count -= 1
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "trigger": "request" if flag and admin else "sampled",
+                "duration_s": round(duration, 4),
+                "samples": sum(profile.stacks.values()),
+                "interval_ms": PROFILE_INTERVAL * 1000,
+                "created_at": time.time(),
+            }
+            # The response has been sent by now
+            _save(profile_id, profile.stacks, meta)
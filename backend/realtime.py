@@ -0,0 +1,304 @@
+"""
+In-process push channel for live signals, trade updates and bars.
+
+Clients connect to the /ws WebSocket and subscribe to topics per ticker:
+
+    {"action": "subscribe", "topics": ["signals", "trades"], "tickers": ["AAPL"]}
+    {"action": "subscribe", "topics": ["bars"], "tickers": ["BTC-USD"], "interval": "1d"}
+    {"action": "unsubscribe", "topics": ["bars"], "tickers": ["BTC-USD"]}
+
+Omitting "tickers" subscribes to every ticker (not allowed for bars).
+Server messages are {"topic", "ticker", "data"} objects; bar messages also carry
+"interval".
+
+Publishing is thread-safe and cheap when nobody is connected. Each client has
+a bounded outbox: updates to the same bar or trade are coalesced (latest state
+wins), and a client that falls too far behind gets one {"topic": "resync"}
+message instead of the backlog and should refetch over REST.
+
+Bars are polled from the market data provider once per subscribed
+(ticker, interval) on the server, however many clients are listening.
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+
+from . import metrics
+from .market_data import INTERVALS, fetch_live_data
+from .offload import io_pool
+
+TOPICS = ("signals", "trades", "bars")
+ALL_TICKERS = "*"
+
+# Pending messages per client before it is told to resync
+WS_MAX_PENDING = int(os.getenv("WS_MAX_PENDING", "256"))
+# Seconds between server-side bar refreshes
+WS_BAR_INTERVAL = float(os.getenv("WS_BAR_INTERVAL", "15"))
+
+
+def signal_payload(signal, ticker: str) -> dict:
+    """Signal row in the /signals response format."""
+    return {
+        "id": signal.id,
+        "ticker": ticker,
+        "type": signal.signal_type,
+        "confidence": signal.confidence,
+        "entry": signal.entry_price,
+        "sl": signal.stop_loss,
+        "tp": signal.take_profit,
+        "created_at": signal.created_at
+    }
+
+
+def trade_payload(trade) -> dict:
+    return {
+        "id": trade.id,
+        "ticker": trade.ticker,
+        "direction": trade.direction,
+        "entry_price": trade.entry_price,
+        "exit_price": trade.exit_price,
+        "stop_loss": trade.stop_loss,
+        "take_profit": trade.take_profit,
+        "amount": trade.amount,
+        "pnl": trade.pnl,
+        "status": trade.status,
+        "created_at": trade.created_at,
+        "closed_at": trade.closed_at
+    }
+
+
+def _bar_period(interval: str) -> str:
+    # Enough history to contain the latest bar of the interval
+    step = INTERVALS.get(interval)
+    return "1d" if step is not None and step < INTERVALS["1d"] else "1mo"
+
+
+def _last_bar(ticker: str, interval: str):
+    df = fetch_live_data(ticker, period=_bar_period(interval), interval=interval)
+    if df.empty:
+        return None
+    ts = df.index[-1]
+    row = df.iloc[-1]
+    intraday = INTERVALS.get(interval, INTERVALS["1d"]) < INTERVALS["1d"]
+    return {
+        # Same time formats as the chart endpoints: dates for daily bars, epoch seconds intraday
+        "time": int(ts.timestamp()) if intraday else ts.strftime("%Y-%m-%d"),
+        "open": float(row["open"]),
+        "high": float(row["high"]),
+        "low": float(row["low"]),
+        "close": float(row["close"]),
+        "volume": float(row["volume"]) if "volume" in row and row["volume"] == row["volume"] else 0.0
+    }
+
+
+class Subscriber:
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.topics = {topic: set() for topic in TOPICS}  # topic -> tickers (or ALL_TICKERS)
+        self.bar_keys = set()  # (ticker, interval)
+        self.outbox = OrderedDict()
+        self.wakeup = asyncio.Event()
+
+    def wants(self, topic: str, ticker: str, interval: str = None) -> bool:
+        if topic == "bars":
+            return (ticker, interval) in self.bar_keys
+        tickers = self.topics[topic]
+        return ticker in tickers or ALL_TICKERS in tickers
+
+
+class Broker:
+    def __init__(self, max_pending: int = WS_MAX_PENDING, bar_interval: float = WS_BAR_INTERVAL):
+        self.max_pending = max_pending
+        self.bar_interval = bar_interval
+        self._loop = None
+        self._subscribers = set()
+        self._last_bars = {}  # (ticker, interval) -> bar
+        self._bar_task = None
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._stats = {"published": 0, "delivered": 0, "coalesced": 0, "resyncs": 0}
+
+    # ---- publishing (any thread) ----
+
+    def publish(self, topic: str, ticker: str, data: dict, key=None, **extra):
+        """
+        Queue a message for every subscriber of (topic, ticker).
+        key: coalescing key; a pending message with the same key is replaced.
+        """
+        if not self.active:
+            return
+        loop = self._loop
+        if key is None:
+            key = self._next_key("message")
+        message = jsonable_encoder({"topic": topic, "ticker": ticker, **extra, "data": data})
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fanout(topic, ticker, key, message)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._fanout, topic, ticker, key, message)
+
+    @property
+    def active(self) -> bool:
+        """True while at least one client is connected."""
+        return self._loop is not None and bool(self._subscribers)
+
+    def _next_key(self, prefix: str):
+        with self._lock:
+            self._seq += 1
+            return (prefix, self._seq)
+
+    def publish_signal(self, signal, ticker: str):
+        if self.active:
+            self.publish("signals", ticker, signal_payload(signal, ticker), key=("signals", signal.id))
+
+    def publish_trade(self, trade):
+        if self.active:
+            self.publish("trades", trade.ticker, trade_payload(trade), key=("trades", trade.id))
+
+    # ---- event loop side ----
+
+    def _fanout(self, topic: str, ticker: str, key, message: dict):
+        self._stats["published"] += 1
+        for sub in self._subscribers:
+            if sub.wants(topic, ticker, message.get("interval")):
+                self._enqueue(sub, key, message)
+
+    def _enqueue(self, sub: Subscriber, key, message: dict):
+        if key in sub.outbox:
+            self._stats["coalesced"] += 1
+            sub.outbox[key] = message
+        elif len(sub.outbox) >= self.max_pending:
+            # Too far behind: replace the backlog with a single resync notice
+            self._stats["resyncs"] += 1
+            sub.outbox.clear()
+            sub.outbox[("resync",)] = {"topic": "resync"}
+        else:
+            sub.outbox[key] = message
+        sub.wakeup.set()
+
+    async def _sender(self, sub: Subscriber):
+        try:
+            while True:
+                await sub.wakeup.wait()
+                sub.wakeup.clear()
+                while sub.outbox:
+                    _, message = sub.outbox.popitem(last=False)
+                    await sub.websocket.send_json(message)
+                    self._stats["delivered"] += 1
+        except (WebSocketDisconnect, RuntimeError):
+            # Connection closed; the receive loop cleans up
+            pass
+
+    def _subscribe(self, sub: Subscriber, msg: dict, subscribe: bool):
+        topics = [t for t in msg.get("topics", []) if t in TOPICS]
+        tickers = msg.get("tickers") or [ALL_TICKERS]
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        interval = msg.get("interval", "1d")
+        if "bars" in topics:
+            if ALL_TICKERS in tickers:
+                return {"topic": "error", "detail": "bars subscriptions need explicit tickers"}
+            if interval not in INTERVALS:
+                return {"topic": "error", "detail": f"Unknown interval: {interval}"}
+        for topic in topics:
+            if topic == "bars":
+                keys = {(ticker, interval) for ticker in tickers}
+                if subscribe:
+                    sub.bar_keys |= keys
+                else:
+                    sub.bar_keys -= keys
+                sub.topics["bars"] = {ticker for ticker, _ in sub.bar_keys}
+            elif subscribe:
+                sub.topics[topic].update(tickers)
+            else:
+                sub.topics[topic].difference_update(tickers)
+        if subscribe and "bars" in topics:
+            for ticker in tickers:
+                # Snapshot of the latest known bar so the client does not wait a full cycle
+                bar = self._last_bars.get((ticker, interval))
+                if bar is not None:
+                    self._enqueue(sub, ("bars", ticker, interval, bar["time"]), {"topic": "bars", "ticker": ticker, "interval": interval, "data": bar})
+            self._ensure_bar_task()
+        return {"topic": "subscribed", "subscriptions": {t: sorted(v) for t, v in sub.topics.items() if v}}
+
+    def _ensure_bar_task(self):
+        if self._bar_task is None or self._bar_task.done():
+            self._bar_task = asyncio.ensure_future(self._bar_pump())
+
+    async def _bar_pump(self):
+        while True:
+            keys = set().union(*(sub.bar_keys for sub in self._subscribers)) if self._subscribers else set()
+            if not keys:
+                return
+            keys = sorted(keys)
+            bars = await asyncio.gather(*(io_pool.run(_last_bar, t, i) for t, i in keys), return_exceptions=True)
+            for (ticker, interval), bar in zip(keys, bars):
+                if isinstance(bar, Exception):
+                    print(f"Bar refresh failed for {ticker} {interval}: {bar}")
+                    continue
+                if bar is None or self._last_bars.get((ticker, interval)) == bar:
+                    continue
+                self._last_bars[(ticker, interval)] = bar
+                self.publish("bars", ticker, bar, key=("bars", ticker, interval, bar["time"]), interval=interval)
+            await asyncio.sleep(self.bar_interval)
+
+    async def serve(self, websocket: WebSocket):
+        """Run one client connection until it disconnects."""
+        await websocket.accept()
+        self._loop = asyncio.get_running_loop()
+        sub = Subscriber(websocket)
+        self._subscribers.add(sub)
+        sender = asyncio.ensure_future(self._sender(sub))
+        try:
+            while True:
+                try:
+                    msg = json.loads(await websocket.receive_text())
+                except ValueError:
+                    msg = None
+                action = msg.get("action") if isinstance(msg, dict) else None
+                if action in ("subscribe", "unsubscribe"):
+                    reply = self._subscribe(sub, msg, action == "subscribe")
+                elif action == "ping":
+                    reply = {"topic": "pong"}
+                else:
+                    reply = {"topic": "error", "detail": "Unknown action. Use subscribe, unsubscribe or ping."}
+                self._enqueue(sub, self._next_key("reply"), reply)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self._subscribers.discard(sub)
+            sender.cancel()
+            self._last_bars = {k: v for k, v in self._last_bars.items() if any(k in s.bar_keys for s in self._subscribers)}
+
+    def metrics(self) -> dict:
+        subscriptions = {topic: 0 for topic in TOPICS}
+        for sub in list(self._subscribers):
+            for topic, tickers in sub.topics.items():
+                subscriptions[topic] += len(tickers)
+        return {
+            "connections": len(self._subscribers),
+            "subscriptions": subscriptions,
+            "pending": sum(len(sub.outbox) for sub in list(self._subscribers)),
+            **self._stats
+        }
+
+
+broker = Broker()
+
+
+@metrics.register_collector
+def _broker_collector():
+    m = broker.metrics()
+    yield "smark_ws_connections", "gauge", "Open WebSocket connections.", [({}, m["connections"])]
+    yield "smark_ws_pending_messages", "gauge", "Messages queued for WebSocket clients.", [({}, m["pending"])]
+    yield "smark_ws_messages_total", "counter", "WebSocket broker message counts.", [
+        ({"event": event}, m[event]) for event in ("published", "delivered", "coalesced", "resyncs")
+    ]
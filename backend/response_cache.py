@@ -0,0 +1,164 @@
+"""
+Single-flight TTL cache for expensive endpoint computations.
+
+- Concurrent requests for the same key share one in-flight computation.
+- Results are kept until their TTL expires; interval_ttl() aligns the expiry
+  with the next bar boundary of the data interval (a 15m bar is valid for
+  at most 15 minutes).
+- Stale-while-revalidate: for stale_ttl seconds after expiry the old value
+  is served immediately while one background refresh runs.
+- Errors are never cached; every waiter of a failed computation gets the error.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+from . import metrics
+from .market_data import INTERVALS
+
+# Upper bound for any interval-derived TTL (seconds)
+CACHE_MAX_TTL = float(os.getenv("CACHE_MAX_TTL", "900"))
+
+# How long "no data" results are kept, so upstream outages recover quickly
+NEGATIVE_TTL = 30.0
+
+
+def interval_ttl(interval: str, max_ttl: float = CACHE_MAX_TTL) -> float:
+    """Seconds until the next bar boundary of `interval`, capped at max_ttl."""
+    step = INTERVALS.get(interval, pd.Timedelta(seconds=max_ttl)).total_seconds()
+    remaining = step - (time.time() % step)
+    return max(1.0, min(remaining, max_ttl))
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until")
+
+    def __init__(self, value, expires_at: float, stale_until: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class SingleFlightCache:
+    def __init__(self, name: str, max_entries: int = 512):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        self._refresh_tasks = set()
+
+    def _store(self, key, value, ttl: float, stale_ttl: float):
+        now = time.time()
+        with self._lock:
+            self._entries[key] = _Entry(value, now + ttl, now + ttl + stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _arun(self, key, compute, ttl, stale_ttl, future: Future):
+        try:
+            value = await compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._stats["errors"] += 1
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                return
+            # The owning request was cancelled; waiters should not be cancelled with it
+            future.set_exception(RuntimeError(f"{self.name} computation was cancelled"))
+            raise
+        self._store(key, value, ttl(value) if callable(ttl) else ttl, stale_ttl)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    async def aget_or_compute(self, key, compute, ttl, stale_ttl: float = 0.0):
+        """
+        Return the cached value for key, computing it at most once at a time.
+
+        compute is a coroutine function. ttl may be a number of seconds or a
+        callable ttl(value) evaluated when the value is stored (e.g. to keep
+        empty results only briefly).
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                self._stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return entry.value
+
+            future = self._inflight.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._stats["stale_hits"] += 1
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    task = asyncio.ensure_future(self._arun(key, compute, ttl, stale_ttl, future))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return entry.value
+
+            if future is not None:
+                self._stats["coalesced"] += 1
+                owner = False
+            else:
+                self._stats["misses"] += 1
+                future = Future()
+                self._inflight[key] = future
+                owner = True
+
+        if owner:
+            await self._arun(key, compute, ttl, stale_ttl, future)
+            return future.result()
+        return await asyncio.wrap_future(future)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["inflight"] = len(self._inflight)
+        served = stats["hits"] + stats["stale_hits"] + stats["coalesced"]
+        total = served + stats["misses"]
+        stats["hit_ratio"] = round(served / total, 4) if total else 0.0
+        return stats
+
+
+_caches = {}
+
+
+def get_cache(name: str, max_entries: int = 512) -> SingleFlightCache:
+    """Named cache registry, so every endpoint's hit ratio can be reported."""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches.setdefault(name, SingleFlightCache(name, max_entries))
+    return cache
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+@metrics.register_collector
+def _cache_collector():
+    stats = cache_stats()
+    yield "smark_cache_requests_total", "counter", "Response cache lookups by result.", [
+        ({"cache": name, "result": result}, s[key]) for name, s in stats.items()
+        for result, key in (("hit", "hits"), ("stale_hit", "stale_hits"), ("miss", "misses"), ("coalesced", "coalesced"), ("error", "errors"))
+    ]
+    yield "smark_cache_entries", "gauge", "Entries held per response cache.", [({"cache": name}, s["entries"]) for name, s in stats.items()]
@@ -0,0 +1,294 @@
+"""
+Retention and archival for signals and backtest_results.
+
+Rows older than the retention window (SIGNAL_RETENTION_DAYS,
+BACKTEST_RETENTION_DAYS) are moved, one calendar month per transaction,
+into per-month archive tables in the same database
+(signals_archive_2026_01, ...). The hot tables and their indexes stay a
+bounded size, so the "latest N" feeds stay fast indefinitely. Archive
+tables are registered in archive_partitions.
+
+Before rows leave a hot table their monthly totals are added to
+signal_rollups / backtest_rollups, so analytics over the whole history
+read a few rollup rows plus the (small) hot table.
+
+Feeds read only the hot tables unless asked to include the archive
+(include_archive=true), in which case the partitions overlapping the
+requested time range are UNION ALLed in (spanning_source).
+
+Runs daily from the Inngest cron, or by hand:
+
+    python -m backend.retention run
+    python -m backend.retention status
+"""
+import datetime
+import json
+import os
+import sys
+import threading
+
+from sqlalchemy import Column, Index, MetaData, Table, and_, delete, func, insert, select, union_all
+
+from .database import (
+    SessionLocal, Asset, Signal, BacktestResult, ArchivePartition, SignalRollup, BacktestRollup,
+    dialect_insert, upsert_increment,
+)
+
+SIGNAL_RETENTION_DAYS = int(os.getenv("SIGNAL_RETENTION_DAYS", "90"))
+BACKTEST_RETENTION_DAYS = int(os.getenv("BACKTEST_RETENTION_DAYS", "365"))
+
+# source -> (hot table, time column, retention days)
+SOURCES = {
+    "signals": (Signal.__table__, "created_at", SIGNAL_RETENTION_DAYS),
+    "backtest_results": (BacktestResult.__table__, "run_at", BACKTEST_RETENTION_DAYS),
+}
+
+# Archive tables are created on demand and kept out of Base.metadata (and so out of create_all)
+_archive_metadata = MetaData()
+_archive_lock = threading.Lock()
+
+
+def _month_start(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month_start: datetime.datetime) -> datetime.datetime:
+    return (month_start + datetime.timedelta(days=32)).replace(day=1)
+
+
+def _month_expr(db, column):
+    """YYYY-MM of a datetime column, in the bound database's dialect."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def archive_table(source: str, month: str) -> Table:
+    """The archive Table for one month of a source (same columns as the hot table)."""
+    table, time_name, _ = SOURCES[source]
+    name = f"{source}_archive_{month.replace('-', '_')}"
+    with _archive_lock:
+        existing = _archive_metadata.tables.get(name)
+        if existing is not None:
+            return existing
+        return Table(
+            name, _archive_metadata,
+            *(Column(c.name, c.type, primary_key=c.primary_key) for c in table.columns),
+            Index(f"ix_{name}_{time_name}", time_name, "id"),
+        )
+
+
+# ---- rollups ----
+
+def _rollup_signals(db, month: str, in_range):
+    strategy = func.coalesce(Signal.strategy, "other")
+    asset_id = func.coalesce(Signal.asset_id, 0)
+    rows = db.execute(
+        select(asset_id, strategy, func.count(Signal.id), func.coalesce(func.sum(Signal.confidence), 0))
+        .where(in_range).group_by(asset_id, strategy)
+    ).all()
+    for asset, strat, count, total in rows:
+        upsert_increment(db, SignalRollup, {"month": month, "asset_id": asset, "strategy": strat},
+                         {"signals": count, "sum_confidence": float(total)})
+
+
+def _rollup_backtests(db, month: str, in_range):
+    strategy = func.coalesce(BacktestResult.strategy_name, "")
+    ticker = func.coalesce(BacktestResult.ticker, "")
+    sums = [func.coalesce(func.sum(col), 0) for col in (
+        BacktestResult.win_rate, BacktestResult.profit_factor, BacktestResult.total_pnl,
+        BacktestResult.max_drawdown, BacktestResult.total_trades,
+    )]
+    rows = db.execute(
+        select(strategy, ticker, func.count(BacktestResult.id), *sums).where(in_range).group_by(strategy, ticker)
+    ).all()
+    for strat, tick, runs, win_rate, profit_factor, total_pnl, max_drawdown, total_trades in rows:
+        upsert_increment(db, BacktestRollup, {"month": month, "strategy_name": strat, "ticker": tick}, {
+            "runs": runs, "sum_win_rate": float(win_rate), "sum_profit_factor": float(profit_factor),
+            "sum_total_pnl": float(total_pnl), "sum_max_drawdown": float(max_drawdown), "sum_total_trades": int(total_trades),
+        })
+
+
+_ROLLUPS = {"signals": _rollup_signals, "backtest_results": _rollup_backtests}
+
+
+def _register_partition(db, source: str, month: str, table_name: str, count: int):
+    now = datetime.datetime.utcnow()
+    stmt = dialect_insert(db.get_bind(), ArchivePartition).values(
+        source=source, month=month, table_name=table_name, row_count=count, archived_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "month"],
+        set_={"row_count": ArchivePartition.row_count + stmt.excluded.row_count, "archived_at": stmt.excluded.archived_at},
+    )
+    db.execute(stmt)
+
+
+# ---- archiving ----
+
+def archive_source(source: str, now: datetime.datetime = None) -> dict:
+    """Move rows older than the source's retention window into monthly archive tables. Returns {month: rows}."""
+    table, time_name, days = SOURCES[source]
+    time_col = table.c[time_name]
+    cutoff = (now or datetime.datetime.utcnow()) - datetime.timedelta(days=days)
+    moved = {}
+    db = SessionLocal()
+    try:
+        # MIN over the indexed time column: one index probe per month
+        oldest = db.scalar(select(func.min(time_col)))
+        while oldest is not None and oldest < cutoff:
+            start = _month_start(oldest)
+            end = min(_next_month(start), cutoff)
+            month = start.strftime("%Y-%m")
+            in_range = and_(time_col >= start, time_col < end)
+
+            archive = archive_table(source, month)
+            archive.create(db.connection(), checkfirst=True)
+            names = [c.name for c in table.columns]
+            db.execute(insert(archive).from_select(names, select(*table.columns).where(in_range)))
+            _ROLLUPS[source](db, month, in_range)
+            count = db.execute(delete(table).where(in_range)).rowcount
+            _register_partition(db, source, month, archive.name, count)
+            db.commit()
+
+            moved[month] = moved.get(month, 0) + count
+            oldest = db.scalar(select(func.min(time_col)))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return moved
+
+
+def run_retention(now: datetime.datetime = None) -> dict:
+    """Archive every source; called by the daily cron."""
+    result = {}
+    for source in SOURCES:
+        moved = archive_source(source, now)
+        result[source] = moved
+        if moved:
+            print(f"Retention: archived {sum(moved.values())} {source} rows ({', '.join(moved)})")
+    return result
+
+
+# ---- reading across hot and archived rows ----
+
+def archive_months(db, source: str, since: datetime.datetime = None, until: datetime.datetime = None) -> list:
+    """Months of the source's archive partitions overlapping [since, until)."""
+    stmt = select(ArchivePartition.month).where(ArchivePartition.source == source)
+    if since is not None:
+        stmt = stmt.where(ArchivePartition.month >= since.strftime("%Y-%m"))
+    if until is not None:
+        stmt = stmt.where(ArchivePartition.month <= until.strftime("%Y-%m"))
+    return list(db.scalars(stmt.order_by(ArchivePartition.month)))
+
+
+def spanning_source(source: str, months: list = ()):
+    """
+    The hot table, or (with archive months) the hot table and those
+    partitions as one UNION ALL subquery with the same columns.
+    """
+    table = SOURCES[source][0]
+    if not months:
+        return table
+    parts = [select(*table.columns)]
+    for month in months:
+        archive = archive_table(source, month)
+        parts.append(select(*(archive.c[c.name] for c in table.columns)))
+    return union_all(*parts).subquery(f"{source}_all")
+
+
+def _merge_months(hot: list, archived: list, fields: int) -> dict:
+    merged = {}
+    for month, *values in list(archived) + list(hot):
+        current = merged.setdefault(month, [0] * fields)
+        for i, value in enumerate(values):
+            current[i] += value or 0
+    return merged
+
+
+def monthly_signal_summary(db, ticker: str = None, strategy: str = None) -> list:
+    """Signal count and average confidence per month over the whole history (rollups + hot table)."""
+    month = _month_expr(db, Signal.created_at)
+    hot = select(month, func.count(Signal.id), func.sum(Signal.confidence)).group_by(month)
+    archived = select(SignalRollup.month, func.sum(SignalRollup.signals), func.sum(SignalRollup.sum_confidence)).group_by(SignalRollup.month)
+    if ticker:
+        hot = hot.join(Signal.asset).where(Asset.ticker == ticker)
+        archived = archived.join(Asset, Asset.id == SignalRollup.asset_id).where(Asset.ticker == ticker)
+    if strategy:
+        hot = hot.where(Signal.strategy == strategy.lower())
+        archived = archived.where(SignalRollup.strategy == strategy.lower())
+    merged = _merge_months(db.execute(hot).all(), db.execute(archived).all(), 2)
+    return [
+        {"month": m, "signals": int(count), "avg_confidence": round(total / count, 2) if count else None}
+        for m, (count, total) in sorted(merged.items())
+    ]
+
+
+def monthly_backtest_summary(db, ticker: str = None, strategy: str = None) -> list:
+    """Backtest runs and average metrics per month over the whole history (rollups + hot table)."""
+    month = _month_expr(db, BacktestResult.run_at)
+    hot = select(month, func.count(BacktestResult.id), *(func.sum(c) for c in (
+        BacktestResult.win_rate, BacktestResult.profit_factor, BacktestResult.total_pnl,
+        BacktestResult.max_drawdown, BacktestResult.total_trades,
+    ))).group_by(month)
+    archived = select(BacktestRollup.month, func.sum(BacktestRollup.runs), *(func.sum(c) for c in (
+        BacktestRollup.sum_win_rate, BacktestRollup.sum_profit_factor, BacktestRollup.sum_total_pnl,
+        BacktestRollup.sum_max_drawdown, BacktestRollup.sum_total_trades,
+    ))).group_by(BacktestRollup.month)
+    if ticker:
+        hot = hot.where(BacktestResult.ticker == ticker)
+        archived = archived.where(BacktestRollup.ticker == ticker)
+    if strategy:
+        hot = hot.where(BacktestResult.strategy_name == strategy)
+        archived = archived.where(BacktestRollup.strategy_name == strategy)
+    merged = _merge_months(db.execute(hot).all(), db.execute(archived).all(), 6)
+    return [
+        {
+            "month": m,
+            "runs": int(runs),
+            "avg_win_rate": win_rate / runs if runs else None,
+            "avg_profit_factor": profit_factor / runs if runs else None,
+            "total_pnl": total_pnl,
+            "avg_max_drawdown": max_drawdown / runs if runs else None,
+            "total_trades": int(total_trades),
+        }
+        for m, (runs, win_rate, profit_factor, total_pnl, max_drawdown, total_trades) in sorted(merged.items())
+    ]
+
+
+def retention_status(db) -> dict:
+    status = {}
+    for source, (table, time_name, days) in SOURCES.items():
+        time_col = table.c[time_name]
+        rows, oldest = db.execute(select(func.count(), func.min(time_col)).select_from(table)).one()
+        partitions = db.execute(
+            select(ArchivePartition.month, ArchivePartition.table_name, ArchivePartition.row_count, ArchivePartition.archived_at)
+            .where(ArchivePartition.source == source).order_by(ArchivePartition.month)
+        ).all()
+        status[source] = {
+            "retention_days": days,
+            "hot_rows": rows,
+            "oldest_hot": oldest,
+            "archived_rows": sum(p.row_count for p in partitions),
+            "partitions": [p._asdict() for p in partitions],
+        }
+    return status
+
+
+if __name__ == "__main__":
+    command = sys.argv[1:] or ["status"]
+    if command not in (["run"], ["status"]):
+        print("Usage: python -m backend.retention [run|status]")
+        sys.exit(2)
+    from .database import init_db
+    init_db()
+    if command == ["run"]:
+        print(json.dumps(run_retention(), indent=2))
+    else:
+        db = SessionLocal()
+        try:
+            print(json.dumps(retention_status(db), indent=2, default=str))
+        finally:
+            db.close()
@@ -0,0 +1,62 @@
+"""
+Alphalens-style factor analysis endpoints.
+
+Results come from the native factor engine and are stored per strategy
+(analysis/alpha_cache.py). With ALPHA_ENGINE=alphalens, alphalens and its
+scientific stack are loaded on the first analysis request, not when the app
+starts.
+"""
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..analysis.alpha_cache import cached_analysis
+from ..analysis.alpha_engine import ALPHA_ENGINE, AlphaAnalyzer, FactorConverter, AlphaDataBridge
+from ..database import get_db, Asset
+from ..retention import archive_months, spanning_source
+from ..signal_store import STRATEGIES
+
+router = APIRouter(prefix="/analysis", tags=["analysis"])
+
+alpha_analyzer = AlphaAnalyzer()
+
+@router.post("/alpha/{strategy_type}")
+def run_alpha_analysis(strategy_type: str, db: Session = Depends(get_db)):
+    """Run Alphalens analysis on a specific strategy type, over its whole signal history."""
+    # 1. Fetch signals for this strategy (only the three columns the factor needs), archived months included
+    src = spanning_source("signals", archive_months(db, "signals"))
+    key = strategy_type.strip().lower()
+    # Known strategies use the indexed key; anything else still matches on the signal name
+    match = src.c.strategy == key if key in STRATEGIES else src.c.signal_type.contains(strategy_type)
+    signals = db.execute(
+        select(src.c.created_at, Asset.ticker, src.c.confidence).join(Asset, Asset.id == src.c.asset_id).where(match)
+    ).all()
+    if not signals:
+        raise HTTPException(status_code=404, detail="No signals found for this strategy.")
+    
+    # 2. Convert to factor DF
+    signals_df = FactorConverter.signals_to_factor_df(signals)
+    
+    # 3. Historical prices (date x asset, from the local data files first), loaded only when needed
+    tickers = list(signals_df['asset'].unique())
+    start_date = signals_df['date'].min().strftime('%Y-%m-%d')
+    end_date = (signals_df['date'].max() + timedelta(days=10)).strftime('%Y-%m-%d')
+    
+    def load_prices():
+        return AlphaDataBridge.fetch_historical_prices(tickers, start_date, end_date)
+    
+    # 4. Run Analysis
+    if ALPHA_ENGINE == "native":
+        # Stored per strategy; only new or changed signal dates are computed
+        cache_key = key if key in STRATEGIES else strategy_type
+        results = cached_analysis(db, cache_key, FactorConverter.to_factor_series(signals_df), load_prices)
+    else:
+        prices = load_prices()
+        results = alpha_analyzer.run_full_analysis(signals_df, prices) if not prices.empty else None
+    
+    if results is None:
+        raise HTTPException(status_code=500, detail="Failed to fetch historical prices for analysis.")
+    
+    return results
@@ -0,0 +1,68 @@
+"""
+Execution endpoints (MT5 / Alpaca).
+
+Broker SDKs are imported lazily by the engines, so registering these routes
+costs nothing until a platform is actually used.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from ..execution.manager import ExecutionManager
+from ..offload import io_pool
+
+router = APIRouter(prefix="/execution", tags=["execution"])
+
+execution_manager = ExecutionManager()
+
+@router.get("/status")
+async def get_execution_status():
+    """Get current execution engines status."""
+    return await io_pool.run(execution_manager.get_status)
+
+@router.post("/platform")
+def set_execution_platform(platform: str):
+    """Switch active trading platform (mt5/alpaca)."""
+    success = execution_manager.set_active_platform(platform)
+    if not success:
+        raise HTTPException(status_code=400, detail="Invalid platform. Use 'mt5' or 'alpaca'.")
+    return {"message": f"Platform switched to {platform}"}
+
+class TradeRequest(BaseModel):
+    symbol: str
+    side: str  # buy/sell
+    volume: float
+    price: Optional[float] = None
+    sl: Optional[float] = None
+    tp: Optional[float] = None
+
+@router.post("/trade")
+async def execute_trade(req: TradeRequest):
+    """Execute a trade on the active platform."""
+    result = await io_pool.run(
+        execution_manager.execute_trade,
+        req.symbol, req.side, req.volume, req.price, req.sl, req.tp
+    )
+    if not result:
+        raise HTTPException(status_code=500, detail="Trade execution failed.")
+    return {"message": "Trade executed", "result": result}
+
+@router.get("/positions")
+async def get_execution_positions():
+    """Get active positions from the current platform."""
+    return await io_pool.run(execution_manager.get_positions)
+
+@router.post("/close/{ticket_or_symbol}")
+async def close_execution_position(ticket_or_symbol: str):
+    """Close an active position."""
+    # Try as integer first (MT5 ticket)
+    try:
+        val = int(ticket_or_symbol)
+    except ValueError:
+        val = ticket_or_symbol
+        
+    success = await io_pool.run(execution_manager.close_position, val)
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to close position.")
+    return {"message": "Position closed successfully"}
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from . import metrics
 
 def compute_rsi(series, period=14):
     delta = series.diff()
@@ -42,8 +43,9 @@ def get_volatility_index(df):
     vol_score = (relative_vol.iloc[-1] / 0.5) * 50
     return min(100, max(0, vol_score))
 
-from .algo_suite import fetch_real_sentiment, detect_turtle_breakout, detect_ichimoku_signals
+from .algo_suite import fetch_real_sentiment, fetch_real_sentiment_async, detect_turtle_breakout, detect_ichimoku_signals
 
+@metrics.timed("detect_divergence")
 def detect_divergence(df, lookback=5):
     """
     Detects RSI and OBV Divergence.
@@ -96,6 +98,7 @@ def detect_divergence(df, lookback=5):
 
     return signals
 
+@metrics.timed("detect_bull_flag")
 def detect_bull_flag(df):
     """
     Strategy: 15m Momentum Pole (spike) followed by tight consolidation (flag).
@@ -128,6 +131,7 @@ def detect_bull_flag(df):
             }]
     return []
 
+@metrics.timed("detect_double_bottom")
 def detect_double_bottom(df, lookback=20):
     """
     Strategy: "W" pattern at potential support.
@@ -162,6 +166,7 @@ def detect_double_bottom(df, lookback=20):
                 }]
     return []
 
+@metrics.timed("detect_macd_cross")
 def detect_macd_cross(df):
     if len(df) < 200: return []
     df = df.copy()
@@ -182,9 +187,10 @@ def detect_macd_cross(df):
         })
     return signals
 
-def generate_pro_analysis(ticker, df):
+def generate_pro_analysis(ticker, df, sentiment=None):
     """
     Combined analysis targeted at specific "Titan" strategies.
+    sentiment: pre-fetched detect_sentiment() output; fetched here when None.
     """
     # Helper function to normalize signal structure
     def normalize_signal(signal, default_strategy="Unknown"):
@@ -240,7 +246,7 @@ def generate_pro_analysis(ticker, df):
     # Catch-all: Divergence
     signals = detect_divergence(df)
     signals.extend(detect_macd_cross(df))
-    signals.extend(detect_sentiment(ticker))
+    signals.extend(detect_sentiment(ticker) if sentiment is None else [dict(sig) for sig in sentiment])
     signals.extend(detect_ichimoku_signals(df))
     
     # Volatility Filter
@@ -258,20 +264,36 @@ def generate_pro_analysis(ticker, df):
             
     return None
 
+@metrics.timed("detect_sentiment")
 def detect_sentiment(ticker: str):
     # Phase 1: Use REAL Sentiment from algo_suite
     try:
         real_sent = fetch_real_sentiment(ticker)
-        if real_sent:
-            return [{
-                "type": real_sent[0]["type"],
-                "confidence": real_sent[0]["confidence"],
-                "entry_price": 0.0,
-                "indicator": "VADER/Google News",
-                "reasoning": real_sent[0]["reasoning"]
-            }]
     except Exception as e:
         print(f"Sentiment fetch failed: {e}")
+        real_sent = []
+    return sentiment_signals(ticker, real_sent)
+
+@metrics.timed("detect_sentiment")
+async def detect_sentiment_async(ticker: str):
+    """detect_sentiment for async handlers: the news fetch does not block the event loop."""
+    try:
+        real_sent = await fetch_real_sentiment_async(ticker)
+    except Exception as e:
+        print(f"Sentiment fetch failed: {e}")
+        real_sent = []
+    return sentiment_signals(ticker, real_sent)
+
+def sentiment_signals(ticker: str, real_sent):
+    """Sentiment signals from fetched news sentiment, falling back to the local scanner."""
+    if real_sent:
+        return [{
+            "type": real_sent[0]["type"],
+            "confidence": real_sent[0]["confidence"],
+            "entry_price": 0.0,
+            "indicator": "VADER/Google News",
+            "reasoning": real_sent[0]["reasoning"]
+        }]
         
     # Fallback to local logic (mock)
     mock_headlines = {
@@ -293,3 +315,11 @@ def detect_sentiment(ticker: str):
     elif score < 0:
         return [{"type": "Bearish News Sentiment", "confidence": 75 + (abs(score) * 5), "entry_price": 0.0, "indicator": "News Scanner"}]
     return []
+
+def collect_signals(df, sentiment):
+    """Divergence, MACD, sentiment and Ichimoku signals for one asset (as used by /scan)."""
+    signals = detect_divergence(df)
+    signals.extend(detect_macd_cross(df))
+    signals.extend(sentiment)
+    signals.extend(detect_ichimoku_signals(df))
+    return signals
@@ -0,0 +1,147 @@
+"""
+Bulk, deduplicated signal persistence.
+
+Signals are keyed by (asset, signal type, timeframe, bar time). Re-detecting
+a signal on the same bar (every scan and every 4-hour sync re-evaluates the
+latest bars) updates the stored row instead of adding a duplicate. A batch
+is written with one multi-row INSERT ... ON CONFLICT per chunk, on SQLite and
+PostgreSQL alike, and asset ids are cached in memory so the asset lookup is
+skipped for tickers seen before.
+
+Each row also stores its strategy family (strategy_key), so alpha analysis
+selects a strategy's signals through an index instead of a LIKE scan.
+"""
+import threading
+
+import pandas as pd
+from sqlalchemy import select, update
+
+from .database import SessionLocal, Asset, Signal, dialect_insert
+
+SIGNAL_KEY = ("asset_id", "signal_type", "timeframe", "bar_time")
+# Values refreshed when a signal is re-detected on the same bar
+SIGNAL_UPDATE_COLUMNS = ("confidence", "entry_price", "stop_loss", "take_profit")
+
+# Rows per INSERT statement (stays under SQLite's bound-parameter limit)
+CHUNK_SIZE = 500
+
+# (substring of signal_type, strategy key); the first match wins
+STRATEGY_PATTERNS = (
+    ("ichimoku", "ichimoku"),
+    ("turtle", "turtle"),
+    ("macd", "macd"),
+    ("rsi", "rsi"),
+    ("news sentiment", "sentiment"),
+    ("flag", "bull_flag"),
+    ("double bottom", "double_bottom"),
+)
+STRATEGIES = {key for _, key in STRATEGY_PATTERNS}
+
+
+def bar_timestamp(value):
+    """Naive UTC datetime for a bar label (the column stores naive UTC, like created_at)."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.to_pydatetime()
+
+
+def strategy_key(signal_type: str) -> str:
+    """Strategy family of a signal type, e.g. "MACD Bullish Cross" -> "macd"."""
+    lowered = (signal_type or "").lower()
+    for pattern, key in STRATEGY_PATTERNS:
+        if pattern in lowered:
+            return key
+    return "other"
+
+
+def backfill_strategies():
+    """Fill Signal.strategy for rows stored before the column existed."""
+    db = SessionLocal()
+    try:
+        types = db.scalars(select(Signal.signal_type).where(Signal.strategy.is_(None)).distinct()).all()
+        for signal_type in types:
+            same_type = Signal.signal_type.is_(None) if signal_type is None else Signal.signal_type == signal_type
+            db.execute(update(Signal).where(Signal.strategy.is_(None), same_type).values(strategy=strategy_key(signal_type)))
+        db.commit()
+    finally:
+        db.close()
+
+
+class AssetIdCache:
+    """ticker -> assets.id, filled from the database and never invalid (ids are not reused)."""
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, tickers, asset_class: str) -> dict:
+        """Ids for tickers, creating missing assets in their own short transaction."""
+        tickers = list(dict.fromkeys(tickers))
+        with self._lock:
+            missing = [t for t in tickers if t not in self._ids]
+        if missing:
+            db = SessionLocal()
+            try:
+                stmt = dialect_insert(db.get_bind(), Asset).values(
+                    [{"ticker": t, "asset_class": asset_class, "is_active": True} for t in missing]
+                ).on_conflict_do_nothing(index_elements=["ticker"])
+                db.execute(stmt)
+                rows = db.execute(select(Asset.ticker, Asset.id).where(Asset.ticker.in_(missing))).all()
+                db.commit()
+            finally:
+                db.close()
+            with self._lock:
+                self._ids.update(rows)
+        with self._lock:
+            return {t: self._ids[t] for t in tickers}
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+
+asset_ids = AssetIdCache()
+
+
+def signal_rows(asset_id: int, signals: list, timeframe: str, bar_time) -> list:
+    """Signal dicts from the detectors as rows for upsert_signals."""
+    bar_time = bar_timestamp(bar_time)
+    return [
+        {
+            "asset_id": asset_id,
+            "signal_type": sig["type"],
+            "strategy": strategy_key(sig["type"]),
+            "timeframe": timeframe,
+            "bar_time": bar_time,
+            "confidence": sig["confidence"],
+            "entry_price": sig.get("entry_price", 0.0),
+            "stop_loss": sig.get("entry_price", 0.0) * 0.98,  # Mock SL
+            "take_profit": sig.get("entry_price", 0.0) * 1.05,  # Mock TP
+        }
+        for sig in signals
+    ]
+
+
+def upsert_signals(db, rows: list, on_conflict: str = "update") -> list:
+    """
+    Insert rows, skipping ("nothing") or refreshing ("update") signals whose
+    natural key already exists. Returns the stored Signal objects (with
+    "nothing", only the newly inserted ones). The caller commits.
+    """
+    if on_conflict not in ("update", "nothing"):
+        raise ValueError(f"Unknown on_conflict mode: {on_conflict}")
+    # A statement may not touch the same row twice; the last detection wins
+    unique = list({tuple(row[k] for k in SIGNAL_KEY): row for row in rows}.values())
+    stored = []
+    for start in range(0, len(unique), CHUNK_SIZE):
+        stmt = dialect_insert(db.get_bind(), Signal).values(unique[start:start + CHUNK_SIZE])
+        if on_conflict == "update":
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(SIGNAL_KEY),
+                set_={col: stmt.excluded[col] for col in SIGNAL_UPDATE_COLUMNS},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(SIGNAL_KEY))
+        stored.extend(db.scalars(stmt.returning(Signal), execution_options={"populate_existing": True}).all())
+    return stored
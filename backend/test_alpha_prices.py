@@ -0,0 +1,60 @@
+import pandas as pd
+
+from backend import data_loader
+from backend.analysis.alpha_engine import AlphaDataBridge
+
+
+def _write_closes(directory, ticker, dates):
+    closes = [100.0 + i for i in range(len(dates))]
+    pd.DataFrame({"Time": dates, "Close": closes, "AdjClose": closes}).to_csv(directory / f"CS_{ticker}_day.csv", index=False)
+
+
+def _local_files(tmp_path, monkeypatch):
+    _write_closes(tmp_path, "AAPL", pd.bdate_range("2023-03-01", "2023-03-31").strftime("%Y-%m-%d"))
+    _write_closes(tmp_path, "MSFT", pd.bdate_range("2023-03-01", "2023-03-31").strftime("%Y-%m-%d"))
+    monkeypatch.setattr(data_loader, "DATA_DIR", tmp_path)
+
+
+def test_covered_window_is_read_locally(tmp_path, monkeypatch):
+    _local_files(tmp_path, monkeypatch)
+    panel, missing = data_loader.load_close_panel(["AAPL", "MSFT"], "2023-03-01", "2023-03-31")
+    assert missing == []
+    assert list(panel.columns) == ["AAPL", "MSFT"]
+    assert len(panel) == 23
+
+
+def test_out_of_range_window_counts_as_missing(tmp_path, monkeypatch):
+    _local_files(tmp_path, monkeypatch)
+    panel, missing = data_loader.load_close_panel(["AAPL", "MSFT", "BTC-USD"], "2026-01-01", "2026-06-01")
+    assert missing == ["AAPL", "MSFT", "BTC-USD"]
+    assert panel.empty
+
+
+def test_partially_covered_window_counts_as_missing(tmp_path, monkeypatch):
+    _local_files(tmp_path, monkeypatch)
+    panel, missing = data_loader.load_close_panel(["AAPL"], "2023-03-01", "2023-06-30")
+    assert missing == ["AAPL"]
+    assert panel["AAPL"].notna().sum() == 23
+
+
+def test_bridge_fetches_uncovered_tickers(tmp_path, monkeypatch):
+    _local_files(tmp_path, monkeypatch)
+    dates = pd.bdate_range("2026-01-02", "2026-05-29")
+    fetched = []
+
+    def fallback(ticker, start, end):
+        fetched.append(ticker)
+        return pd.Series(50.0, index=dates) if ticker == "AAPL" else pd.Series(dtype=float)
+
+    monkeypatch.setattr(AlphaDataBridge, "_fallback_closes", staticmethod(fallback))
+    prices = AlphaDataBridge.fetch_historical_prices(["AAPL", "MSFT"], "2026-01-01", "2026-06-01", fallback=True)
+    assert fetched == ["AAPL", "MSFT"]
+    assert list(prices.columns) == ["AAPL"]
+    assert len(prices) == len(dates)
+
+
+def test_bridge_keeps_local_bars_when_fallback_has_none(tmp_path, monkeypatch):
+    _local_files(tmp_path, monkeypatch)
+    monkeypatch.setattr(AlphaDataBridge, "_fallback_closes", staticmethod(lambda t, s, e: pd.Series(dtype=float)))
+    prices = AlphaDataBridge.fetch_historical_prices(["AAPL"], "2023-03-01", "2023-06-30", fallback=True)
+    assert prices["AAPL"].notna().sum() == 23
@@ -0,0 +1,80 @@
+import numpy as np
+
+from backend.exit_resolver import resolve_exits, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_SIGNAL, EXIT_TIME, EXIT_OPEN
+
+
+def _reference(open_, high, low, close, entry, is_long, sl, tp, signal, max_hold):
+    """Bar-by-bar loop applying the fill rules in the module docstring."""
+    n = len(close)
+    last = n - 1 if max_hold is None else min(entry + max_hold, n - 1)
+    for j in range(entry + 1, last + 1):
+        sl_hit = low[j] <= sl if is_long else high[j] >= sl
+        tp_hit = high[j] >= tp if is_long else low[j] <= tp
+        if sl_hit and (open_[j] <= sl if is_long else open_[j] >= sl):
+            return j, open_[j], EXIT_STOP_LOSS
+        if tp_hit and (open_[j] >= tp if is_long else open_[j] <= tp):
+            return j, open_[j], EXIT_TAKE_PROFIT
+        if sl_hit:
+            return j, sl, EXIT_STOP_LOSS
+        if tp_hit:
+            return j, tp, EXIT_TAKE_PROFIT
+        if signal[j]:
+            return j, close[j], EXIT_SIGNAL
+    timed_out = max_hold is not None and entry + max_hold <= n - 1
+    return last, close[last], EXIT_TIME if timed_out else EXIT_OPEN
+
+
+def _random_bars(rng, n):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]] * np.exp(rng.normal(0, 0.004, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    return open_, high, low, close
+
+
+def test_matches_per_bar_reference():
+    rng = np.random.default_rng(7)
+    for max_hold in (None, 5, 40):
+        open_, high, low, close = _random_bars(rng, 400)
+        signal = rng.random(400) < 0.01
+        entry = rng.integers(0, 400, 300)
+        direction = rng.choice([1, -1], 300)
+        width = rng.uniform(0.005, 0.05, 300)
+        sl = close[entry] * (1 - direction * width)
+        tp = close[entry] * (1 + direction * width * rng.uniform(0.5, 3, 300))
+        sl[::17] = np.nan
+
+        result = resolve_exits(open_, high, low, close, entry, direction, sl, tp, exit_signal=signal, max_hold=max_hold, block_size=4)
+
+        for i in range(300):
+            idx, price, reason = _reference(open_, high, low, close, entry[i], direction[i] > 0, sl[i], tp[i], signal, max_hold)
+            assert result["exit_idx"][i] == idx
+            assert result["exit_price"][i] == price
+            assert result["reason"][i] == reason
+
+
+def test_stop_wins_when_both_levels_touched_in_one_bar():
+    # Bar 1 spans both levels for the long and the short
+    open_, high, low, close = [100, 100, 100], [101, 106, 101], [99, 94, 99], [100, 100, 100]
+    result = resolve_exits(open_, high, low, close, [0, 0], [1, -1], [95, 105], [105, 95])
+    assert list(result["exit_idx"]) == [1, 1]
+    assert list(result["exit_price"]) == [95, 105]
+    assert list(result["reason"]) == [EXIT_STOP_LOSS, EXIT_STOP_LOSS]
+
+
+def test_gap_through_fills_at_the_open():
+    # Bar 1 opens below the long's stop and the short's target
+    open_, high, low, close = [100, 90, 90], [101, 92, 92], [99, 88, 88], [100, 91, 91]
+    result = resolve_exits(open_, high, low, close, [0, 0], [1, -1], [95, 110], [110, 95])
+    assert list(result["exit_price"]) == [90, 90]
+    assert list(result["reason"]) == [EXIT_STOP_LOSS, EXIT_TAKE_PROFIT]
+
+
+def test_max_hold_expiry():
+    flat = [100.0] * 10
+    close = np.arange(100.0, 110.0)
+    result = resolve_exits(flat, flat, flat, close, [2, 7], [1, 1], [90, 90], [110, 110], max_hold=3)
+    assert list(result["exit_idx"]) == [5, 9]
+    assert list(result["exit_price"]) == [105, 109]
+    # The second trade runs out of data before max_hold bars elapse
+    assert list(result["reason"]) == [EXIT_TIME, EXIT_OPEN]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.analysis.alpha_engine import AlphaAnalyzer
+
+pytest.importorskip("alphalens")
+
+PERIODS = (1, 5, 10)
+
+
+def _fixture(seed: int, n_dates: int = 60, n_assets: int = 30, density: float = 0.5, ties: bool = True):
+    """
+    Signals (date, asset, factor_value) and wide closes on a business-day
+    calendar with two holidays, scattered missing prices, an asset with no
+    early prices, a date with a single signal and a date whose values are
+    all equal (non-unique quantile edges).
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_dates + max(PERIODS) + 2).delete([7, 20])
+    assets = [f"A{i:02d}" for i in range(n_assets)]
+    returns = rng.normal(0, 0.02, (len(dates), n_assets))
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates, columns=assets)
+    prices = prices.mask(rng.random(prices.shape) < 0.03)
+    prices.iloc[:5, 3] = np.nan
+
+    rows = [
+        (date, asset, float(rng.integers(50, 60)) if ties else float(rng.uniform(0, 1)))
+        for date in dates[:n_dates] for asset in assets if rng.random() < density
+    ]
+    rows.append((dates[n_dates], "A00", 55.0))
+    rows.extend((dates[n_dates + 1], asset, 51.0) for asset in assets[:6])
+    return pd.DataFrame(rows, columns=["date", "asset", "factor_value"]), prices
+
+
+def _assert_close(native, reference, path=""):
+    if isinstance(reference, dict):
+        assert set(native) == set(reference), (path, set(native) ^ set(reference))
+        for key in reference:
+            _assert_close(native[key], reference[key], f"{path}/{key}")
+    elif isinstance(reference, str):
+        assert native == reference, path
+    else:
+        assert (np.isnan(native) and np.isnan(reference)) or native == pytest.approx(reference, rel=1e-9, abs=1e-12), path
+
+
+def _both_engines(signals, prices):
+    analyzer = AlphaAnalyzer()
+    native = analyzer.run_full_analysis(signals.copy(), prices.copy(), engine="native")
+    reference = analyzer.run_full_analysis(signals.copy(), prices.copy(), engine="alphalens")
+    return native, reference
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("ties", [True, False])
+def test_native_engine_matches_alphalens(seed, ties):
+    signals, prices = _fixture(seed, density=0.3 + 0.1 * seed, ties=ties)
+    native, reference = _both_engines(signals, prices)
+    assert "error" not in reference
+    _assert_close(native, reference)
+
+
+def test_both_engines_reject_too_many_dropped_rows():
+    # Most signals fall in the last days of the price history, with no 10D forward return
+    signals, prices = _fixture(0, density=0.1)
+    late = prices.index[-8:]
+    signals = pd.concat([
+        signals,
+        pd.DataFrame([(d, a, 1.0 + i) for d in late for i, a in enumerate(prices.columns)], columns=signals.columns),
+    ])
+    native, reference = _both_engines(signals, prices)
+    assert "error" in native
+    assert "error" in reference
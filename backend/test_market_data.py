@@ -0,0 +1,47 @@
+import pandas as pd
+
+from backend.market_data import MarketDataProvider, StaticSource
+
+KEY = ("BTCUSDT", "1h")
+
+
+def _bars(index, close=100.0):
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close}, index=index)
+
+
+def _hours(count, end):
+    return pd.date_range(end=end, periods=count, freq="h")
+
+
+def test_second_request_fetches_only_the_delta(tmp_path):
+    last = pd.Timestamp.now(tz="UTC").floor("h") - pd.Timedelta(hours=2)
+    source = StaticSource({KEY: _bars(_hours(48, last))})
+    provider = MarketDataProvider(source, cache_dir=tmp_path, min_refresh_seconds=0)
+
+    first = provider.get_bars("BTCUSDT", period="5d", interval="1h")
+    assert len(first) == 48
+    assert source.calls[-1][2:] == ("5d", None)
+
+    # The last bar was still forming (its close changed) and two new bars arrived
+    source.frames[KEY] = pd.concat([_bars(_hours(47, last - pd.Timedelta(hours=1))), _bars(_hours(3, last + pd.Timedelta(hours=2)), close=105.0)])
+    second = provider.get_bars("BTCUSDT", period="5d", interval="1h")
+
+    assert source.calls[-1][2:] == (None, last)
+    assert len(source.calls) == 2
+    assert second.index.is_unique and second.index.is_monotonic_increasing
+    assert len(second) == 50
+    assert second.loc[last, "close"] == 105.0
+    assert second["close"].iloc[0] == 100.0
+
+
+def test_fresh_provider_reloads_from_disk(tmp_path):
+    last = pd.Timestamp.now(tz="UTC").floor("h") - pd.Timedelta(hours=1)
+    bars = _bars(_hours(24, last))
+    MarketDataProvider(StaticSource({KEY: bars}), cache_dir=tmp_path).get_bars("BTCUSDT", period="5d", interval="1h")
+
+    source = StaticSource()
+    reloaded = MarketDataProvider(source, cache_dir=tmp_path).get_bars("BTCUSDT", period="5d", interval="1h")
+
+    assert source.calls == []
+    assert list(reloaded.index) == list(bars.index)
+    assert (reloaded["close"] == 100.0).all()
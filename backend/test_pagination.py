@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.database import SessionLocal, Signal
+from backend.main import app
+from backend.pagination import InvalidCursor, decode_cursor, encode_cursor
+from backend.signal_store import asset_ids
+
+NOW = datetime.datetime(2026, 3, 2, 12, 0)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _add_signals(asset_id, created_times) -> list:
+    db = SessionLocal()
+    try:
+        rows = [Signal(asset_id=asset_id, signal_type="RSI Oversold", strategy="rsi", confidence=70, entry_price=100.0, created_at=t) for t in created_times]
+        db.add_all(rows)
+        db.commit()
+        return [r.id for r in rows]
+    finally:
+        db.close()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(NOW, 42)) == (NOW, 42)
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "!!!", encode_cursor(NOW, 1)[:-4], "WyJub3QtYS1kYXRlIiwgMV0"])
+def test_garbage_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_garbage_cursor_is_a_bad_request(client):
+    assert client.get("/signals?cursor=garbage").status_code == 400
+
+
+def test_paging_while_rows_are_inserted(client):
+    asset_id = asset_ids.resolve(["PAGE1"], "Stock")["PAGE1"]
+    # Pairs of rows share a timestamp, so pages also split on the id tie-breaker
+    times = [NOW - datetime.timedelta(minutes=i // 2) for i in range(11)]
+    expected = [row_id for _, row_id in sorted(zip(times, _add_signals(asset_id, times)), reverse=True)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        url = "/signals?ticker=PAGE1&limit=3&fields=id" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200, response.text
+        seen.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        pages += 1
+        # Newer rows arrive between requests, one tied with the newest seeded timestamp
+        _add_signals(asset_id, [NOW + datetime.timedelta(minutes=pages), NOW])
+
+    assert pages == 3
+    assert seen == expected
@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from backend import database
+from backend.account_stats import rebuild
+from backend.database import SessionLocal, Account, Asset, BacktestResult, Signal, Trade
+from backend.main import app
+
+# Statements each read route may issue, whatever the number of rows
+ROUTES = {
+    "/signals?limit=100": 1,
+    "/signals?ticker=T0&strategy=macd": 1,
+    "/trades/active": 1,
+    "/trades/history": 1,
+    "/backtests": 1,
+    "/account/summary": 2,
+    "/account/pnl-by-ticker": 1,
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in database._sync_engines:
+            event.listen(engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in database._sync_engines:
+            event.remove(engine, "before_cursor_execute", self)
+
+
+def _seed(rows: int):
+    """Add rows signals, trades and backtest results spread over 10 tickers."""
+    now = datetime.datetime.utcnow()
+    db = SessionLocal()
+    try:
+        if db.query(Account).first() is None:
+            db.add(Account(balance=10000.0))
+        assets = {}
+        for i in range(10):
+            ticker = f"T{i}"
+            assets[ticker] = db.query(Asset).filter(Asset.ticker == ticker).first() or Asset(ticker=ticker, asset_class="Stock")
+            db.add(assets[ticker])
+        db.flush()
+        for i in range(rows):
+            ticker = f"T{i % 10}"
+            created = now - datetime.timedelta(minutes=i)
+            db.add(Signal(asset_id=assets[ticker].id, signal_type="MACD Crossover", strategy="macd", confidence=60 + i % 40, entry_price=100.0, created_at=created))
+            db.add(Trade(ticker=ticker, direction="buy", entry_price=100.0, amount=1.0, status="Open", created_at=created))
+            db.add(Trade(ticker=ticker, direction="buy", entry_price=100.0, exit_price=101.0, amount=1.0, pnl=1.0, status="Closed", created_at=created, closed_at=created))
+            db.add(BacktestResult(strategy_name="macd", ticker=ticker, win_rate=0.5, total_trades=10, profit_factor=1.2, total_pnl=5.0, max_drawdown=0.1, run_at=created))
+        db.commit()
+        rebuild(db)
+    finally:
+        db.close()
+
+
+def _count(client, path: str) -> int:
+    with StatementCounter() as counter:
+        response = client.get(path)
+    assert response.status_code == 200, response.text
+    return len([s for s in counter.statements if s.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"))])
+
+
+@pytest.mark.parametrize("path,expected", ROUTES.items())
+def test_statement_count_does_not_grow_with_rows(client, path, expected):
+    _seed(5)
+    few = _count(client, path)
+    _seed(200)
+    many = _count(client, path)
+    assert few == many == expected
@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.database import SessionLocal, Signal
+from backend.main import app
+from backend.retention import archive_source, monthly_signal_summary
+from backend.signal_store import asset_ids
+
+NOW = datetime.datetime(2026, 6, 1)
+OLD = [datetime.datetime(2025, 11, 5), datetime.datetime(2025, 11, 20, 8), datetime.datetime(2025, 12, 10)]
+RECENT = [datetime.datetime(2026, 5, 20)]
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _summary():
+    db = SessionLocal()
+    try:
+        return monthly_signal_summary(db, ticker="RET1")
+    finally:
+        db.close()
+
+
+def _ids(client, query=""):
+    response = client.get(f"/signals?ticker=RET1&fields=id&limit=100{query}")
+    assert response.status_code == 200, response.text
+    return [row["id"] for row in response.json()]
+
+
+def test_archived_signals_stay_visible(client):
+    asset_id = asset_ids.resolve(["RET1"], "Stock")["RET1"]
+    db = SessionLocal()
+    try:
+        rows = [
+            Signal(asset_id=asset_id, signal_type="RSI Oversold", strategy="rsi", confidence=60 + 10 * i, entry_price=100.0, created_at=t)
+            for i, t in enumerate(OLD + RECENT)
+        ]
+        db.add_all(rows)
+        db.commit()
+        ids = [r.id for r in reversed(rows)]
+    finally:
+        db.close()
+
+    before = _summary()
+    assert [m["month"] for m in before] == ["2025-11", "2025-12", "2026-05"]
+    assert _ids(client) == ids
+
+    moved = archive_source("signals", now=NOW)
+    assert moved["2025-11"] >= 2 and moved["2025-12"] >= 1
+
+    db = SessionLocal()
+    try:
+        assert db.scalars(select(Signal.id).where(Signal.asset_id == asset_id)).all() == ids[:1]
+    finally:
+        db.close()
+    assert _summary() == before
+    assert _ids(client) == ids[:1]
+    assert _ids(client, "&include_archive=true") == ids
+    assert _ids(client, "&include_archive=true&since=2025-12-01T00:00:00") == ids[:2]
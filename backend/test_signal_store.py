@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.database import SessionLocal, Signal, init_db
+from backend.signal_store import asset_ids, signal_rows, upsert_signals
+
+BAR = datetime.datetime(2026, 3, 2, 14, 0)
+
+
+@pytest.fixture
+def db():
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _stored(db, asset_id):
+    return db.scalars(select(Signal).where(Signal.asset_id == asset_id)).all()
+
+
+def _signal(confidence, entry_price=100.0):
+    return {"type": "MACD Bullish Cross", "confidence": confidence, "entry_price": entry_price}
+
+
+def test_redetection_on_the_same_bar_updates_the_row(db):
+    asset_id = asset_ids.resolve(["STORE1"], "Stock")["STORE1"]
+    first = upsert_signals(db, signal_rows(asset_id, [_signal(60)], "1h", BAR))
+    db.commit()
+    again = upsert_signals(db, signal_rows(asset_id, [_signal(75, 101.0)], "1h", BAR))
+    db.commit()
+
+    rows = _stored(db, asset_id)
+    assert len(rows) == 1
+    assert again[0].id == first[0].id
+    assert (rows[0].confidence, rows[0].entry_price, rows[0].strategy) == (75, 101.0, "macd")
+
+    # A later bar is a new signal
+    upsert_signals(db, signal_rows(asset_id, [_signal(80)], "1h", BAR + datetime.timedelta(hours=1)))
+    db.commit()
+    assert len(_stored(db, asset_id)) == 2
+
+
+def test_duplicate_keys_in_one_batch_keep_the_last(db):
+    asset_id = asset_ids.resolve(["STORE2"], "Stock")["STORE2"]
+    stored = upsert_signals(db, signal_rows(asset_id, [_signal(60), _signal(70), _signal(90)], "1h", BAR))
+    db.commit()
+
+    assert len(stored) == 1
+    assert [r.confidence for r in _stored(db, asset_id)] == [90]
+
+
+def test_nothing_mode_returns_only_new_rows(db):
+    asset_id = asset_ids.resolve(["STORE3"], "Stock")["STORE3"]
+    upsert_signals(db, signal_rows(asset_id, [_signal(60)], "1h", BAR))
+    db.commit()
+    stored = upsert_signals(db, signal_rows(asset_id, [_signal(99)], "1h", BAR), on_conflict="nothing")
+    db.commit()
+
+    assert stored == []
+    assert db.scalar(select(func.max(Signal.confidence)).where(Signal.asset_id == asset_id)) == 60
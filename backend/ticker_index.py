@@ -0,0 +1,125 @@
+"""
+In-memory search index over the Historicaldata ticker catalogue.
+
+Entries are kept in sorted arrays keyed by (symbol, delisted, asset_type,
+ticker), globally and per asset type, so a typeahead prefix query is two
+bisects plus a slice. Active listings sort before delisted ones of the same
+symbol.
+
+Pagination uses an opaque cursor ("<asset_type>:<ticker>" of the last
+entry returned), so pages stay stable and every instrument is reachable.
+The index is rebuilt when the data directory changes.
+"""
+import heapq
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from . import data_loader
+from .pagination import InvalidCursor
+
+# Sorts after any character that can appear in a ticker
+_PREFIX_END = "\uffff"
+
+
+def _sort_key(entry: dict) -> tuple:
+    return (entry["symbol"].upper(), entry["asset_type"] == "delisted", entry["asset_type"], entry["ticker"])
+
+
+class TickerIndex:
+    def __init__(self, entries):
+        entries = sorted(entries, key=_sort_key)
+        self._keys = [_sort_key(e) for e in entries]
+        self._entries = entries
+        self._by_type = {}
+        for key, entry in zip(self._keys, entries):
+            keys, items = self._by_type.setdefault(entry["asset_type"], ([], []))
+            keys.append(key)
+            items.append(entry)
+        self._cursor_keys = {f"{e['asset_type']}:{e['ticker']}": k for k, e in zip(self._keys, entries)}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def asset_type_counts(self) -> dict:
+        return {asset_type: len(items) for asset_type, (_, items) in sorted(self._by_type.items())}
+
+    def search(self, q: str = "", asset_types=None, limit: int = 50, cursor: str = None) -> dict:
+        """
+        Entries whose symbol starts with q (case-insensitive), in index order.
+
+        asset_types: optional iterable of asset types to include.
+        Returns {"tickers", "matched", "next_cursor"}.
+        """
+        prefix = q.strip().upper()
+        lo_key = (prefix,)
+        hi_key = (prefix + _PREFIX_END,)
+        if cursor:
+            if cursor not in self._cursor_keys:
+                raise InvalidCursor(f"Unknown cursor: {cursor}")
+            after = self._cursor_keys[cursor]
+        else:
+            after = None
+
+        if asset_types:
+            sources = [self._by_type[t] for t in dict.fromkeys(asset_types) if t in self._by_type]
+        else:
+            sources = [(self._keys, self._entries)]
+
+        matched = 0
+        ranges = []
+        for keys, items in sources:
+            lo, hi = bisect_left(keys, lo_key), bisect_left(keys, hi_key)
+            matched += hi - lo
+            if after is not None:
+                lo = max(lo, bisect_right(keys, after))
+            if lo < hi:
+                end = min(hi, lo + limit + 1)
+                ranges.append(zip(keys[lo:end], items[lo:end]))
+
+        if len(ranges) == 1:
+            page = list(islice(ranges[0], limit + 1))
+        else:
+            page = list(islice(heapq.merge(*ranges, key=lambda pair: pair[0]), limit + 1))
+
+        has_more = len(page) > limit
+        page = [entry for _, entry in page[:limit]]
+        return {
+            "tickers": page,
+            "matched": matched,
+            "next_cursor": f"{page[-1]['asset_type']}:{page[-1]['ticker']}" if has_more else None,
+        }
+
+
+def build_index(data_dir=None) -> TickerIndex:
+    data_dir = data_dir or data_loader.DATA_DIR
+    entries = []
+    if os.path.isdir(data_dir):
+        with os.scandir(data_dir) as it:
+            for item in it:
+                info = data_loader.parse_data_filename(item.name)
+                if info:
+                    entries.append(info)
+    return TickerIndex(entries)
+
+
+_index = None
+_index_stamp = None
+_index_lock = threading.Lock()
+
+
+def get_ticker_index() -> TickerIndex:
+    """Shared index, rebuilt when the data directory (or its mtime) changes."""
+    global _index, _index_stamp
+    data_dir = data_loader.DATA_DIR
+    try:
+        stamp = (str(data_dir), os.stat(data_dir).st_mtime_ns)
+    except OSError:
+        stamp = (str(data_dir), None)
+    if _index is None or stamp != _index_stamp:
+        with _index_lock:
+            if _index is None or stamp != _index_stamp:
+                _index = build_index(data_dir)
+                _index_stamp = stamp
+    return _index
@@ -8,6 +8,8 @@ interface Ticker {
   ticker: string;
   asset_type: string;
   type_label: string;
+  symbol: string;
+  delisted_date?: string;
 }
 
 interface ChartCandle {
@@ -60,7 +62,6 @@ const STRATEGIES = [
 ];
 
 export default function AlgoDashPage() {
-  const [tickers, setTickers] = useState<Ticker[]>([]);
   const [filteredTickers, setFilteredTickers] = useState<Ticker[]>([]);
   const [searchQuery, setSearchQuery] = useState("");
   const [selectedTicker, setSelectedTicker] = useState<Ticker | null>(null);
@@ -72,34 +73,27 @@ export default function AlgoDashPage() {
   const [backtesting, setBacktesting] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  // Fetch available tickers
+  // Typeahead search against the server-side ticker index
   useEffect(() => {
-    const fetchTickers = async () => {
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
       try {
-        const res = await fetch(`${API_URL}/algo-dash/tickers`);
+        const params = new URLSearchParams({ q: searchQuery.trim(), limit: "50" });
+        const res = await fetch(`${API_URL}/algo-dash/tickers?${params}`, { signal: controller.signal });
         if (!res.ok) throw new Error("Failed to fetch tickers");
         const data = await res.json();
-        setTickers(data.tickers);
-        setFilteredTickers(data.tickers.slice(0, 50));
+        setFilteredTickers(data.tickers);
       } catch (err) {
+        if ((err as Error).name === "AbortError") return;
         console.error(err);
         setError("Failed to load tickers. Is the backend running?");
       }
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
     };
-    fetchTickers();
-  }, []);
-
-  // Filter tickers based on search
-  useEffect(() => {
-    if (searchQuery.length === 0) {
-      setFilteredTickers(tickers.slice(0, 50));
-    } else {
-      const filtered = tickers.filter((t) =>
-        t.ticker.toLowerCase().includes(searchQuery.toLowerCase())
-      );
-      setFilteredTickers(filtered.slice(0, 50));
-    }
-  }, [searchQuery, tickers]);
+  }, [searchQuery]);
 
   // Fetch chart data when ticker selected
   useEffect(() => {
@@ -214,8 +208,10 @@ export default function AlgoDashPage() {
                         : "bg-gray-800/50 hover:bg-gray-700/50 text-gray-300"
                     }`}
                   >
-                    <span className="font-medium">{t.ticker}</span>
-                    <span className="text-xs text-gray-500 ml-2">{t.type_label}</span>
+                    <span className="font-medium">{t.symbol}</span>
+                    <span className="text-xs text-gray-500 ml-2">
+                      {t.delisted_date ? `${t.type_label} ${t.delisted_date}` : t.type_label}
+                    </span>
                   </button>
                 ))}
               </div>
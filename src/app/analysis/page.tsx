@@ -1,5 +1,5 @@
 "use client"
-import React, { useState, useEffect, useCallback, useMemo } from 'react';
+import React, { useState, useEffect, useCallback, useMemo, useRef } from 'react';
 import { SignalCard } from '@/components/SignalCard';
 import { ChartComponent } from '@/components/ChartComponent';
 import { TradeModal } from '@/components/TradeModal';
@@ -51,6 +51,10 @@ const ASSETS = {
     ]
 };
 
+// REST fallback while the push channel is down; non-pushed data is refreshed every SLOW_POLL_TICKS ticks while live
+const POLL_INTERVAL_MS = 10000;
+const SLOW_POLL_TICKS = 6;
+
 export default function AnalysisPage() {
     const [mounted, setMounted] = useState(false);
     const [category, setCategory] = useState<'STOCKS' | 'CRYPTO'>('CRYPTO');
@@ -71,6 +75,10 @@ export default function AnalysisPage() {
     const [isTrading, setIsTrading] = useState(false);
     const [isModalOpen, setIsModalOpen] = useState(false);
     const [modalDirection, setModalDirection] = useState<'buy' | 'sell'>('buy');
+    const [reconnectTick, setReconnectTick] = useState(0);
+    const isLiveRef = useRef(false);
+    // Closed trades already counted in the local account summary, so a repeated push is not booked twice
+    const closedTradeIds = useRef(new Set<number>());
     const [alerts, setAlerts] = useState([
         { id: 1, title: 'Volatility Alert', time: '10m ago', message: 'High volatility detected in BTC-USD. Exercise caution.' },
         { id: 2, title: 'Strategy Signal', time: '25m ago', message: 'MACD Golden Cross detected on NVDA 1h chart.' }
@@ -143,10 +151,28 @@ export default function AnalysisPage() {
             const res = await fetch(`${API_URL}/api/trades/history`);
             if (!res.ok) return;
             const data = await res.json();
+            closedTradeIds.current = new Set(data.map((t: any) => t.id));
             setTradeHistory(data);
         } catch (e) { console.error(e); }
     }, []);
 
+    // Apply a pushed trade (full state from the server) to the local lists and account summary
+    const applyTrade = useCallback((trade: any) => {
+        setActiveTrades(prev => trade.status === 'Open'
+            ? [trade, ...prev.filter(t => t.id !== trade.id)]
+            : prev.filter(t => t.id !== trade.id));
+        if (trade.status !== 'Closed' || closedTradeIds.current.has(trade.id)) return;
+        closedTradeIds.current.add(trade.id);
+        const pnl = trade.pnl ?? 0;
+        setTradeHistory(prev => [trade, ...prev.filter(t => t.id !== trade.id)]);
+        setAccountSummary(prev => ({
+            ...prev,
+            balance: prev.balance + pnl,
+            total_pnl: prev.total_pnl + pnl,
+            trades_count: prev.trades_count + 1
+        }));
+    }, []);
+
     const openTrade = async (data: { amount: number; sl?: number; tp?: number }) => {
         const API_URL = process.env.NEXT_PUBLIC_API_URL || '';
         setIsTrading(true);
@@ -162,8 +188,11 @@ export default function AnalysisPage() {
                     take_profit: data.tp
                 })
             });
-            await fetchActiveTrades();
-            await fetchAccount();
+            // While the push channel is live the new trade arrives on it
+            if (!isLiveRef.current) {
+                await fetchActiveTrades();
+                await fetchAccount();
+            }
             setIsModalOpen(false);
         } finally {
             setIsTrading(false);
@@ -174,9 +203,11 @@ export default function AnalysisPage() {
         try {
             const API_URL = process.env.NEXT_PUBLIC_API_URL || '';
             await fetch(`${API_URL}/api/trades/close/${id}`, { method: 'POST' });
-            await fetchActiveTrades();
-            await fetchTradeHistory();
-            await fetchAccount();
+            if (!isLiveRef.current) {
+                await fetchActiveTrades();
+                await fetchTradeHistory();
+                await fetchAccount();
+            }
         } catch (e) { console.error(e); }
     };
 
@@ -235,17 +266,74 @@ export default function AnalysisPage() {
         fetchProAnalysis(selectedAsset.ticker);
         fetchBacktests();
 
+        // Signals, trades and bars arrive over the push channel while it is connected. Suggestions
+        // (cached per 15m bar on the server) and backtests (nightly job) are not pushed, so they are
+        // refreshed every SLOW_POLL_TICKS ticks while live instead of every tick.
+        let tick = 0;
         const interval = setInterval(() => {
-            fetchAccount();
-            fetchActiveTrades();
-            fetchTradeHistory();
-            fetchSignals();
-            fetchProAnalysis(selectedAsset.ticker);
-            fetchBacktests();
-        }, 10000);
+            tick += 1;
+            if (!isLiveRef.current) {
+                fetchAccount();
+                fetchActiveTrades();
+                fetchTradeHistory();
+                fetchSignals();
+            }
+            if (!isLiveRef.current || tick % SLOW_POLL_TICKS === 0) {
+                fetchProAnalysis(selectedAsset.ticker);
+                fetchBacktests();
+            }
+        }, POLL_INTERVAL_MS);
         return () => clearInterval(interval);
     }, [mounted, selectedAsset.ticker, fetchSignals, fetchHistory, fetchAccount, fetchActiveTrades, fetchTradeHistory, fetchProAnalysis, fetchBacktests]);
 
+    // Live push channel (/ws): new signals, trade changes and bar updates. Falls back to polling when unavailable.
+    useEffect(() => {
+        if (!mounted) return;
+        const API_URL = process.env.NEXT_PUBLIC_API_URL || '';
+        if (!API_URL.startsWith('http')) return; // Serverless deployments have no WebSocket support
+
+        const ticker = selectedAsset.ticker;
+        const ws = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/ws`);
+        let reconnect: ReturnType<typeof setTimeout> | undefined;
+        let closedByUs = false;
+
+        ws.onopen = () => {
+            isLiveRef.current = true;
+            ws.send(JSON.stringify({ action: 'subscribe', topics: ['signals', 'trades'] }));
+            ws.send(JSON.stringify({ action: 'subscribe', topics: ['bars'], tickers: [ticker], interval: '1d' }));
+        };
+        ws.onmessage = (event) => {
+            const msg = JSON.parse(event.data);
+            if (msg.topic === 'signals') {
+                // A signal re-detected on the same bar is pushed again with the same id
+                setSignals(prev => [msg.data, ...prev.filter(s => s.id !== msg.data.id)].slice(0, 20));
+            } else if (msg.topic === 'trades') {
+                applyTrade(msg.data);
+            } else if (msg.topic === 'bars' && msg.ticker === ticker) {
+                const point = { time: msg.data.time, value: msg.data.close };
+                setChartData(prev => prev.length && prev[prev.length - 1].time === point.time
+                    ? [...prev.slice(0, -1), point]
+                    : [...prev, point]);
+            } else if (msg.topic === 'resync') {
+                fetchSignals();
+                fetchActiveTrades();
+                fetchTradeHistory();
+                fetchAccount();
+            }
+        };
+        ws.onclose = () => {
+            isLiveRef.current = false;
+            if (!closedByUs) reconnect = setTimeout(() => setReconnectTick(t => t + 1), 5000);
+        };
+
+        return () => {
+            closedByUs = true;
+            clearTimeout(reconnect);
+            isLiveRef.current = false;
+            ws.close();
+        };
+    }, [mounted, selectedAsset.ticker, reconnectTick, applyTrade, fetchSignals, fetchAccount, fetchActiveTrades, fetchTradeHistory]);
+
     const filteredAssets = useMemo(() => {
         const all = [...ASSETS.CRYPTO, ...ASSETS.STOCKS];
         if (!searchQuery) return all;